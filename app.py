@@ -1,21 +1,96 @@
-from src.scripts.queries import (
-    get_all_drivers, 
-    first_query,
-    second_query,
-    third_query,
-    fourth_query,
-    fifth_query
-)
+from src.scripts import queries, arrow_queries
+from src.scripts.arguments import parse_numbers
+from src.scripts.arrow_queries import ParquetSource, results_match
+from src.scripts.cache import CacheInfo, ReportCache
+from src.scripts.queries import PreparedSession
+from src.scripts.report_client import DEFAULT_URL as DEFAULT_SERVER_URL, ReportClient
 
 from dotenv import dotenv_values
 from sqlalchemy import create_engine
 from tabulate import tabulate
 
+import argparse
+import json
 import os
+import sys
 import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
 
 DATABASE_URL = dotenv_values(".env.local")['DATABASE_URL']
 
+# Report implementations: "sql" runs them on PostgreSQL, "arrow" computes
+# them in-process from the parquet files.
+BACKENDS = {
+    "sql": queries,
+    "arrow": arrow_queries,
+}
+
+
+# Report function run by each command of the menu
+REPORTS = {
+    "1": "first_query",
+    "2": "second_query",
+    "3": "third_query",
+    "4": "fourth_query",
+    "5": "fifth_query",
+    "6": "get_all_drivers",
+}
+
+# Reports that accept session_keys/driver_numbers parameters
+PARAMETRIZED_COMMANDS = {"2", "4", "5"}
+
+DEFAULT_SCHEMA = "raw"
+DEFAULT_OUTPUT_DIR = "./reports"
+
+
+def read_parameters(parameters) -> dict:
+    """
+    Returns the session_keys/driver_numbers for a parametrized report,
+    prompting for the ones not given on the command line.
+
+    Parameters:
+        parameters: Dict with the values given on the command line.
+
+    Returns:
+        dict: Keyword arguments for the report; a parameter left blank is
+        omitted so the report uses its default.
+    """
+    prompts = {
+        "session_keys": "Session keys (comma separated, 'all' for every session, Enter for the default): ",
+        "driver_numbers": "Driver numbers (comma separated, 'all' for every driver, Enter for the default): ",
+    }
+
+    kwargs = {}
+    for name, prompt in prompts.items():
+        value = parameters.get(name)
+        if value is None:
+            value = input(prompt)
+        if value.strip():
+            kwargs[name] = parse_numbers(value)
+
+    return kwargs
+
+
+def given_parameters(parameters) -> dict:
+    """
+    Returns the session_keys/driver_numbers given on the command line as
+    keyword arguments for the parametrized reports, without prompting.
+
+    Parameters:
+        parameters: Dict with the values given on the command line.
+
+    Returns:
+        dict: Keyword arguments; a parameter not given is omitted so the
+        report uses its default.
+    """
+    return {
+        name: parse_numbers(value)
+        for name, value in parameters.items()
+        if value is not None and value.strip()
+    }
+
 
 def print_header() -> None:
     """
@@ -38,26 +113,56 @@ def print_header() -> None:
     print(header)
 
 
-def execute_command(engine) -> None:
+def call_report(command, engine, backend, cache, kwargs, schema_name):
+    """
+    Runs a report locally (from the cache when there is one) or on a
+    report server.
+
+    Parameters:
+        command: Menu number of the report ("1" to "6").
+        engine: SQLAlchemy engine, ParquetSource or ReportClient.
+        backend: Module with the report functions (queries or arrow_queries).
+        cache: Optional ReportCache the report is served from.
+        kwargs: session_keys/driver_numbers of the report.
+        schema_name: Schema the report reads.
+
+    Returns:
+        tuple: (DataFrame, CacheInfo or None)
+    """
+    if isinstance(engine, ReportClient):
+        dataframe = engine.run(REPORTS[command], schema_name, **kwargs)
+        server = dataframe.attrs["server"]
+        if server["cache"] is None:
+            return dataframe, None
+        return dataframe, CacheInfo(server["cache"], server["compute_seconds"], server["report_seconds"])
+
+    report = getattr(backend, REPORTS[command])
+    if cache is None:
+        return report(schema_name=schema_name, engine=engine, **kwargs), None
+    return cache.run(report, schema_name=schema_name, engine=engine, **kwargs)
+
+
+def execute_command(engine, backend=queries, cache=None, parameters=None, chunksize=None, schema_name=DEFAULT_SCHEMA) -> None:
     """
     Prompts the user for a command, executes the corresponding query, 
     and returns the result as a DataFrame along with the execution duration.
     
     Parameters:
-        engine: SQLAlchemy engine used to connect to the database.
+        engine: SQLAlchemy engine used to connect to the database, a
+            ParquetSource for the arrow backend or a ReportClient.
+        backend: Module with the report functions (queries or arrow_queries).
+        cache: Optional ReportCache the reports are served from.
+        parameters: session_keys/driver_numbers given on the command line.
+        chunksize: Stream the result in chunks of this many rows instead of
+            loading it at once (SQL backend only, bypasses the cache).
+        schema_name: Schema the reports read.
 
     Returns:
-        tuple: (DataFrame, duration in seconds)
-    """
-    commands = {
-        "1": first_query,
-        "2": second_query,
-        "3": third_query,
-        "4": fourth_query,
-        "5": fifth_query,
-        "6": get_all_drivers,
-        "0": "exit"
-    }
+        tuple: (DataFrame or iterator of DataFrames, duration in seconds,
+        CacheInfo or None)
+    """
+    commands = {command: getattr(backend, name) for command, name in REPORTS.items()}
+    commands["0"] = "exit"
     
     command = input("Enter your command: ")
     while command not in commands:
@@ -68,32 +173,298 @@ def execute_command(engine) -> None:
     
     if command == "0":
         exit()
+
+    kwargs = read_parameters(parameters or {}) if command in PARAMETRIZED_COMMANDS else {}
     
     start = time.time()    
-    dataframe = commands[command](schema_name="raw", engine=engine)
+    if chunksize is not None:
+        dataframe, cache_info = commands[command](schema_name=schema_name, engine=engine, chunksize=chunksize, **kwargs), None
+    else:
+        dataframe, cache_info = call_report(command, engine, backend, cache, kwargs, schema_name)
     end = time.time()
     
-    return (dataframe, end - start)
+    return (dataframe, end - start, cache_info)
     
-def print_dataframe(dataframe, duration) -> None:
+def print_dataframe(dataframe, duration, cache_info=None) -> None:
     """
     Prints basic information about the DataFrame and the execution time.
 
     Parameters:
-        dataframe: The pandas DataFrame returned from the query.
+        dataframe: The pandas DataFrame returned from the query, or an
+            iterator of DataFrame chunks when the result is streamed.
         duration: Time (in seconds) it took to execute the query.
+        cache_info: CacheInfo of the call when the report cache is enabled.
     """
+    if not isinstance(dataframe, pd.DataFrame):
+        print_chunks(dataframe, duration)
+        return
+
     print(f"Sample of the data: {dataframe.shape}")
-    print(f"Query executed in {duration:.2f} seconds\n")
+    if cache_info is None:
+        print(f"Query executed in {duration:.2f} seconds\n")
+    else:
+        print(f"Query executed in {duration:.2f} seconds ({cache_info})\n")
     print(tabulate(dataframe.head(20), headers='keys', tablefmt='grid', showindex=False))
     
     print("\nSaving the data to relatory.csv...")
     dataframe.to_csv("relatory.csv", index=False)
+
+
+def print_chunks(chunks, duration) -> None:
+    """
+    Prints the first page of a streamed result as soon as it arrives and
+    appends every chunk to relatory.csv, so only one chunk is held in
+    memory at a time.
+
+    Parameters:
+        chunks: Iterator of DataFrames returned by a report with chunksize.
+        duration: Time (in seconds) spent before the first chunk was requested.
+    """
+    start = time.time()
+    rows = 0
+    columns = 0
+
+    with open("relatory.csv", "w", newline="") as relatory:
+        for number, chunk in enumerate(chunks):
+            if number == 0:
+                columns = chunk.shape[1]
+                print(f"First page received in {duration + time.time() - start:.2f} seconds\n")
+                print(tabulate(chunk.head(20), headers='keys', tablefmt='grid', showindex=False))
+                print("\nSaving the data to relatory.csv...")
+
+            chunk.to_csv(relatory, index=False, header=number == 0)
+            rows += len(chunk)
+
+    print(f"\nSample of the data: {(rows, columns)}")
+    print(f"Query executed in {duration + time.time() - start:.2f} seconds")
+
+
+def run_report(command, engine, backend, cache, kwargs, schema_name, output_dir) -> dict:
+    """
+    Runs one report of a batch and writes its result to its own CSV file.
+
+    Parameters:
+        command: Menu number of the report ("1" to "6").
+        engine: SQLAlchemy engine (shared by the batch), ParquetSource or
+            ReportClient.
+        backend: Module with the report functions (queries or arrow_queries).
+        cache: Optional ReportCache the report is served from.
+        kwargs: session_keys/driver_numbers of the report.
+        schema_name: Schema the report reads.
+        output_dir: Directory of the result files.
+
+    Returns:
+        dict: Report name, rows, seconds to compute and to write the result,
+        cache status and the path of the file.
+    """
+    start = time.perf_counter()
+    dataframe, cache_info = call_report(command, engine, backend, cache, kwargs, schema_name)
+    query_seconds = time.perf_counter() - start
+
+    path = os.path.join(output_dir, f"report_{command}_{REPORTS[command]}.csv")
+    dataframe.to_csv(path, index=False)
+
+    return {
+        "command": command,
+        "report": REPORTS[command],
+        "rows": len(dataframe),
+        "query_seconds": query_seconds,
+        "write_seconds": time.perf_counter() - start - query_seconds,
+        "cache": None if cache_info is None else cache_info.status,
+        "file": path,
+    }
+
+
+def run_batch(commands, engine, backend, cache, parameters, schema_name, output_dir, workers) -> dict:
+    """
+    Runs several reports concurrently, each on its own thread, and writes
+    every result to its own file.
+
+    The reports spend most of their time waiting on PostgreSQL (or in
+    pyarrow, which releases the GIL), so with one pooled connection per
+    thread the batch takes about as long as its slowest report.
+
+    Parameters:
+        commands: Menu numbers of the reports; repeated numbers run once.
+        engine: SQLAlchemy engine whose pool holds at least `workers`
+            connections, a ParquetSource or a ReportClient.
+        backend: Module with the report functions (queries or arrow_queries).
+        cache: Optional ReportCache the reports are served from.
+        parameters: session_keys/driver_numbers given on the command line.
+        schema_name: Schema the reports read.
+        output_dir: Directory of the result files, created if needed.
+        workers: Reports run at the same time.
+
+    Returns:
+        dict: Schema, workers, wall time, the sum of the report times and
+        the run_report summary of every report, in the given order.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+
+    kwargs = given_parameters(parameters)
+    commands = list(dict.fromkeys(commands))
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(
+                run_report,
+                command,
+                engine,
+                backend,
+                cache,
+                kwargs if command in PARAMETRIZED_COMMANDS else {},
+                schema_name,
+                output_dir,
+            )
+            for command in commands
+        ]
+        reports = [future.result() for future in futures]
+
+    return {
+        "schema": schema_name,
+        "workers": workers,
+        "wall_seconds": time.perf_counter() - start,
+        "sum_seconds": sum(report["query_seconds"] + report["write_seconds"] for report in reports),
+        "reports": reports,
+    }
     
 
+def check_backends(commands, engine, source, parameters, schema_name) -> list:
+    """
+    Runs reports on both backends and compares their results with
+    arrow_queries.results_match.
+
+    The schema must have been loaded from the parquet tree of `source`.
+
+    Parameters:
+        commands: Menu numbers of the reports to compare.
+        engine: SQLAlchemy engine for the sql backend.
+        source: ParquetSource for the arrow backend.
+        parameters: session_keys/driver_numbers given on the command line.
+        schema_name: Schema the SQL reports read.
+
+    Returns:
+        list: One [command, report, sql rows, arrow rows, match] row per
+        report.
+    """
+    kwargs = given_parameters(parameters)
+
+    rows = []
+    for command in commands:
+        report_kwargs = kwargs if command in PARAMETRIZED_COMMANDS else {}
+        expected = getattr(queries, REPORTS[command])(schema_name=schema_name, engine=engine, **report_kwargs)
+        actual = getattr(arrow_queries, REPORTS[command])(schema_name=schema_name, engine=source, **report_kwargs)
+        # Two empty results agree on nothing (e.g. a session not in the data)
+        match = len(expected) > 0 and results_match(expected, actual)
+        rows.append([command, REPORTS[command], len(expected), len(actual), match])
+
+    return rows
+
+
 if __name__ == "__main__":
-    # Create a database engine
-    engine = create_engine(DATABASE_URL)
+    parser = argparse.ArgumentParser(description="F1 Analisys")
+    parser.add_argument(
+        "--backend",
+        choices=BACKENDS,
+        default="sql",
+        help="sql runs the reports on PostgreSQL, arrow computes them from the parquet files.",
+    )
+    parser.add_argument("--data-dir", default="./data", help="Parquet tree used by the arrow backend.")
+    parser.add_argument("--no-cache", action="store_true", help="Always recompute the reports.")
+    parser.add_argument(
+        "--prepared",
+        action="store_true",
+        help="Run the SQL reports as prepared statements on one reused connection.",
+    )
+    parser.add_argument("--session-keys", help="Sessions for reports 2, 4 and 5, e.g. 9998,10006 or all.")
+    parser.add_argument("--driver-numbers", help="Drivers for reports 2, 4 and 5, e.g. 1,30 or all.")
+    parser.add_argument(
+        "--chunksize",
+        type=int,
+        help="Stream the SQL reports through a server-side cursor in chunks of this many rows.",
+    )
+    parser.add_argument("--schema", default=DEFAULT_SCHEMA, help="Schema the reports read.")
+    parser.add_argument(
+        "--batch",
+        nargs="+",
+        choices=REPORTS,
+        metavar="REPORT",
+        help="Run these reports (1 to 6) concurrently without the menu and print a JSON timing summary.",
+    )
+    parser.add_argument("--output-dir", default=DEFAULT_OUTPUT_DIR, help="Directory of the batch result files.")
+    parser.add_argument("--workers", type=int, help="Reports a batch runs at the same time (default: all of them).")
+    parser.add_argument(
+        "--compact-results",
+        action="store_true",
+        help="Downcast the integer columns of the SQL results and make repetitive text columns categorical.",
+    )
+    parser.add_argument(
+        "--check-backends",
+        nargs="*",
+        choices=REPORTS,
+        metavar="REPORT",
+        help="Run these reports (default: all) on both backends, compare the results and exit with an error when any differs.",
+    )
+    parser.add_argument(
+        "--server",
+        nargs="?",
+        const=DEFAULT_SERVER_URL,
+        help=f"Run the reports on a report_server.py (default URL {DEFAULT_SERVER_URL}); it owns the backend and cache.",
+    )
+    args = parser.parse_args()
+    if args.chunksize is not None and args.backend != "sql":
+        parser.error("--chunksize requires the sql backend")
+    if args.batch is not None and (args.chunksize is not None or args.prepared):
+        parser.error("--batch cannot be combined with --chunksize or --prepared")
+    if args.workers is not None and args.workers < 1:
+        parser.error("--workers must be at least 1")
+    if args.server is not None and (args.chunksize is not None or args.prepared):
+        parser.error("--server cannot be combined with --chunksize or --prepared")
+
+    queries.COMPACT_RESULTS = args.compact_results
+    backend = BACKENDS[args.backend]
+    parameters = {"session_keys": args.session_keys, "driver_numbers": args.driver_numbers}
+    cache = None if args.no_cache or args.server is not None else ReportCache()
+
+    if args.check_backends is not None:
+        rows = check_backends(
+            args.check_backends or list(REPORTS),
+            create_engine(DATABASE_URL),
+            ParquetSource(args.data_dir),
+            parameters,
+            args.schema,
+        )
+        print(tabulate(rows, headers=["command", "report", "sql rows", "arrow rows", "match"], tablefmt="grid"))
+        if not all(row[-1] for row in rows):
+            print(f"\nThe arrow backend differs from schema {args.schema} in: {', '.join(row[1] for row in rows if not row[-1])}")
+            sys.exit(1)
+        exit()
+
+    if args.batch is not None:
+        workers = args.workers or len(set(args.batch))
+        if args.server is not None:
+            engine = ReportClient(args.server)
+        elif args.backend == "arrow":
+            engine = ParquetSource(args.data_dir)
+        else:
+            # One pooled connection per worker
+            engine = create_engine(DATABASE_URL, pool_size=workers, max_overflow=0)
+
+        summary = run_batch(args.batch, engine, backend, cache, parameters, args.schema, args.output_dir, workers)
+        print(json.dumps(summary, indent=2))
+        exit()
+
+    # Create a database engine (or the in-process parquet source, or a
+    # client of the report server)
+    if args.server is not None:
+        engine = ReportClient(args.server)
+    elif args.backend == "arrow":
+        engine = ParquetSource(args.data_dir)
+    elif args.prepared:
+        engine = PreparedSession(create_engine(DATABASE_URL))
+    else:
+        engine = create_engine(DATABASE_URL)
     
     # Application main loop
     try:
@@ -101,8 +472,8 @@ if __name__ == "__main__":
             os.system('clear')  # Clear terminal screen (Linux/macOS)
 
             print_header()
-            dataframe, duration = execute_command(engine)
-            print_dataframe(dataframe, duration)
+            dataframe, duration, cache_info = execute_command(engine, backend, cache, parameters, args.chunksize, args.schema)
+            print_dataframe(dataframe, duration, cache_info)
             
             input("\nPress Enter to continue...")
     except KeyboardInterrupt:
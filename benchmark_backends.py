@@ -0,0 +1,324 @@
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+import urllib.request
+from datetime import datetime
+from decimal import Decimal
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+from dotenv import dotenv_values
+from influxdb_client import InfluxDBClient
+from sqlalchemy import create_engine, text
+from tabulate import tabulate
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+PROJECTS = {
+    "postgres": os.path.join(ROOT, "project1"),
+    "influxdb": os.path.join(ROOT, "project2"),
+}
+
+# Same server the project2 scripts write to (src/scripts/insert_data.py)
+INFLUX_URL = "http://localhost:8086"
+INFLUX_ORG = "my-org"
+
+DEFAULT_SCHEMA = "bench_backends"
+DEFAULT_BUCKET = "bucket-session-key"
+DEFAULT_OUTPUT = "./benchmarks/backends"
+DEFAULT_TOLERANCE = 0.01
+
+# Reports with the same name, columns and meaning in project1's queries.py
+# and project2's flux_queries.py
+REPORTS = ("get_all_drivers", "first_query", "second_query", "third_query", "fourth_query", "fifth_query")
+
+
+def run_module(backend, module, args, workdir):
+    """
+    Runs a script of one of the projects (python -m src.scripts.<module>)
+    from `workdir`, where the data/ directory and .env.local are.
+
+    The two projects are both the `src` package, so each runs in its own
+    process with its project on the PYTHONPATH.
+
+    Returns:
+        float: Wall-clock seconds.
+    """
+    env = {**os.environ, "PYTHONPATH": PROJECTS[backend]}
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-m", f"src.scripts.{module}", *args], cwd=workdir, env=env, check=True)
+    return time.perf_counter() - start
+
+
+def source_rows(data_dir):
+    """
+    Counts the rows of every parquet file of the dataset, from their footers.
+    """
+    rows = 0
+    for directory, _, files in os.walk(data_dir):
+        for name in files:
+            if name.endswith(".parquet"):
+                rows += pq.ParquetFile(os.path.join(directory, name)).metadata.num_rows
+    return rows
+
+
+def recreate_bucket(client, bucket):
+    """
+    Deletes and recreates a bucket so both backends load into empty storage.
+
+    Returns:
+        str: The id of the new bucket.
+    """
+    buckets_api = client.buckets_api()
+    existing = buckets_api.find_bucket_by_name(bucket)
+    if existing is not None:
+        buckets_api.delete_bucket(existing)
+    org_id = client.organizations_api().find_organizations(org=INFLUX_ORG)[0].id
+    return buckets_api.create_bucket(bucket_name=bucket, org_id=org_id).id
+
+
+def postgres_size(engine, schema_name):
+    """
+    Returns the bytes used by the tables of a schema, with indexes and TOAST.
+    """
+    with engine.connect() as conn:
+        return int(conn.execute(
+            text(
+                """
+                SELECT COALESCE(SUM(pg_total_relation_size(c.oid)), 0)
+                FROM pg_class c
+                JOIN pg_namespace n ON n.oid = c.relnamespace
+                WHERE n.nspname = :schema AND c.relkind IN ('r', 'm')
+                """
+            ),
+            {"schema": schema_name},
+        ).scalar())
+
+
+def influx_size(bucket_id):
+    """
+    Returns the bytes a bucket uses on disk (TSM shards and WAL), from the
+    server's Prometheus metrics, or None when they are not available.
+    """
+    try:
+        with urllib.request.urlopen(f"{INFLUX_URL}/metrics", timeout=10) as response:
+            metrics = response.read().decode()
+    except OSError:
+        return None
+
+    total = 0.0
+    pattern = re.compile(r'^storage_(?:shard_disk_size|wal_size)\{[^}]*bucket="' + re.escape(bucket_id) + r'"[^}]*\}\s+(\S+)$')
+    for line in metrics.splitlines():
+        match = pattern.match(line)
+        if match:
+            total += float(match.group(1))
+    return int(total)
+
+
+def last_run(history_path):
+    with open(history_path) as file:
+        return json.load(file)[-1]
+
+
+def load_result(path):
+    """
+    Reads a report result written by a benchmark_queries.py, with NUMERIC
+    columns (Decimal) as floats.
+    """
+    df = pd.read_parquet(path)
+    for column in df.columns:
+        if df[column].dtype == object and df[column].map(lambda value: isinstance(value, Decimal)).any():
+            df[column] = df[column].astype("float64")
+    return df
+
+
+def compare_results(postgres, influx, tolerance=DEFAULT_TOLERANCE):
+    """
+    Checks that two results of the same report agree: the same columns and
+    rows, equal text and dates, and numbers within `tolerance`.
+
+    Rows are matched after sorting both results by every column, text and
+    integer columns first, so float noise does not change the order.
+
+    Returns:
+        dict: match (bool), rows of each backend, the largest absolute
+        numeric difference and, when they differ, the reason.
+    """
+    result = {"match": False, "postgres_rows": len(postgres), "influxdb_rows": len(influx), "max_abs_diff": None}
+
+    if sorted(postgres.columns) != sorted(influx.columns):
+        result["reason"] = f"columns differ: {sorted(postgres.columns)} vs {sorted(influx.columns)}"
+        return result
+    if len(postgres) != len(influx):
+        result["reason"] = "row counts differ"
+        return result
+    if not len(postgres):
+        # Usually sessions or drivers that are not in the dataset
+        result["reason"] = "both results are empty"
+        return result
+
+    floats = [column for column in postgres.columns if pd.api.types.is_float_dtype(postgres[column]) or pd.api.types.is_float_dtype(influx[column])]
+    others = [column for column in postgres.columns if column not in floats]
+    order = others + floats
+
+    postgres = postgres[order].sort_values(order, ignore_index=True)
+    influx = influx[order].astype(postgres.dtypes.to_dict()).sort_values(order, ignore_index=True)
+
+    for column in others:
+        if not postgres[column].equals(influx[column]):
+            result["reason"] = f"values of {column} differ"
+            return result
+
+    differences = [np.abs(postgres[column].to_numpy() - influx[column].to_numpy()) for column in floats]
+    result["max_abs_diff"] = float(max((np.nanmax(diff) for diff in differences if diff.size), default=0.0))
+    for column in floats:
+        if not np.allclose(postgres[column], influx[column], rtol=1e-6, atol=tolerance, equal_nan=True):
+            result["reason"] = f"values of {column} differ by more than {tolerance}"
+            return result
+
+    result["match"] = True
+    return result
+
+
+def comparison_table(comparison):
+    """
+    Builds the side-by-side table: ingestion, size on disk and, for each
+    report, the latency percentiles of both backends and whether they agree.
+    """
+    rows = []
+    ingest = comparison["ingest"]
+    if ingest:
+        rows.append([
+            "ingest rows/s",
+            f"{ingest['postgres']['rows_per_second']:,.0f}",
+            f"{ingest['influxdb']['rows_per_second']:,.0f}",
+            f"{ingest['postgres']['seconds']:.1f}s vs {ingest['influxdb']['seconds']:.1f}s, {ingest['rows']:,} rows",
+        ])
+
+    sizes = comparison["size_bytes"]
+    rows.append([
+        "size on disk MB",
+        f"{sizes['postgres'] / 2**20:,.1f}",
+        f"{sizes['influxdb'] / 2**20:,.1f}" if sizes["influxdb"] is not None else "n/a",
+        "",
+    ])
+
+    for report in comparison["reports"]:
+        for percentile in ("p50", "p95", "p99"):
+            rows.append([
+                f"{report['report']} {percentile} ms",
+                f"{report['postgres_ms'][percentile]:,.1f}",
+                f"{report['influxdb_ms'][percentile]:,.1f}",
+                "" if percentile != "p50" else ("results match" if report["check"]["match"] else report["check"]["reason"]),
+            ])
+
+    return tabulate(rows, headers=["metric", "postgres", "influxdb", "notes"], tablefmt="github", disable_numparse=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Loads the same dataset into PostgreSQL (project1) and InfluxDB (project2) and compares ingestion, size and the reports."
+    )
+    parser.add_argument("--schema", default=DEFAULT_SCHEMA, help="PostgreSQL schema (recreated by the load).")
+    parser.add_argument("--bucket", default=DEFAULT_BUCKET, help="InfluxDB bucket (recreated by the load).")
+    parser.add_argument("--skip-load", action="store_true", help="Compare the data already loaded.")
+    parser.add_argument("--reports", nargs="+", choices=REPORTS, default=list(REPORTS), help="Reports to compare.")
+    parser.add_argument("--warmup", type=int, default=2, help="Unmeasured runs of each report.")
+    parser.add_argument("--repetitions", type=int, default=10, help="Measured runs of each report.")
+    parser.add_argument("--session-keys", help="Sessions for reports 2, 4 and 5, e.g. 9998,10006 or all.")
+    parser.add_argument("--driver-numbers", help="Drivers for reports 2, 4 and 5, e.g. 1,30 or all.")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="Largest accepted difference between numbers.")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="Directory of the results and the comparison table.")
+    args = parser.parse_args()
+
+    workdir = os.getcwd()
+    output = os.path.abspath(args.output)
+    os.makedirs(output, exist_ok=True)
+
+    env = dotenv_values(".env.local")
+    engine = create_engine(env["DATABASE_URL"])
+
+    with InfluxDBClient(url=INFLUX_URL, token=env["INFLUXDB_TOKEN"], org=INFLUX_ORG) as client:
+        ingest = None
+        if not args.skip_load:
+            rows = source_rows(os.path.join(workdir, "data"))
+
+            run_module("postgres", "create_table", [args.schema], workdir)
+            postgres_seconds = run_module("postgres", "insert_data", [args.schema], workdir)
+
+            recreate_bucket(client, args.bucket)
+            influx_seconds = run_module("influxdb", "insert_data", ["--buckets", args.bucket], workdir)
+
+            ingest = {
+                "rows": rows,
+                "postgres": {"seconds": postgres_seconds, "rows_per_second": rows / postgres_seconds},
+                "influxdb": {"seconds": influx_seconds, "rows_per_second": rows / influx_seconds},
+            }
+
+        bucket = client.buckets_api().find_bucket_by_name(args.bucket)
+        sizes = {
+            "postgres": postgres_size(engine, args.schema),
+            "influxdb": influx_size(bucket.id) if bucket is not None else None,
+        }
+
+    common = ["--reports", *args.reports, "--warmup", str(args.warmup), "--repetitions", str(args.repetitions)]
+    if args.session_keys is not None:
+        common += ["--session-keys", args.session_keys]
+    if args.driver_numbers is not None:
+        common += ["--driver-numbers", args.driver_numbers]
+
+    histories = {backend: os.path.join(output, f"{backend}_history.json") for backend in PROJECTS}
+    run_module(
+        "postgres",
+        "benchmark_queries",
+        [args.schema, *common, "--history", histories["postgres"], "--results-dir", os.path.join(output, "postgres")],
+        workdir,
+    )
+    run_module(
+        "influxdb",
+        "benchmark_queries",
+        ["--bucket", args.bucket, *common, "--history", histories["influxdb"], "--results-dir", os.path.join(output, "influxdb")],
+        workdir,
+    )
+    runs = {backend: {result["report"]: result for result in last_run(path)["results"]} for backend, path in histories.items()}
+
+    reports = []
+    for name in args.reports:
+        check = compare_results(
+            load_result(os.path.join(output, "postgres", f"{name}.parquet")),
+            load_result(os.path.join(output, "influxdb", f"{name}.parquet")),
+            args.tolerance,
+        )
+        reports.append({
+            "report": name,
+            "postgres_ms": runs["postgres"][name]["total_ms"],
+            "influxdb_ms": runs["influxdb"][name]["total_ms"],
+            "check": check,
+        })
+
+    comparison = {
+        "started_at": datetime.now().isoformat(timespec="seconds"),
+        "schema": args.schema,
+        "bucket": args.bucket,
+        "ingest": ingest,
+        "size_bytes": sizes,
+        "reports": reports,
+    }
+    table = comparison_table(comparison)
+    print()
+    print(table)
+
+    with open(os.path.join(output, "comparison.json"), "w") as file:
+        json.dump(comparison, file, indent=2)
+    with open(os.path.join(output, "comparison.md"), "w") as file:
+        file.write(table + "\n")
+    print(f"\nComparison saved to {output}.")
+
+    mismatches = [report["report"] for report in reports if not report["check"]["match"]]
+    if mismatches:
+        print(f"Results differ between the backends: {', '.join(mismatches)}")
+        sys.exit(1)
@@ -0,0 +1,18 @@
+def parse_numbers(value: str):
+    """
+    Parses a comma separated list of session keys or driver numbers, as
+    typed on the command line or at a prompt. Shared by app.py, the
+    benchmarks and project2's scripts, so it must not import anything with
+    side effects.
+
+    @params:
+        - value: str (e.g. "9998, 10006"; "all" or "*" selects every value)
+
+    @returns:
+        - numbers: tuple[int] | None (None for every value)
+    """
+
+    if value.strip().lower() in ("all", "*"):
+        return None
+
+    return tuple(int(number) for number in value.split(",") if number.strip())
@@ -0,0 +1,372 @@
+import os
+import numpy as np
+import pandas as pd
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from src.scripts.sectors import LAP_COLUMNS, assign_lap_sectors
+
+DATA_DIR = "./data"
+
+TELEMETRY_COLUMNS = ["session_key", "driver_number", "date", "brake", "drs", "n_gear", "rpm", "speed", "throttle"]
+
+
+class ParquetSource:
+    """
+    In-process replacement for the SQLAlchemy engine: reads the `data/`
+    parquet tree with the same cleaning insert_data.py applies before loading,
+    and keeps every table in memory once read.
+
+    The report functions of this module take it as their `engine` argument,
+    so they can be called exactly like the ones in queries.py.
+    """
+
+    def __init__(self, data_dir: str = DATA_DIR):
+        self.data_dir = data_dir
+        self._tables = {}
+
+    def _read(self, name: str, columns=None, filters=None):
+        return pq.read_table(os.path.join(self.data_dir, name), columns=columns, filters=filters)
+
+    def table(self, name: str) -> pd.DataFrame:
+        """
+        Returns one of the small tables, cleaned as insert_data.py does.
+
+        @params:
+            - name: str (drivers, sessions, laps, tyre_stints or weather_conditions)
+
+        @returns:
+            - table_data: pd.DataFrame
+        """
+
+        if name not in self._tables:
+            self._tables[name] = getattr(self, f"_load_{name}")()
+
+        return self._tables[name]
+
+    def _load_drivers(self):
+        return self._read("drivers/drivers.parquet").to_pandas().drop(columns=["meeting_key"])
+
+    def _load_sessions(self):
+        return self._read("sessions/sessions.parquet").to_pandas()
+
+    def _load_laps(self):
+        return self._read("laps/laps.parquet").to_pandas().drop(
+            columns=["meeting_key", "segments_sector_1", "segments_sector_2", "segments_sector_3"]
+        )
+
+    def _load_tyre_stints(self):
+        df_stints = self._read("stints/stints.parquet").to_pandas().drop(columns=["meeting_key"])
+        return df_stints.drop_duplicates(subset=["session_key", "stint_number", "driver_number"])
+
+    def _load_weather_conditions(self):
+        table = self._read("weather_conditions/weather_conditions.parquet")
+        sessions = self._read("sessions/sessions.parquet", columns=["session_key"]).column("session_key")
+        table = table.filter(pc.is_in(table.column("session_key"), value_set=sessions.combine_chunks()))
+
+        df_weather = table.to_pandas().drop(columns=["meeting_key"])
+        df_weather = df_weather.drop_duplicates(subset=["session_key", "date"])
+        df_weather["rainfall"] = df_weather["rainfall"].astype(bool)
+        return df_weather
+
+    def telemetry(self, session_keys=None, driver_numbers=None) -> pd.DataFrame:
+        """
+        Reads the telemetry files, pushing the session/driver filters down to
+        the parquet reader, and tags every sample with its lap_number and
+        sector as the loader does.
+
+        @params:
+            - session_keys: Iterable[int] | None (None reads every session)
+            - driver_numbers: Iterable[int] | None (None reads every driver)
+
+        @returns:
+            - table_data: pd.DataFrame
+        """
+
+        key = (
+            None if session_keys is None else tuple(sorted(session_keys)),
+            None if driver_numbers is None else tuple(sorted(driver_numbers)),
+        )
+        cache_key = ("telemetry", key)
+
+        if cache_key not in self._tables:
+            filters = []
+            if session_keys is not None:
+                filters.append(("session_key", "in", list(key[0])))
+            if driver_numbers is not None:
+                filters.append(("driver_number", "in", list(key[1])))
+
+            path_telemetrys = os.path.join(self.data_dir, "telemetrys")
+            frames = [
+                self._read(
+                    os.path.join("telemetrys", file),
+                    columns=TELEMETRY_COLUMNS,
+                    filters=filters or None,
+                ).to_pandas()
+                for file in sorted(os.listdir(path_telemetrys))
+                if file.endswith(".parquet")
+            ]
+            df_telemetry = pd.concat(frames, ignore_index=True)
+            df_telemetry = df_telemetry.drop_duplicates(subset=["session_key", "driver_number", "date"])
+
+            self._tables[cache_key] = assign_lap_sectors(df_telemetry, self.table("laps")[LAP_COLUMNS])
+
+        return self._tables[cache_key]
+
+
+def sector_labels(sector: pd.Series, prefix: str) -> pd.Series:
+    """
+    Formats the numeric sector as the reports do in SQL ('SECTOR ' || sector).
+    """
+
+    return prefix + sector.astype("int64").astype(str)
+
+
+def get_all_drivers(schema_name, engine: ParquetSource) -> pd.DataFrame:
+    """
+    Same as queries.get_all_drivers, computed from the parquet files.
+    """
+
+    df_drivers = engine.table("drivers")[["driver_number", "full_name", "country_code", "team_name"]]
+    df_drivers = df_drivers.dropna(subset=["full_name", "country_code", "team_name"]).drop_duplicates()
+
+    return df_drivers.sort_values(["driver_number", "full_name", "country_code", "team_name"]).reset_index(drop=True)
+
+
+def first_query(schema_name, engine: ParquetSource) -> pd.DataFrame:
+    """
+    Same as queries.first_query, computed from the parquet files: average
+    speed per sector on the fastest lap of every driver in each race.
+    """
+
+    df_sessions = engine.table("sessions")
+    race_sessions = df_sessions.loc[df_sessions["session_name"] == "Race", "session_key"]
+
+    df_laps = engine.table("laps")
+    df_laps = df_laps[df_laps["session_key"].isin(race_sessions) & df_laps["lap_duration"].notna()]
+    best_laps = df_laps.loc[
+        df_laps.groupby(["session_key", "driver_number"])["lap_duration"].idxmin(),
+        ["session_key", "driver_number", "lap_number", "lap_duration"],
+    ]
+
+    df_telemetry = engine.telemetry(session_keys=best_laps["session_key"].unique())
+    df_telemetry = df_telemetry[df_telemetry["sector"].notna()]
+
+    df_join = df_telemetry.merge(best_laps, on=["session_key", "driver_number", "lap_number"])
+    df_join["sector"] = sector_labels(df_join["sector"], "SECTOR ")
+
+    result = (
+        df_join.groupby(["session_key", "driver_number", "lap_duration", "sector"], as_index=False)
+        .agg(max_speed=("speed", "mean"))
+        .sort_values(["session_key", "driver_number", "lap_duration", "sector"])
+    )
+
+    return result.reset_index(drop=True)
+
+
+def second_query(schema_name, engine: ParquetSource, session_keys=(9998,), driver_numbers=None) -> pd.DataFrame:
+    """
+    Same as queries.second_query, computed from the parquet files: average
+    instantaneous acceleration per sector, from the lagged speed and time of
+    each driver's samples.
+    """
+
+    df_telemetry = engine.telemetry(session_keys=session_keys, driver_numbers=driver_numbers)
+    df_telemetry = df_telemetry.sort_values(["session_key", "driver_number", "date"])
+
+    keys = df_telemetry[["session_key", "driver_number"]].to_numpy()
+    speed = df_telemetry["speed"].to_numpy(dtype="float64")
+    date = df_telemetry["date"].to_numpy()
+
+    same_driver = np.zeros(len(df_telemetry), dtype=bool)
+    same_driver[1:] = (keys[1:] == keys[:-1]).all(axis=1)
+
+    delta_time = np.full(len(df_telemetry), np.nan)
+    delta_time[1:] = (date[1:] - date[:-1]) / np.timedelta64(1, "s")
+    delta_speed = np.full(len(df_telemetry), np.nan)
+    delta_speed[1:] = speed[1:] - speed[:-1]
+    delta_time[~same_driver] = np.nan
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        acceleration = np.where(
+            delta_time > 0,
+            (delta_speed / 3.6) / delta_time,
+            np.where(delta_time == 0, 0.0, np.nan),
+        )
+
+    df_telemetry = df_telemetry.assign(aceleracaomediaporsetor=acceleration)
+    df_telemetry = df_telemetry[df_telemetry["sector"].notna()]
+    df_telemetry["sector"] = sector_labels(df_telemetry["sector"], "SECTOR ")
+
+    result = (
+        df_telemetry.groupby(["driver_number", "session_key", "sector"], as_index=False)
+        .agg(aceleracaomediaporsetor=("aceleracaomediaporsetor", "mean"))
+        .sort_values(["aceleracaomediaporsetor", "driver_number"], ascending=[False, True], na_position="first")
+    )
+
+    return result.reset_index(drop=True)
+
+
+def third_query(schema_name, engine: ParquetSource) -> pd.DataFrame:
+    """
+    Same as queries.third_query, computed from the parquet files.
+
+    The SQL joins every stint with every weather sample of its session; the
+    average it produces is rebuilt here from per-session sums and counts
+    instead of materializing that product.
+    """
+
+    df_stints = engine.table("tyre_stints")
+    df_weather = engine.table("weather_conditions")
+
+    weather = df_weather.groupby("session_key").agg(
+        temp_sum=("track_temperature", "sum"),
+        temp_count=("track_temperature", "count"),
+    )
+    df_join = df_stints.merge(weather, left_on="session_key", right_index=True)
+    df_join["lap_span"] = df_join["lap_end"] - df_join["lap_start"]
+
+    result = df_join.groupby("compound", dropna=False).agg(
+        temp_sum=("temp_sum", "sum"),
+        temp_count=("temp_count", "sum"),
+        maxlapdurationtyre=("lap_span", "max"),
+    )
+    result["temperaturamediapista"] = (result["temp_sum"] / result["temp_count"]).round(2)
+
+    result = result.reset_index().rename(columns={"compound": "compostopneu"})
+    result = result[["compostopneu", "temperaturamediapista", "maxlapdurationtyre"]]
+
+    return result.sort_values("maxlapdurationtyre", ascending=False, na_position="first").reset_index(drop=True)
+
+
+def fourth_query(schema_name, engine: ParquetSource, session_keys=(9998,), driver_numbers=(30,)) -> pd.DataFrame:
+    """
+    Same as queries.fourth_query, computed from the parquet files: segments
+    the samples of each driver into runs of constant DRS, braking and sector
+    state, and reports the speed at the start and end of every run.
+    """
+
+    df_telemetry = engine.telemetry(session_keys=session_keys, driver_numbers=driver_numbers)
+    df_telemetry = df_telemetry[df_telemetry["sector"].notna()]
+    df_telemetry = df_telemetry.sort_values(["session_key", "driver_number", "date"]).reset_index(drop=True)
+
+    df_telemetry["usofreio"] = np.where(df_telemetry["brake"] == 100, "FREANDO", "NORMAL")
+    df_telemetry["drs"] = np.where(df_telemetry["drs"].isin([8, 10, 12, 14]), "ATIVO", "NÃO ATIVO")
+    df_telemetry["setor"] = sector_labels(df_telemetry["sector"], "SETOR ")
+
+    state = df_telemetry[["session_key", "driver_number", "drs", "setor", "usofreio"]].to_numpy()
+    changed = np.ones(len(df_telemetry), dtype=bool)
+    changed[1:] = (state[1:] != state[:-1]).any(axis=1)
+
+    starts = np.flatnonzero(changed)
+    ends = np.append(starts[1:], len(df_telemetry)) - 1
+
+    runs = df_telemetry.loc[starts, ["session_key", "driver_number", "drs", "setor", "usofreio"]].reset_index(drop=True)
+    runs["tempoinicio"] = df_telemetry["date"].to_numpy()[starts]
+    runs["tempofim"] = df_telemetry["date"].to_numpy()[ends]
+    runs["velocidadeinicio"] = df_telemetry["speed"].to_numpy()[starts]
+    runs["velocidadefim"] = df_telemetry["speed"].to_numpy()[ends]
+
+    runs = runs.merge(engine.table("drivers")[["session_key", "driver_number", "full_name"]], on=["session_key", "driver_number"])
+    runs = runs.merge(engine.table("sessions")[["session_key", "circuit_short_name"]], on="session_key")
+    runs = runs.rename(columns={"circuit_short_name": "nomepista", "full_name": "nomepiloto"})
+
+    return runs[[
+        "nomepista",
+        "nomepiloto",
+        "tempoinicio",
+        "tempofim",
+        "drs",
+        "setor",
+        "usofreio",
+        "velocidadeinicio",
+        "velocidadefim",
+    ]].sort_values("tempoinicio").reset_index(drop=True)
+
+
+def fifth_query(schema_name, engine: ParquetSource, session_keys=(9998,), driver_numbers=None) -> pd.DataFrame:
+    """
+    Same as queries.fifth_query, computed from the parquet files.
+
+    Like third_query, the weights the SQL join gives each session (one copy
+    of every telemetry row per weather sample) are applied to per-session
+    sums instead of building the product.
+    """
+
+    df_telemetry = engine.telemetry(session_keys=session_keys, driver_numbers=driver_numbers)
+    telemetry = df_telemetry.groupby(["session_key", "driver_number"]).agg(
+        rows=("date", "size"),
+        speed_sum=("speed", "sum"),
+        speed_count=("speed", "count"),
+        throttle_sum=("throttle", "sum"),
+        throttle_count=("throttle", "count"),
+    ).reset_index()
+
+    weather = engine.table("weather_conditions").groupby("session_key").agg(
+        samples=("date", "size"),
+        temp_sum=("track_temperature", "sum"),
+        temp_count=("track_temperature", "count"),
+    ).reset_index()
+
+    df_join = telemetry.merge(weather, on="session_key")
+    df_join = df_join.merge(engine.table("drivers")[["session_key", "driver_number", "full_name"]], on=["session_key", "driver_number"])
+    df_join = df_join.merge(engine.table("sessions")[["session_key", "circuit_short_name"]], on="session_key")
+
+    weighted = pd.DataFrame({
+        "nomecircuito": df_join["circuit_short_name"],
+        "nomedopiloto": df_join["full_name"],
+        "speed_sum": df_join["speed_sum"] * df_join["samples"],
+        "speed_count": df_join["speed_count"] * df_join["samples"],
+        "throttle_sum": df_join["throttle_sum"] * df_join["samples"],
+        "throttle_count": df_join["throttle_count"] * df_join["samples"],
+        "temp_sum": df_join["temp_sum"] * df_join["rows"],
+        "temp_count": df_join["temp_count"] * df_join["rows"],
+    })
+    totals = weighted.groupby(["nomecircuito", "nomedopiloto"], dropna=False).sum()
+
+    result = pd.DataFrame({
+        "velocidademediapiloto": (totals["speed_sum"] / totals["speed_count"]).round(2),
+        "consumopotenciamediamotor": (totals["throttle_sum"] / totals["throttle_count"]).round(2),
+        "temperaturamediapista": (totals["temp_sum"] / totals["temp_count"]).round(2),
+    })
+
+    return result.reset_index().sort_values(["nomecircuito", "nomedopiloto"]).reset_index(drop=True)
+
+
+def results_match(expected: pd.DataFrame, actual: pd.DataFrame, atol: float = 0.01) -> bool:
+    """
+    Checks whether two report results hold the same rows, ignoring row order,
+    NUMERIC/float differences and rounding up to `atol`.
+
+    @params:
+        - expected: pd.DataFrame (e.g. from queries.py)
+        - actual: pd.DataFrame (e.g. from this module)
+        - atol: float
+
+    @returns:
+        - match: bool
+    """
+
+    if list(expected.columns) != list(actual.columns) or len(expected) != len(actual):
+        return False
+
+    def normalize(df):
+        df = df.copy()
+        for column in df.columns:
+            if df[column].dtype == object:
+                numeric = pd.to_numeric(df[column], errors="coerce")
+                if numeric.notna().sum() == df[column].notna().sum():
+                    df[column] = numeric.astype("float64")
+        return df.sort_values(list(df.columns), na_position="first").reset_index(drop=True)
+
+    expected, actual = normalize(expected), normalize(actual)
+
+    for column in expected.columns:
+        left, right = expected[column], actual[column]
+        if pd.api.types.is_numeric_dtype(left) and pd.api.types.is_numeric_dtype(right):
+            if not np.allclose(left.to_numpy(dtype="float64"), right.to_numpy(dtype="float64"), atol=atol, equal_nan=True):
+                return False
+        elif not left.isna().equals(right.isna()) or not left[left.notna()].astype(str).equals(right[right.notna()].astype(str)):
+            return False
+
+    return True
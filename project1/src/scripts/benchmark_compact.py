@@ -0,0 +1,157 @@
+import argparse
+from datetime import datetime
+
+from sqlalchemy import create_engine, text
+
+from src.scripts import insert_data, queries
+from src.scripts.arguments import parse_numbers
+from src.scripts.benchmark_load import dataset_fingerprint, git_commit, load_history, run_config, save_history
+from src.scripts.benchmark_queries import PARAMETRIZED_REPORTS, REPORTS
+from src.scripts.create_table import TABLES
+
+DEFAULT_HISTORY = "./benchmarks/compact_history.json"
+
+# The default profile keeps the types of TABLES and pandas' default dtypes;
+# the compact one uses COMPACT_TYPES and compact.py on both sides
+PROFILES = {"default": False, "compact": True}
+
+def relation_sizes(schema_name, engine):
+    """
+    Returns the bytes of every table of a schema, split into heap (with
+    TOAST) and indexes.
+
+    Returns:
+        dict: Table name -> {"table": bytes, "indexes": bytes}.
+    """
+    query = text("""
+        SELECT c.relname, pg_table_size(c.oid), pg_indexes_size(c.oid)
+        FROM pg_class c
+        JOIN pg_namespace n ON n.oid = c.relnamespace
+        WHERE n.nspname = :schema_name AND c.relkind = 'r' AND c.relname = ANY(:tables)
+    """)
+    with engine.connect() as conn:
+        rows = conn.execute(query, {"schema_name": schema_name, "tables": list(TABLES)}).fetchall()
+    return {name: {"table": table, "indexes": indexes} for name, table, indexes in rows}
+
+def result_sizes(schema_name, engine, reports, parameters):
+    """
+    Runs every report once and returns the memory its result DataFrame
+    takes, with the COMPACT_RESULTS setting in effect.
+
+    Returns:
+        dict: Report name -> bytes (DataFrame.memory_usage(deep=True)).
+    """
+    sizes = {}
+    for name in reports:
+        kwargs = parameters if name in PARAMETRIZED_REPORTS else {}
+        table_data = getattr(queries, name)(schema_name, engine, **kwargs)
+        sizes[name] = int(table_data.memory_usage(deep=True).sum())
+    return sizes
+
+def run_profile(schema_name, engine, compact, workers, reports, parameters):
+    """
+    Loads the dataset with one profile and measures it.
+
+    Args:
+        schema_name (str): Schema to (re)create; its tables are dropped.
+        engine (sqlalchemy.engine.Engine): SQLAlchemy engine.
+        compact (bool): Use the compact profile (schema types, loader and
+            report dtypes).
+        workers (int): Telemetry worker processes.
+        reports (list[str]): Reports whose result sizes are measured.
+        parameters (dict): Sessions and drivers of the parametrized reports.
+
+    Returns:
+        dict: load (the run_config result), sizes (relation_sizes) and
+        results (result_sizes).
+    """
+    insert_data.COMPACT_DTYPES = compact
+    queries.COMPACT_RESULTS = compact
+
+    return {
+        "load": run_config(schema_name, engine, workers, insert_data.COPY_CHUNKSIZE, compact=compact),
+        "sizes": relation_sizes(schema_name, engine),
+        "results": result_sizes(schema_name, engine, reports, parameters),
+    }
+
+def comparison_rows(profiles):
+    """
+    Builds the (metric, default, compact) rows of the comparison: the size
+    of every table and of its indexes in MB, the peak memory of every load
+    step in MB and the size of every report result in KB.
+    """
+    default, compact = profiles["default"], profiles["compact"]
+    rows = []
+
+    for table_name in TABLES:
+        if table_name in default["sizes"] and table_name in compact["sizes"]:
+            for part in ("table", "indexes"):
+                rows.append((
+                    f"{table_name} {part} MB",
+                    default["sizes"][table_name][part] / 1024 ** 2,
+                    compact["sizes"][table_name][part] / 1024 ** 2,
+                ))
+
+    compact_steps = {step["step"]: step for step in compact["load"]["steps"]}
+    for step in default["load"]["steps"]:
+        if step["step"] in compact_steps:
+            rows.append((f"{step['step']} load rss MB", step["peak_rss_mb"], compact_steps[step["step"]]["peak_rss_mb"]))
+
+    for name, size in default["results"].items():
+        rows.append((f"{name} result KB", size / 1024, compact["results"][name] / 1024))
+
+    return rows
+
+def print_comparison(rows):
+    """
+    Prints the comparison rows with the relative change of each metric.
+    """
+    print(f"\n{'metric':<42}{'default':>12}{'compact':>12}{'change':>10}")
+    for metric, default, compact in rows:
+        change = f"{compact / default - 1:+.1%}" if default else ""
+        print(f"{metric:<42}{default:>12.2f}{compact:>12.2f}{change:>10}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Loads the dataset with the default and the compact type profile and compares sizes and memory."
+    )
+    parser.add_argument(
+        "schema_name",
+        nargs="?",
+        default="bench_types",
+        help="Prefix of the schemas the benchmark recreates (<prefix>_default, <prefix>_compact).",
+    )
+    parser.add_argument("--workers", type=int, default=4, help="Telemetry worker processes.")
+    parser.add_argument("--reports", nargs="+", choices=REPORTS, default=list(REPORTS), help="Reports to measure.")
+    parser.add_argument("--session-keys", help="Sessions for reports 2, 4 and 5, e.g. 9998,10006 or all.")
+    parser.add_argument("--driver-numbers", help="Drivers for reports 2, 4 and 5, e.g. 1,30 or all.")
+    parser.add_argument("--history", default=DEFAULT_HISTORY, help="JSON file with the previous runs.")
+    parser.add_argument("--label", help="Free text stored with the run (e.g. what changed).")
+    args = parser.parse_args()
+
+    parameters = {}
+    if args.session_keys is not None:
+        parameters["session_keys"] = parse_numbers(args.session_keys)
+    if args.driver_numbers is not None:
+        parameters["driver_numbers"] = parse_numbers(args.driver_numbers)
+
+    engine = create_engine(insert_data.DATABASE_URL)
+    profiles = {
+        profile: run_profile(f"{args.schema_name}_{profile}", engine, compact, args.workers, args.reports, parameters)
+        for profile, compact in PROFILES.items()
+    }
+    rows = comparison_rows(profiles)
+    print_comparison(rows)
+
+    history = load_history(args.history)
+    history.append({
+        "label": args.label,
+        "started_at": datetime.now().isoformat(timespec="seconds"),
+        "commit": git_commit(),
+        "dataset": dataset_fingerprint(),
+        "parameters": parameters,
+        "profiles": profiles,
+        "comparison": [{"metric": metric, "default": default, "compact": compact} for metric, default, compact in rows],
+    })
+    save_history(args.history, history)
+    print(f"\nRun saved to {args.history}.")
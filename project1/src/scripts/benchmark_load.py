@@ -0,0 +1,441 @@
+import argparse
+import hashlib
+import json
+import os
+import subprocess
+import threading
+import time
+from datetime import datetime
+
+import psutil
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import DBAPIError
+
+from src.scripts import insert_data
+from src.scripts.create_table import build_constraints, build_schema_sql, run_schema_sql
+
+DEFAULT_HISTORY = "./benchmarks/load_history.json"
+DEFAULT_THRESHOLD = 0.10
+
+# Steps faster than this are too noisy to be flagged as regressions
+MIN_STEP_SECONDS = 0.5
+RSS_INTERVAL = 0.05
+
+POSTGRES_SETTINGS = (
+    "shared_buffers",
+    "synchronous_commit",
+    "work_mem",
+    "maintenance_work_mem",
+    "max_wal_size",
+    "max_connections",
+)
+
+class PeakRss:
+    """
+    Samples, on a background thread, the resident memory of this process and
+    of its children (the telemetry workers), and keeps the peak.
+    """
+
+    def __init__(self, interval=RSS_INTERVAL):
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+
+    def _rss(self):
+        process = psutil.Process()
+        total = process.memory_info().rss
+        for child in process.children(recursive=True):
+            try:
+                total += child.memory_info().rss
+            except psutil.Error:
+                pass
+        return total
+
+    def _sample(self):
+        while not self._stop.is_set():
+            self.peak = max(self.peak, self._rss())
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, self._rss())
+
+def dataset_fingerprint(data_dir="./data"):
+    """
+    Identifies the dataset a run loaded, so runs are only compared with runs
+    over the same files.
+
+    Args:
+        data_dir (str): Root of the parquet dataset.
+
+    Returns:
+        dict: files, bytes and a digest of every file path and size.
+    """
+    digest = hashlib.sha256()
+    files = total = 0
+    for root, dirs, names in os.walk(data_dir):
+        dirs.sort()
+        for name in sorted(names):
+            path = os.path.join(root, name)
+            size = os.path.getsize(path)
+            digest.update(f"{os.path.relpath(path, data_dir)}:{size}\n".encode())
+            files += 1
+            total += size
+
+    return {"files": files, "bytes": total, "digest": digest.hexdigest()[:16]}
+
+def postgres_settings(engine):
+    """
+    Returns the PostgreSQL settings that affect load throughput.
+
+    Args:
+        engine (sqlalchemy.engine.Engine): SQLAlchemy engine.
+
+    Returns:
+        dict: Setting name -> value (as SHOW prints it), plus the server
+        version.
+    """
+    with engine.connect() as conn:
+        return {
+            name: conn.execute(text(f"SHOW {name}")).scalar()
+            for name in (*POSTGRES_SETTINGS, "server_version")
+        }
+
+def git_commit():
+    """
+    Returns the commit of the code being benchmarked, or None outside a git
+    checkout.
+    """
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout.strip()
+
+def checkpoint(engine):
+    """
+    Flushes dirty buffers before a run so it does not pay for the previous
+    one. Needs superuser (or pg_checkpoint); skipped otherwise.
+    """
+    try:
+        with engine.connect() as conn:
+            conn.execute(text("CHECKPOINT"))
+    except DBAPIError:
+        pass
+
+def measure_step(name, run, source_bytes):
+    """
+    Runs one load step and measures it.
+
+    The time split comes from insert_data.STAGE_SECONDS: parquet reads and
+    transfers to PostgreSQL are timed where they happen, and the rest of the
+    wall time is pandas transformation. Steps run by the telemetry workers
+    report busy time summed over the workers, which is scaled down to the
+    wall time of the step.
+
+    Args:
+        name (str): Name of the step (usually the table it loads).
+        run (callable): Runs the step and returns the number of rows loaded.
+        source_bytes (int): Size on disk of the files the step reads.
+
+    Returns:
+        dict: rows, bytes, seconds, rows_per_second, mb_per_second,
+        peak_rss_mb and the read, transform and transfer seconds.
+    """
+    before = dict(insert_data.STAGE_SECONDS)
+
+    with PeakRss() as rss:
+        start = time.perf_counter()
+        rows = run()
+        seconds = time.perf_counter() - start
+
+    stages = {stage: insert_data.STAGE_SECONDS[stage] - before[stage] for stage in before}
+    if stages["worker"] > 0:
+        scale = seconds / stages["worker"]
+        stages = {stage: value * scale for stage, value in stages.items()}
+
+    read = min(stages["read"], seconds)
+    transfer = min(stages["transfer"], seconds - read)
+
+    return {
+        "step": name,
+        "rows": rows,
+        "bytes": source_bytes,
+        "seconds": seconds,
+        "rows_per_second": rows / seconds if seconds > 0 else 0.0,
+        "mb_per_second": source_bytes / 1024 ** 2 / seconds if seconds > 0 else 0.0,
+        "peak_rss_mb": rss.peak / 1024 ** 2,
+        "read_seconds": read,
+        "transform_seconds": seconds - read - transfer,
+        "transfer_seconds": transfer,
+    }
+
+def run_config(schema_name, engine, workers, chunksize, method="copy", fast_load=False, batch_mb=64, compact=False):
+    """
+    Recreates the benchmark schema and loads the whole dataset into it with
+    one configuration, measuring every step.
+
+    Args:
+        schema_name (str): Schema to (re)create; its tables are dropped.
+        engine (sqlalchemy.engine.Engine): SQLAlchemy engine.
+        workers (int): Telemetry worker processes.
+        chunksize (int): Rows sent per COPY statement.
+        method (str): Load method, "copy" or "to_sql".
+        fast_load (bool): Create the tables without keys and build them at the
+            end, as a measured "constraints" step.
+        batch_mb (int): Size of the telemetry batches in MB.
+        compact (bool): Create the tables with the compact profile.
+
+    Returns:
+        dict: The configuration, its steps and the failed telemetry files.
+    """
+    run_schema_sql(build_schema_sql(schema_name, fast_load=fast_load, compact=compact), engine)
+    checkpoint(engine)
+    insert_data.COPY_CHUNKSIZE = chunksize
+
+    steps, failed = [], 0
+    for table_name, path, loader in insert_data.SOURCES:
+        steps.append(measure_step(
+            table_name,
+            lambda: insert_data.load_source(table_name, path, loader, schema_name, engine, method),
+            os.path.getsize(path),
+        ))
+
+        if table_name == "telemetrys_laps":
+            telemetry_dir = "./data/telemetrys"
+            loads = []
+
+            def load_telemetrys():
+                loads.extend(insert_data.generate_telemetrys(
+                    schema_name,
+                    method,
+                    workers=workers,
+                    batch_bytes=batch_mb * 1024 ** 2,
+                    chunksize=chunksize,
+                ))
+                return sum(load["rows"] for load in loads)
+
+            telemetry_bytes = sum(
+                os.path.getsize(os.path.join(telemetry_dir, f))
+                for f in os.listdir(telemetry_dir)
+                if f.endswith(".parquet")
+            )
+            steps.append(measure_step("telemetrys", load_telemetrys, telemetry_bytes))
+            failed = sum(load["status"] == "failed" for load in loads)
+
+    if fast_load:
+        steps.append(measure_step("constraints", lambda: build_constraints(schema_name, engine) or 0, 0))
+
+    return {
+        "workers": workers,
+        "chunksize": chunksize,
+        "method": method,
+        "fast_load": fast_load,
+        "batch_mb": batch_mb,
+        "compact": compact,
+        "compact_dtypes": insert_data.COMPACT_DTYPES,
+        "seconds": sum(step["seconds"] for step in steps),
+        "failed_files": failed,
+        "steps": steps,
+    }
+
+def config_key(result):
+    """
+    Returns the fields that must match for two results to be compared.
+    """
+    return (
+        tuple(result[field] for field in ("workers", "chunksize", "method", "fast_load", "batch_mb"))
+        + tuple(result.get(field, False) for field in ("compact", "compact_dtypes"))
+    )
+
+def find_baseline(history, result, dataset):
+    """
+    Returns the most recent result in the history with the same
+    configuration, over the same dataset.
+
+    Args:
+        history (list[dict]): Previous runs, oldest first.
+        result (dict): Result of run_config.
+        dataset (dict): dataset_fingerprint of the current run.
+
+    Returns:
+        dict | None: The baseline result, if any.
+    """
+    for run in reversed(history):
+        if run["dataset"]["digest"] != dataset["digest"]:
+            continue
+        for previous in run["results"]:
+            if config_key(previous) == config_key(result):
+                return previous
+    return None
+
+def compare_steps(result, baseline, threshold=DEFAULT_THRESHOLD):
+    """
+    Compares every step of a result with the same step of its baseline.
+
+    Steps that load rows are compared on rows/s; steps that do not (the
+    constraints build) on seconds. Steps that took less than
+    MIN_STEP_SECONDS in the baseline are compared but never flagged.
+
+    Args:
+        result (dict): Result of run_config.
+        baseline (dict | None): Result to compare with.
+        threshold (float): Relative slowdown above which a step regressed.
+
+    Returns:
+        dict: Step name -> {"change": relative change of the step speed
+        (negative is slower), "regression": bool}.
+    """
+    if baseline is None:
+        return {}
+
+    previous = {step["step"]: step for step in baseline["steps"]}
+    comparison = {}
+    for step in result["steps"]:
+        before = previous.get(step["step"])
+        if before is None or before["seconds"] <= 0 or step["seconds"] <= 0:
+            continue
+
+        if before["rows"] and step["rows"]:
+            change = step["rows_per_second"] / before["rows_per_second"] - 1
+        else:
+            change = before["seconds"] / step["seconds"] - 1
+
+        comparison[step["step"]] = {
+            "change": change,
+            "regression": change < -threshold and before["seconds"] >= MIN_STEP_SECONDS,
+        }
+
+    return comparison
+
+def print_result(result, comparison):
+    """
+    Prints the steps of a result as a table, with the change of each step
+    against the baseline.
+    """
+    print(
+        f"\nworkers={result['workers']} chunksize={result['chunksize']} method={result['method']} "
+        f"fast_load={result['fast_load']} batch_mb={result['batch_mb']} compact={result['compact']}: {result['seconds']:.2f}s"
+    )
+    print(
+        f"{'step':<20}{'rows':>12}{'seconds':>10}{'rows/s':>12}{'MB/s':>9}"
+        f"{'read':>8}{'transf.':>9}{'db':>8}{'rss MB':>9}{'change':>10}"
+    )
+    for step in result["steps"]:
+        change = comparison.get(step["step"])
+        flag = ""
+        if change is not None:
+            flag = f"{change['change']:+.1%}" + (" !" if change["regression"] else "")
+        print(
+            f"{step['step']:<20}{step['rows']:>12}{step['seconds']:>10.2f}{step['rows_per_second']:>12,.0f}"
+            f"{step['mb_per_second']:>9.1f}{step['read_seconds']:>8.2f}{step['transform_seconds']:>9.2f}"
+            f"{step['transfer_seconds']:>8.2f}{step['peak_rss_mb']:>9.0f}{flag:>10}"
+        )
+    if result["failed_files"]:
+        print(f"{result['failed_files']} telemetry files failed to load.")
+
+def load_history(path):
+    """
+    Reads the benchmark history, an empty list when the file does not exist.
+    """
+    if not os.path.exists(path):
+        return []
+    with open(path) as file:
+        return json.load(file)
+
+def save_history(path, history):
+    """
+    Writes the benchmark history, creating its directory if needed.
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as file:
+        json.dump(history, file, indent=2)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmarks insert_data.py and tracks its throughput over time.")
+    parser.add_argument(
+        "schema_name",
+        nargs="?",
+        default="bench",
+        help="Schema the benchmark recreates and loads (its tables are dropped).",
+    )
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4], help="Telemetry worker counts to run.")
+    parser.add_argument(
+        "--chunksizes",
+        type=int,
+        nargs="+",
+        default=[insert_data.COPY_CHUNKSIZE],
+        help="COPY chunk sizes (rows per statement) to run.",
+    )
+    parser.add_argument("--batch-mb", type=int, default=insert_data.TELEMETRY_BATCH_BYTES // 1024 ** 2)
+    parser.add_argument("--method", choices=insert_data.LOAD_METHODS, default="copy")
+    parser.add_argument("--fast-load", action="store_true", help="Create the tables without keys and time building them.")
+    parser.add_argument(
+        "--compact",
+        action="store_true",
+        help="Use the compact profile: narrower column types and compact loader dtypes.",
+    )
+    parser.add_argument("--history", default=DEFAULT_HISTORY, help="JSON file with the previous runs.")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help="Relative slowdown of a step, against the previous run, reported as a regression.",
+    )
+    parser.add_argument("--label", help="Free text stored with the run (e.g. what changed).")
+    args = parser.parse_args()
+
+    engine = create_engine(insert_data.DATABASE_URL)
+    insert_data.COMPACT_DTYPES = args.compact
+    history = load_history(args.history)
+    run = {
+        "label": args.label,
+        "started_at": datetime.now().isoformat(timespec="seconds"),
+        "commit": git_commit(),
+        "cpu_count": os.cpu_count(),
+        "settings": postgres_settings(engine),
+        "dataset": dataset_fingerprint(),
+        "results": [],
+    }
+
+    regressions = []
+    for workers in args.workers:
+        for chunksize in args.chunksizes:
+            result = run_config(
+                args.schema_name,
+                engine,
+                workers,
+                chunksize,
+                method=args.method,
+                fast_load=args.fast_load,
+                batch_mb=args.batch_mb,
+                compact=args.compact,
+            )
+            comparison = compare_steps(result, find_baseline(history, result, run["dataset"]), args.threshold)
+            print_result(result, comparison)
+
+            run["results"].append(result)
+            regressions += [
+                f"{step} (workers={workers}, chunksize={chunksize}): {change['change']:+.1%}"
+                for step, change in comparison.items()
+                if change["regression"]
+            ]
+
+    history.append(run)
+    save_history(args.history, history)
+    print(f"\nRun saved to {args.history}.")
+
+    if regressions:
+        raise SystemExit(f"Throughput regressions above {args.threshold:.0%}:\n" + "\n".join(regressions))
@@ -0,0 +1,358 @@
+import argparse
+import difflib
+import json
+import os
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import create_engine, text
+
+from src.scripts import queries
+from src.scripts.arguments import parse_numbers
+from src.scripts.benchmark_load import git_commit, load_history, postgres_settings, save_history
+
+DEFAULT_HISTORY = "./benchmarks/query_history.json"
+DEFAULT_WARMUP = 2
+DEFAULT_REPETITIONS = 10
+PERCENTILES = (50, 95, 99)
+
+# Every report of queries.py; the ones in PARAMETRIZED_REPORTS also take the
+# sessions and drivers to analyse.
+REPORTS = ("get_all_drivers", "first_query", "second_query", "third_query", "fourth_query", "fifth_query")
+PARAMETRIZED_REPORTS = ("second_query", "fourth_query", "fifth_query")
+
+class ProfilingSession:
+    """
+    Runs the reports on one reused connection, timing every query in two
+    parts, and can EXPLAIN the last query it ran.
+
+    The execute part is the time until the whole result is on the client:
+    the server plans and runs the query and libpq receives every row. The
+    fetch part is the time spent turning those rows into Python objects and
+    a DataFrame. Pass it as the `engine` of any report function.
+    """
+
+    def __init__(self, engine):
+        self.connection = engine.connect()
+        self.last = None
+
+    @contextmanager
+    def connect(self):
+        """
+        Yields the session's connection without closing it afterwards.
+        """
+        yield self.connection
+
+    def read_sql(self, query: str, params=None) -> pd.DataFrame:
+        """
+        Executes a report query with named bind parameters (:name) and
+        records its timings in `last`.
+
+        Args:
+            query (str): Report SQL.
+            params (dict | None): Bind parameters.
+
+        Returns:
+            pd.DataFrame: The report.
+        """
+        params = params or {}
+
+        try:
+            start = time.perf_counter()
+            result = self.connection.execute(text(query), params)
+            executed = time.perf_counter()
+            table_data = pd.DataFrame.from_records(result.fetchall(), columns=list(result.keys()), coerce_float=True)
+            fetched = time.perf_counter()
+            self.connection.commit()
+        except Exception:
+            self.connection.rollback()
+            raise
+
+        self.last = {
+            "query": query,
+            "params": params,
+            "execute": executed - start,
+            "fetch": fetched - executed,
+            "rows": len(table_data),
+        }
+        return table_data
+
+    def copy_query(self, query: str, params=None) -> pd.DataFrame:
+        """
+        Executes a report query with COPY TO STDOUT (queries.copy_csv) and
+        records its timings in `last`: the execute part ends when the whole
+        CSV stream is on the client, the fetch part is the Arrow parse.
+
+        Args:
+            query (str): Report SQL.
+            params (dict | None): Bind parameters.
+
+        Returns:
+            pd.DataFrame: The report.
+        """
+        params = params or {}
+
+        start = time.perf_counter()
+        columns, buffer = queries.copy_csv(query, self, params)
+        executed = time.perf_counter()
+        table_data = queries.read_copy_csv(columns, buffer)
+        fetched = time.perf_counter()
+
+        self.last = {
+            "query": query,
+            "params": params,
+            "execute": executed - start,
+            "fetch": fetched - executed,
+            "rows": len(table_data),
+        }
+        return table_data
+
+    def explain(self):
+        """
+        Runs the last query again under EXPLAIN (ANALYZE, BUFFERS, FORMAT
+        JSON) and returns its plan.
+
+        Returns:
+            dict: The plan document PostgreSQL returns (Plan, Planning Time,
+            Execution Time...).
+        """
+        try:
+            plan = self.connection.execute(
+                text(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {self.last['query']}"),
+                self.last["params"],
+            ).scalar()
+        finally:
+            self.connection.rollback()
+
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return plan[0]
+
+    def close(self) -> None:
+        self.connection.close()
+
+def plan_shape(plan, depth=0):
+    """
+    Flattens a plan into one line per node with what decides its strategy:
+    node type, join type, relation, index and the parent relationship.
+    Costs, row counts and timings are left out, so two plans have the same
+    shape unless PostgreSQL chose a different plan.
+
+    Args:
+        plan (dict): A "Plan" node of EXPLAIN (FORMAT JSON).
+        depth (int): Depth of the node, used for the indentation.
+
+    Returns:
+        list[str]: One line per node, in depth-first order.
+    """
+    parts = [plan["Node Type"]]
+    if "Join Type" in plan:
+        parts.append(f"({plan['Join Type']})")
+    if "Relation Name" in plan:
+        parts.append(f"on {plan['Relation Name']}")
+    if "Index Name" in plan:
+        parts.append(f"using {plan['Index Name']}")
+    if "Parent Relationship" in plan and depth:
+        parts.append(f"[{plan['Parent Relationship']}]")
+
+    lines = ["  " * depth + " ".join(parts)]
+    for child in plan.get("Plans", []):
+        lines += plan_shape(child, depth + 1)
+    return lines
+
+def plan_diff(before, after, name):
+    """
+    Returns the unified diff between the shapes of two plans, empty when
+    PostgreSQL chose the same plan.
+
+    Args:
+        before (dict): Previous plan document.
+        after (dict): Current plan document.
+        name (str): Report name, used in the diff header.
+
+    Returns:
+        list[str]: Lines of the diff.
+    """
+    return list(difflib.unified_diff(
+        plan_shape(before["Plan"]),
+        plan_shape(after["Plan"]),
+        fromfile=f"{name} (previous)",
+        tofile=f"{name} (current)",
+        lineterm="",
+    ))
+
+def latency_stats(samples):
+    """
+    Returns the p50/p95/p99 of a list of durations, in milliseconds.
+    """
+    values = np.percentile(np.array(samples) * 1000, PERCENTILES)
+    return {f"p{percentile}": float(value) for percentile, value in zip(PERCENTILES, values)}
+
+def benchmark_report(
+    name,
+    session,
+    schema_name,
+    kwargs,
+    warmup=DEFAULT_WARMUP,
+    repetitions=DEFAULT_REPETITIONS,
+    results_dir=None,
+):
+    """
+    Runs a report `warmup` times unmeasured and `repetitions` times measured,
+    then captures its plan.
+
+    Args:
+        name (str): Name of the report function in queries.py.
+        session (ProfilingSession): Session the report runs on.
+        schema_name (str): Database schema name.
+        kwargs (dict): Extra arguments of the report (session_keys...).
+        warmup (int): Unmeasured runs, to warm the caches.
+        repetitions (int): Measured runs.
+        results_dir (str | None): Directory the result of the last run is
+            written to, as <report>.parquet (see benchmark_backends.py).
+
+    Returns:
+        dict: Report name, arguments, rows, latency percentiles (total report
+        call, execute and fetch, in ms), the plan and the server-side planning
+        and execution times of the EXPLAIN ANALYZE run.
+    """
+    report = getattr(queries, name)
+    for _ in range(warmup):
+        report(schema_name, session, **kwargs)
+
+    # The total is the whole report call, as in project2's benchmark, so the
+    # two backends are compared on the same span; execute and fetch are its
+    # breakdown
+    samples, timings = [], []
+    for _ in range(repetitions):
+        start = time.perf_counter()
+        table_data = report(schema_name, session, **kwargs)
+        samples.append(time.perf_counter() - start)
+        timings.append(session.last)
+
+    if results_dir is not None:
+        os.makedirs(results_dir, exist_ok=True)
+        table_data.to_parquet(os.path.join(results_dir, f"{name}.parquet"), index=False)
+
+    plan = session.explain()
+
+    return {
+        "report": name,
+        "kwargs": kwargs,
+        "rows": timings[-1]["rows"],
+        "total_ms": latency_stats(samples),
+        "execute_ms": latency_stats([timing["execute"] for timing in timings]),
+        "fetch_ms": latency_stats([timing["fetch"] for timing in timings]),
+        "planning_ms": plan["Planning Time"],
+        "execution_ms": plan["Execution Time"],
+        "plan": plan,
+    }
+
+def find_previous(history, result, schema_name):
+    """
+    Returns the most recent result in the history for the same report, with
+    the same arguments, on the same schema.
+    """
+    for run in reversed(history):
+        if run["schema"] != schema_name:
+            continue
+        for previous in run["results"]:
+            # The history stores the arguments as JSON (tuples become lists)
+            if previous["report"] == result["report"] and previous["kwargs"] == json.loads(json.dumps(result["kwargs"])):
+                return previous
+    return None
+
+def print_result(result, previous):
+    """
+    Prints the latencies of a report and, when its plan changed since the
+    previous run, the plan diff.
+    """
+    total, execute, fetch = result["total_ms"], result["execute_ms"], result["fetch_ms"]
+    label = result["report"]
+    if "fetch" in result["kwargs"]:
+        label += f" [{result['kwargs']['fetch']}]"
+    line = (
+        f"{label:<24}{result['rows']:>9}"
+        + "".join(f"{total[p]:>10.1f}" for p in total)
+        + f"{execute['p50']:>10.1f}{fetch['p50']:>10.1f}{result['execution_ms']:>11.1f}"
+    )
+    if previous is not None:
+        line += f"{total['p50'] / previous['total_ms']['p50'] - 1:>+10.1%}"
+    print(line)
+
+    if previous is not None:
+        diff = plan_diff(previous["plan"], result["plan"], result["report"])
+        if diff:
+            print("  plan changed:")
+            print("\n".join(f"    {line}" for line in diff))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmarks the reports of queries.py and captures their plans.")
+    parser.add_argument("schema_name", help="Schema the reports run on.")
+    parser.add_argument("--reports", nargs="+", choices=REPORTS, default=list(REPORTS), help="Reports to run.")
+    parser.add_argument("--warmup", type=int, default=DEFAULT_WARMUP, help="Unmeasured runs of each report.")
+    parser.add_argument("--repetitions", type=int, default=DEFAULT_REPETITIONS, help="Measured runs of each report.")
+    parser.add_argument("--session-keys", help="Sessions for reports 2, 4 and 5, e.g. 9998,10006 or all.")
+    parser.add_argument("--driver-numbers", help="Drivers for reports 2, 4 and 5, e.g. 1,30 or all.")
+    parser.add_argument(
+        "--fetch",
+        nargs="+",
+        choices=queries.FETCH_METHODS,
+        default=["read_sql"],
+        help="How the results reach the client; with several, each report runs once per method.",
+    )
+    parser.add_argument("--history", default=DEFAULT_HISTORY, help="JSON file with the previous runs.")
+    parser.add_argument("--label", help="Free text stored with the run (e.g. what changed).")
+    parser.add_argument("--results-dir", help="Directory the result of each report is written to (as parquet).")
+    parser.add_argument(
+        "--compact-results",
+        action="store_true",
+        help="Downcast the integer columns of the results and make repetitive text columns categorical.",
+    )
+    args = parser.parse_args()
+    queries.COMPACT_RESULTS = args.compact_results
+    if args.repetitions < 1:
+        parser.error("--repetitions must be at least 1")
+
+    parameters = {}
+    if args.session_keys is not None:
+        parameters["session_keys"] = parse_numbers(args.session_keys)
+    if args.driver_numbers is not None:
+        parameters["driver_numbers"] = parse_numbers(args.driver_numbers)
+
+    engine = create_engine(queries.DATABASE_URL)
+    session = ProfilingSession(engine)
+    history = load_history(args.history)
+    run = {
+        "label": args.label,
+        "started_at": datetime.now().isoformat(timespec="seconds"),
+        "commit": git_commit(),
+        "schema": args.schema_name,
+        "settings": postgres_settings(engine),
+        "results": [],
+    }
+
+    print(
+        f"{'report':<24}{'rows':>9}" + "".join(f"{f'p{p} ms':>10}" for p in PERCENTILES)
+        + f"{'exec p50':>10}{'fetch p50':>10}{'server ms':>11}{'change':>10}"
+    )
+    try:
+        for name in args.reports:
+            for fetch in args.fetch:
+                kwargs = dict(parameters) if name in PARAMETRIZED_REPORTS else {}
+                if fetch != "read_sql":
+                    kwargs["fetch"] = fetch
+                result = benchmark_report(
+                    name, session, args.schema_name, kwargs, args.warmup, args.repetitions, args.results_dir
+                )
+                print_result(result, find_previous(history, result, args.schema_name))
+                run["results"].append(result)
+    finally:
+        session.close()
+
+    history.append(run)
+    save_history(args.history, history)
+    print(f"\nRun saved to {args.history}.")
@@ -0,0 +1,229 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from sqlalchemy import text
+
+from src.scripts import queries
+from src.scripts.arrow_queries import ParquetSource
+
+CACHE_DIR = "./.cache/reports"
+
+
+class CacheInfo:
+    """
+    Outcome of a ReportCache lookup.
+
+    @attributes:
+        - status: str ("memory", "disk" or "miss")
+        - compute_seconds: float (time the report took when it was computed)
+        - elapsed_seconds: float (time this call took)
+    """
+
+    def __init__(self, status: str, compute_seconds: float, elapsed_seconds: float):
+        self.status = status
+        self.compute_seconds = compute_seconds
+        self.elapsed_seconds = elapsed_seconds
+
+    @property
+    def hit(self) -> bool:
+        return self.status != "miss"
+
+    @property
+    def saved_seconds(self) -> float:
+        return max(self.compute_seconds - self.elapsed_seconds, 0.0) if self.hit else 0.0
+
+    def __str__(self) -> str:
+        if not self.hit:
+            return "cache miss"
+        return f"cache hit ({self.status}), saved {self.saved_seconds:.2f} seconds"
+
+
+def data_generation(schema_name: str, engine) -> str:
+    """
+    Returns the stamp that identifies the current version of the data.
+
+    For PostgreSQL it is the database (its URL without credentials) and the
+    counter, load time and random token the loader writes to
+    {schema}.data_generation, so entries of another database, or of a schema
+    that was dropped and recreated, are never reused. For a ParquetSource it
+    is the data directory and a digest of the size and modification time of
+    every parquet file.
+
+    @params:
+        - schema_name: str
+        - engine
+
+    @returns:
+        - generation: str
+    """
+
+    if isinstance(engine, ParquetSource):
+        digest = hashlib.sha256(os.path.abspath(engine.data_dir).encode())
+        for root, _, files in sorted(os.walk(engine.data_dir)):
+            for file in sorted(files):
+                if file.endswith(".parquet"):
+                    stat = os.stat(os.path.join(root, file))
+                    digest.update(f"{root}/{file}:{stat.st_size}:{stat.st_mtime_ns}".encode())
+        return digest.hexdigest()
+
+    with engine.connect() as conn:
+        url = conn.engine.url
+        database = f"{url.get_backend_name()}://{url.host}:{url.port}/{url.database}"
+        exists = conn.execute(
+            text("SELECT to_regclass(:table_name)"),
+            {"table_name": f"{schema_name}.data_generation"},
+        ).scalar()
+        if exists is None:
+            return f"{database}:0"
+        # The whole row (generation, loaded_at, token), also for schemas
+        # created before the token column
+        stamp = conn.execute(
+            text(f"SELECT to_jsonb(stamp)::text FROM {schema_name}.data_generation AS stamp")
+        ).scalar()
+        return f"{database}:{stamp}"
+
+
+class ReportCache:
+    """
+    Two-tier cache for the report functions of queries.py and arrow_queries.py.
+
+    Entries are keyed on the report function, the schema, the call parameters
+    and the data generation stamp, so a load invalidates every result computed
+    before it. Results live in an in-memory LRU bounded by entry count and
+    bytes, and in parquet files under `cache_dir` that other processes (the
+    app, notebooks) can reuse. One instance can be shared by threads (the
+    batch mode of app.py).
+    """
+
+    def __init__(self, max_entries: int = 32, max_bytes: int = 512 * 1024 ** 2, cache_dir: str = CACHE_DIR):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.cache_dir = cache_dir
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def key(self, report, schema_name: str, generation: str, params: dict) -> str:
+        """
+        Builds the cache key of one report call.
+        """
+
+        payload = json.dumps(
+            {
+                "report": f"{report.__module__}.{report.__qualname__}",
+                "schema": schema_name,
+                "generation": generation,
+                # The dtypes of the SQL results depend on it
+                "compact_results": queries.COMPACT_RESULTS,
+                "params": {name: repr(value) for name, value in sorted(params.items())},
+            },
+            sort_keys=True,
+        )
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.parquet")
+
+    def _remember(self, key: str, dataframe: pd.DataFrame, compute_seconds: float) -> None:
+        size = int(dataframe.memory_usage(deep=True).sum())
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            if key in self._entries:
+                self._bytes -= self._entries.pop(key)[2]
+
+            self._entries[key] = (dataframe, compute_seconds, size)
+            self._bytes += size
+
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, (_, _, evicted) = self._entries.popitem(last=False)
+                self._bytes -= evicted
+
+    def _read_disk(self, key: str):
+        path = self._path(key)
+        if not os.path.exists(path):
+            return None
+
+        table = pq.read_table(path)
+        metadata = table.schema.metadata or {}
+        compute_seconds = float(metadata.get(b"compute_seconds", b"0"))
+        return table.to_pandas(), compute_seconds
+
+    def _write_disk(self, key: str, dataframe: pd.DataFrame, compute_seconds: float) -> None:
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+        table = pa.Table.from_pandas(dataframe, preserve_index=False)
+        table = table.replace_schema_metadata({
+            **(table.schema.metadata or {}),
+            b"compute_seconds": str(compute_seconds).encode(),
+        })
+
+        # Write to a temporary file first so concurrent readers never see a
+        # partially written entry.
+        temporary = f"{self._path(key)}.{os.getpid()}.{threading.get_ident()}.tmp"
+        pq.write_table(table, temporary)
+        os.replace(temporary, self._path(key))
+
+    def run(self, report, schema_name: str, engine, **params):
+        """
+        Returns the result of `report(schema_name=..., engine=..., **params)`,
+        from the cache when possible.
+
+        @params:
+            - report: report function of queries.py or arrow_queries.py
+            - schema_name: str
+            - engine
+            - params: extra keyword arguments of the report
+
+        @returns:
+            - (table_data, info): (pd.DataFrame, CacheInfo)
+        """
+
+        start = time.perf_counter()
+        key = self.key(report, schema_name, data_generation(schema_name, engine), params)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+        # Callers get their own copy: the cached DataFrame is shared by every
+        # thread using the cache and must not be modified
+        if entry is not None:
+            dataframe, compute_seconds, _ = entry
+            return dataframe.copy(), CacheInfo("memory", compute_seconds, time.perf_counter() - start)
+
+        stored = self._read_disk(key)
+        if stored is not None:
+            dataframe, compute_seconds = stored
+            self._remember(key, dataframe, compute_seconds)
+            return dataframe.copy(), CacheInfo("disk", compute_seconds, time.perf_counter() - start)
+
+        dataframe = report(schema_name=schema_name, engine=engine, **params)
+        compute_seconds = time.perf_counter() - start
+
+        self._remember(key, dataframe.copy(), compute_seconds)
+        self._write_disk(key, dataframe, compute_seconds)
+
+        return dataframe, CacheInfo("miss", compute_seconds, compute_seconds)
+
+    def clear(self) -> None:
+        """
+        Drops every entry, in memory and on disk.
+        """
+
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+        if os.path.isdir(self.cache_dir):
+            for file in os.listdir(self.cache_dir):
+                if file.endswith(".parquet"):
+                    os.remove(os.path.join(self.cache_dir, file))
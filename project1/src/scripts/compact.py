@@ -0,0 +1,42 @@
+import pandas as pd
+
+# Text columns of the source files with few distinct values, kept as pandas
+# categoricals by the loader
+CATEGORICAL_COLUMNS = ("compound", "team_name", "country_code")
+
+# A text column of a report result becomes categorical when it has at most
+# this share of distinct values
+CATEGORICAL_SHARE = 0.5
+
+def compact_dtypes(df, categorical=None):
+    """
+    Shrinks the dtypes of a DataFrame without changing its values.
+
+    Integer columns are downcast to the smallest integer type that holds
+    them (the compact profile of create_table.py stores most of them as
+    SMALLINT) and repetitive text columns become categoricals. Float columns
+    are left as float64, since float32 would change their values.
+
+    Args:
+        df (pd.DataFrame): The data, modified in place.
+        categorical (Iterable[str] | None): Columns to make categorical. When
+            None, every text column with at most CATEGORICAL_SHARE distinct
+            values is.
+
+    Returns:
+        pd.DataFrame: The same DataFrame.
+    """
+    for column in df.columns:
+        series = df[column]
+
+        if pd.api.types.is_integer_dtype(series) and not pd.api.types.is_extension_array_dtype(series):
+            df[column] = pd.to_numeric(series, downcast="integer")
+        elif series.dtype == object:
+            if categorical is not None:
+                if column in categorical:
+                    df[column] = series.astype("category")
+            elif len(series) and pd.api.types.infer_dtype(series, skipna=True) == "string":
+                if series.nunique() <= CATEGORICAL_SHARE * len(series):
+                    df[column] = series.astype("category")
+
+    return df
@@ -1,189 +1,657 @@
-import sys
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
 from sqlalchemy import create_engine, text
 from dotenv import dotenv_values
 
 DATABASE_URL = dotenv_values(".env.local")['DATABASE_URL']
 
-if __name__ == "__main__":
-    schema_name = sys.argv[1]
-
-    schema_sql = f"""
-        DROP TABLE IF EXISTS {schema_name}.race_controls;
-        DROP TABLE IF EXISTS {schema_name}.weather_conditions;
-        DROP TABLE IF EXISTS {schema_name}.tyre_stints;
-        DROP TABLE IF EXISTS {schema_name}.positions;
-        DROP TABLE IF EXISTS {schema_name}.pits;
-        DROP TABLE IF EXISTS {schema_name}.laps;
-        DROP TABLE IF EXISTS {schema_name}.telemetrys;
-        DROP TABLE IF EXISTS {schema_name}.telemetrys_laps;
-        DROP TABLE IF EXISTS {schema_name}.sessions;
-        DROP TABLE IF EXISTS {schema_name}.meetings;
-        DROP TABLE IF EXISTS {schema_name}.drivers;
-        
-        CREATE SCHEMA IF NOT EXISTS {schema_name};
-        
-        CREATE TABLE {schema_name}.drivers (
-            driver_number INT,
-            session_key INT,
-            broadcast_name VARCHAR,
-            country_code VARCHAR,
-            first_name VARCHAR,
-            full_name VARCHAR,
-            headshot_url VARCHAR,
-            last_name VARCHAR,
-            name_acronym VARCHAR,
-            team_colour VARCHAR,
-            team_name VARCHAR, 
-            PRIMARY KEY (driver_number, session_key)
-        );
-
-        CREATE TABLE {schema_name}.meetings (
-            meeting_key INT,
-            meeting_name VARCHAR,
-            meeting_official_name VARCHAR,
-            circuit_key INT,
-            circuit_short_name VARCHAR,
-            country_key INT,
-            country_code VARCHAR,
-            country_name VARCHAR,
-            date_start TIMESTAMP,
-            gmt_offset VARCHAR,
-            location VARCHAR,
-            year INT,
-            meeting_code VARCHAR,
-            PRIMARY KEY (meeting_key)
-        );
-
-        CREATE TABLE {schema_name}.sessions (
-            session_key INT,
-            meeting_key INT,
-            session_name VARCHAR,
-            session_type VARCHAR,
-            date_start TIMESTAMP,
-            date_end TIMESTAMP,
-            circuit_key INT,
-            circuit_short_name VARCHAR,
-            country_key INT,
-            country_code VARCHAR,
-            country_name VARCHAR,
-            location VARCHAR,
-            gmt_offset VARCHAR,
-            year INT,
-            PRIMARY KEY (session_key),
-            FOREIGN KEY (meeting_key) REFERENCES {schema_name}.meetings (meeting_key)
-        );
-        
-        CREATE TABLE {schema_name}.telemetrys_laps (
-            driver_number INT,
-            session_key INT,
-            PRIMARY KEY (driver_number, session_key)
-        );
-
-        CREATE TABLE {schema_name}.telemetrys (
-            session_key INT,
-            driver_number INT,
-            date TIMESTAMP,
-            brake INT,
-            drs INT,
-            n_gear INT,
-            rpm INT,
-            speed FLOAT,
-            throttle FLOAT,
-            PRIMARY KEY (session_key, driver_number, date),
-            FOREIGN KEY (session_key) REFERENCES {schema_name}.sessions (session_key),
-            FOREIGN KEY (driver_number, session_key) REFERENCES {schema_name}.drivers (driver_number, session_key),
-            FOREIGN KEY (driver_number, session_key) REFERENCES {schema_name}.telemetrys_laps (driver_number, session_key)
-        );
-        
-        CREATE TABLE {schema_name}.laps (
-            session_key INT,
-            driver_number INT,
-            lap_number INT,
-            date_start TIMESTAMP,
-            duration_sector_1 FLOAT,
-            duration_sector_2 FLOAT,
-            duration_sector_3 FLOAT,
-            i1_speed FLOAT,
-            i2_speed FLOAT,
-            is_pit_out_lap BOOLEAN,
-            lap_duration FLOAT,
-            st_speed FLOAT,
-            PRIMARY KEY (session_key, driver_number, lap_number),
-            FOREIGN KEY (session_key) REFERENCES {schema_name}.sessions (session_key),
-            FOREIGN KEY (driver_number, session_key) REFERENCES {schema_name}.telemetrys_laps (driver_number, session_key),
-            FOREIGN KEY (driver_number, session_key) REFERENCES {schema_name}.drivers (driver_number, session_key)
-        );
-        
-        CREATE TABLE {schema_name}.pits (
-            session_key INT,
-            driver_number INT,
-            lap_number INT,
-            date TIMESTAMP,
-            pit_duration FLOAT,
-            PRIMARY KEY (session_key, driver_number, lap_number),
-            FOREIGN KEY (session_key) REFERENCES {schema_name}.sessions (session_key),
-            FOREIGN KEY (driver_number, session_key) REFERENCES {schema_name}.drivers (driver_number, session_key),
-            FOREIGN KEY (driver_number, session_key, lap_number) REFERENCES {schema_name}.laps (driver_number, session_key, lap_number)
-            
-        );
-
-        CREATE TABLE {schema_name}.positions (
-            session_key INT,
-            driver_number INT,
-            date TIMESTAMP,
-            position INT,
-            PRIMARY KEY (session_key, driver_number, date),
-            FOREIGN KEY (session_key) REFERENCES {schema_name}.sessions (session_key),
-            FOREIGN KEY (driver_number, session_key) REFERENCES {schema_name}.drivers (driver_number, session_key)
-        );
-
-        CREATE TABLE {schema_name}.tyre_stints (
-            session_key INT,
-            driver_number INT,
-            stint_number INT,
-            lap_start INT,
-            lap_end INT,
-            compound VARCHAR,
-            tyre_age_at_start INT,
-            PRIMARY KEY (session_key, driver_number, stint_number),
-            FOREIGN KEY (session_key) REFERENCES {schema_name}.sessions (session_key),
-            FOREIGN KEY (driver_number, session_key) REFERENCES {schema_name}.drivers (driver_number, session_key)
-        );
-
-        CREATE TABLE {schema_name}.weather_conditions (
-            session_key INT,
-            date TIMESTAMP,
-            air_temperature FLOAT,
-            humidity FLOAT,
-            pressure FLOAT,
-            rainfall BOOLEAN,
-            track_temperature FLOAT,
-            wind_direction FLOAT,
-            wind_speed FLOAT,
-            PRIMARY KEY (session_key, date),
-            FOREIGN KEY (session_key) REFERENCES {schema_name}.sessions (session_key)
-        );
-
-        CREATE TABLE {schema_name}.race_controls (
-            session_key INT,
-            driver_number INT,
-            category VARCHAR,
-            date TIMESTAMP,
-            flag VARCHAR,
-            lap_number INT,
-            message TEXT,
-            scope VARCHAR,
-            sector INT,
-            PRIMARY KEY (session_key, driver_number, date),
-            FOREIGN KEY (session_key) REFERENCES {schema_name}.sessions (session_key),
-            FOREIGN KEY (driver_number, session_key) REFERENCES {schema_name}.drivers (driver_number, session_key)
-        );
-    """
-    
-    engine = create_engine(DATABASE_URL)
+PARTITION_STRATEGIES = ("list", "hash")
+
+# Column definitions of every table, in creation order.
+TABLES = {
+    "drivers": """
+        driver_number INT,
+        session_key INT,
+        broadcast_name VARCHAR,
+        country_code VARCHAR,
+        first_name VARCHAR,
+        full_name VARCHAR,
+        headshot_url VARCHAR,
+        last_name VARCHAR,
+        name_acronym VARCHAR,
+        team_colour VARCHAR,
+        team_name VARCHAR
+    """,
+    "meetings": """
+        meeting_key INT,
+        meeting_name VARCHAR,
+        meeting_official_name VARCHAR,
+        circuit_key INT,
+        circuit_short_name VARCHAR,
+        country_key INT,
+        country_code VARCHAR,
+        country_name VARCHAR,
+        date_start TIMESTAMP,
+        gmt_offset VARCHAR,
+        location VARCHAR,
+        year INT,
+        meeting_code VARCHAR
+    """,
+    "sessions": """
+        session_key INT,
+        meeting_key INT,
+        session_name VARCHAR,
+        session_type VARCHAR,
+        date_start TIMESTAMP,
+        date_end TIMESTAMP,
+        circuit_key INT,
+        circuit_short_name VARCHAR,
+        country_key INT,
+        country_code VARCHAR,
+        country_name VARCHAR,
+        location VARCHAR,
+        gmt_offset VARCHAR,
+        year INT
+    """,
+    "telemetrys_laps": """
+        driver_number INT,
+        session_key INT
+    """,
+    "telemetrys": """
+        session_key INT,
+        driver_number INT,
+        date TIMESTAMP,
+        brake INT,
+        drs INT,
+        n_gear INT,
+        rpm INT,
+        speed FLOAT,
+        throttle FLOAT,
+        lap_number INT,
+        sector SMALLINT
+    """,
+    # The telemetrys samples of each lap packed into arrays, one row per lap
+    # (see lap_traces.py). offsets are microseconds since date_start, so
+    # date_start + offset is exactly the date of the sample in telemetrys.
+    # speed and throttle keep their fractions; missing samples are NULL
+    # elements.
+    "telemetry_lap_traces": """
+        session_key INT,
+        driver_number INT,
+        lap_number INT,
+        date_start TIMESTAMP,
+        samples INT,
+        offsets BIGINT[],
+        speed REAL[],
+        rpm SMALLINT[],
+        throttle REAL[],
+        brake SMALLINT[],
+        n_gear SMALLINT[],
+        drs SMALLINT[],
+        sector SMALLINT[]
+    """,
+    "laps": """
+        session_key INT,
+        driver_number INT,
+        lap_number INT,
+        date_start TIMESTAMP,
+        duration_sector_1 FLOAT,
+        duration_sector_2 FLOAT,
+        duration_sector_3 FLOAT,
+        i1_speed FLOAT,
+        i2_speed FLOAT,
+        is_pit_out_lap BOOLEAN,
+        lap_duration FLOAT,
+        st_speed FLOAT
+    """,
+    "pits": """
+        session_key INT,
+        driver_number INT,
+        lap_number INT,
+        date TIMESTAMP,
+        pit_duration FLOAT
+    """,
+    "positions": """
+        session_key INT,
+        driver_number INT,
+        date TIMESTAMP,
+        position INT
+    """,
+    "tyre_stints": """
+        session_key INT,
+        driver_number INT,
+        stint_number INT,
+        lap_start INT,
+        lap_end INT,
+        compound VARCHAR,
+        tyre_age_at_start INT
+    """,
+    "weather_conditions": """
+        session_key INT,
+        date TIMESTAMP,
+        air_temperature FLOAT,
+        humidity FLOAT,
+        pressure FLOAT,
+        rainfall BOOLEAN,
+        track_temperature FLOAT,
+        wind_direction FLOAT,
+        wind_speed FLOAT
+    """,
+    # Per-session rollup of weather_conditions, refreshed by insert_data.py.
+    # The sums and counts let reports rebuild exact averages over any set
+    # of rows joined to it.
+    "weather_session_stats": """
+        session_key INT,
+        samples INT,
+        track_temperature_count INT,
+        track_temperature_sum FLOAT,
+        track_temperature_avg FLOAT,
+        track_temperature_min FLOAT,
+        track_temperature_max FLOAT,
+        air_temperature_count INT,
+        air_temperature_sum FLOAT,
+        air_temperature_avg FLOAT,
+        air_temperature_min FLOAT,
+        air_temperature_max FLOAT,
+        rainfall_fraction FLOAT
+    """,
+    "race_controls": """
+        session_key INT,
+        driver_number INT,
+        category VARCHAR,
+        date TIMESTAMP,
+        flag VARCHAR,
+        lap_number INT,
+        message TEXT,
+        scope VARCHAR,
+        sector INT
+    """,
+    # Source files loaded by insert_data.py, used by its --incremental mode
+    "load_manifest": """
+        path VARCHAR,
+        table_name VARCHAR,
+        size BIGINT,
+        mtime BIGINT,
+        content_hash VARCHAR,
+        rows BIGINT,
+        status VARCHAR,
+        error TEXT,
+        loaded_at TIMESTAMP
+    """,
+}
+
+# Narrower types used by the compact profile (--compact) where the value
+# domain allows it; "*" applies to every table. Aggregates over the REAL
+# columns are computed in double precision by the reports.
+COMPACT_TYPES = {
+    "*": {
+        "driver_number": "SMALLINT",
+        "lap_number": "SMALLINT",
+    },
+    "telemetrys": {
+        "brake": "SMALLINT",
+        "drs": "SMALLINT",
+        "n_gear": "SMALLINT",
+        "rpm": "SMALLINT",
+        "speed": "REAL",
+        "throttle": "REAL",
+    },
+    "laps": {
+        "i1_speed": "REAL",
+        "i2_speed": "REAL",
+        "st_speed": "REAL",
+    },
+    "pits": {
+        "pit_duration": "REAL",
+    },
+    "positions": {
+        "position": "SMALLINT",
+    },
+    "tyre_stints": {
+        "stint_number": "SMALLINT",
+        "lap_start": "SMALLINT",
+        "lap_end": "SMALLINT",
+        "tyre_age_at_start": "SMALLINT",
+    },
+    "race_controls": {
+        "sector": "SMALLINT",
+    },
+}
+
+PRIMARY_KEYS = {
+    "drivers": ("driver_number", "session_key"),
+    "meetings": ("meeting_key",),
+    "sessions": ("session_key",),
+    "telemetrys_laps": ("driver_number", "session_key"),
+    "telemetrys": ("session_key", "driver_number", "date"),
+    "telemetry_lap_traces": ("session_key", "driver_number", "lap_number"),
+    "laps": ("session_key", "driver_number", "lap_number"),
+    "pits": ("session_key", "driver_number", "lap_number"),
+    "positions": ("session_key", "driver_number", "date"),
+    "tyre_stints": ("session_key", "driver_number", "stint_number"),
+    "weather_conditions": ("session_key", "date"),
+    "weather_session_stats": ("session_key",),
+    "race_controls": ("session_key", "driver_number", "date"),
+    "load_manifest": ("path", "table_name"),
+}
+
+# (table, columns, referenced table, referenced columns)
+FOREIGN_KEYS = [
+    ("sessions", ("meeting_key",), "meetings", ("meeting_key",)),
+    ("telemetrys", ("session_key",), "sessions", ("session_key",)),
+    ("telemetrys", ("driver_number", "session_key"), "drivers", ("driver_number", "session_key")),
+    ("telemetrys", ("driver_number", "session_key"), "telemetrys_laps", ("driver_number", "session_key")),
+    ("telemetry_lap_traces", ("session_key",), "sessions", ("session_key",)),
+    ("telemetry_lap_traces", ("driver_number", "session_key"), "drivers", ("driver_number", "session_key")),
+    ("laps", ("session_key",), "sessions", ("session_key",)),
+    ("laps", ("driver_number", "session_key"), "telemetrys_laps", ("driver_number", "session_key")),
+    ("laps", ("driver_number", "session_key"), "drivers", ("driver_number", "session_key")),
+    ("pits", ("session_key",), "sessions", ("session_key",)),
+    ("pits", ("driver_number", "session_key"), "drivers", ("driver_number", "session_key")),
+    ("pits", ("driver_number", "session_key", "lap_number"), "laps", ("driver_number", "session_key", "lap_number")),
+    ("positions", ("session_key",), "sessions", ("session_key",)),
+    ("positions", ("driver_number", "session_key"), "drivers", ("driver_number", "session_key")),
+    ("tyre_stints", ("session_key",), "sessions", ("session_key",)),
+    ("tyre_stints", ("driver_number", "session_key"), "drivers", ("driver_number", "session_key")),
+    ("weather_conditions", ("session_key",), "sessions", ("session_key",)),
+    ("weather_session_stats", ("session_key",), "sessions", ("session_key",)),
+    ("race_controls", ("session_key",), "sessions", ("session_key",)),
+    ("race_controls", ("driver_number", "session_key"), "drivers", ("driver_number", "session_key")),
+]
+
+# Secondary indexes used by the reports in queries.py: (name, table, definition)
+INDEXES = [
+    ("laps_session_driver_date_start_idx", "laps", "(session_key, driver_number, date_start)"),
+    ("sessions_session_name_idx", "sessions", "(session_name)"),
+    ("telemetrys_date_brin", "telemetrys", "USING BRIN (date)"),
+    ("telemetrys_lap_sector_idx", "telemetrys", "(session_key, driver_number, lap_number, sector)"),
+]
+
+# Views created after the tables. telemetry_lap_samples unpacks
+# telemetry_lap_traces back into one row per sample, like telemetrys.
+VIEWS = {
+    "telemetry_lap_samples": """
+        SELECT t.session_key, t.driver_number, t.lap_number,
+               t.date_start + s.offset_us * INTERVAL '1 microsecond' AS date,
+               s.speed, s.rpm, s.throttle, s.brake, s.n_gear, s.drs, s.sector,
+               s.sample
+        FROM {schema_name}.telemetry_lap_traces t
+        CROSS JOIN LATERAL unnest(t.offsets, t.speed, t.rpm, t.throttle, t.brake, t.n_gear, t.drs, t.sector)
+            WITH ORDINALITY AS s(offset_us, speed, rpm, throttle, brake, n_gear, drs, sector, sample)
+    """,
+}
+
+
+def partition_clause(partition_by):
+    """
+    Returns the PARTITION BY clause for a table partitioned on session_key.
+
+    Args:
+        partition_by (str | None): "list", "hash" or None for a plain heap.
+
+    Returns:
+        str: The clause to append after the column list.
+    """
+    if partition_by is None:
+        return ""
+    return f"PARTITION BY {partition_by.upper()} (session_key)"
+
+
+def hash_partitions_sql(schema_name, table_name, partitions):
+    """
+    Builds the fixed set of partitions of a HASH-partitioned table.
+
+    LIST partitions are created on demand by insert_data.py, one per session,
+    but HASH partitions must all exist before the first row is loaded.
+
+    Args:
+        schema_name (str): Database schema name.
+        table_name (str): Partitioned table name.
+        partitions (int): Number of hash partitions (the modulus).
+
+    Returns:
+        str: The CREATE TABLE ... PARTITION OF statements.
+    """
+    return "".join(
+        f"""
+        CREATE TABLE {schema_name}.{table_name}_p{remainder}
+            PARTITION OF {schema_name}.{table_name}
+            FOR VALUES WITH (MODULUS {partitions}, REMAINDER {remainder});
+        """
+        for remainder in range(partitions)
+    )
+
+
+def foreign_key_name(table_name, ref_table):
+    """
+    Returns the name given to the foreign key from a table to another.
+    """
+    return f"{table_name}_{ref_table}_fkey"
+
+
+def column_definitions(table_name, compact=False):
+    """
+    Returns the column definitions of a table, with the COMPACT_TYPES of the
+    compact profile applied when `compact` is set.
+
+    Args:
+        table_name (str): Table name, a key of TABLES.
+        compact (bool): Use the compact profile.
+
+    Returns:
+        list[str]: "name TYPE" of every column, in table order.
+    """
+    types = {**COMPACT_TYPES["*"], **COMPACT_TYPES.get(table_name, {})} if compact else {}
+    columns = [line.strip().rstrip(",").split(None, 1) for line in TABLES[table_name].strip().splitlines()]
+    return [f"{name} {types.get(name, data_type)}" for name, data_type in columns]
+
+
+def create_table_sql(schema_name, table_name, partition="", constraints=True, compact=False):
+    """
+    Builds the CREATE TABLE statement of one table of the catalogue.
+
+    Args:
+        schema_name (str): Database schema name.
+        table_name (str): Table name, a key of TABLES.
+        partition (str): Optional PARTITION BY clause.
+        constraints (bool): Declare the primary and foreign keys inline. When
+            False the table is created bare, as the fast load mode expects.
+        compact (bool): Use the narrower COMPACT_TYPES.
+
+    Returns:
+        str: The CREATE TABLE statement.
+    """
+    definitions = [",\n        ".join(column_definitions(table_name, compact))]
+
+    if constraints:
+        definitions.append(f"PRIMARY KEY ({', '.join(PRIMARY_KEYS[table_name])})")
+        definitions += [
+            f"CONSTRAINT {foreign_key_name(table, ref_table)} FOREIGN KEY ({', '.join(columns)}) "
+            f"REFERENCES {schema_name}.{ref_table} ({', '.join(ref_columns)})"
+            for table, columns, ref_table, ref_columns in FOREIGN_KEYS
+            if table == table_name
+        ]
+
+    body = ",\n        ".join(definitions)
+    return f"""
+        CREATE TABLE {schema_name}.{table_name} (
+        {body}
+        ) {partition};
+    """
+
+
+def create_index_sql(schema_name, index_name, table_name, definition):
+    """
+    Builds the CREATE INDEX statement of a secondary index.
+    """
+    return f"CREATE INDEX {index_name} ON {schema_name}.{table_name} {definition}"
+
+
+def build_schema_sql(schema_name, partition_by=None, partition_positions=False, hash_partitions=8, fast_load=False, compact=False):
+    """
+    Builds the DDL that drops and recreates every table and view of the
+    schema.
+
+    Args:
+        schema_name (str): Database schema name.
+        partition_by (str | None): Partition telemetrys on session_key with
+            "list" or "hash"; None keeps a single heap.
+        partition_positions (bool): Partition positions the same way.
+        hash_partitions (int): Number of partitions when partition_by is "hash".
+        fast_load (bool): Create the tables without keys or indexes; they are
+            built by build_constraints once insert_data.py has loaded the data.
+        compact (bool): Create the tables with the narrower COMPACT_TYPES.
+
+    Returns:
+        str: Semicolon separated SQL statements.
+    """
+    partitions = {
+        "telemetrys": partition_clause(partition_by),
+        "positions": partition_clause(partition_by if partition_positions else None),
+    }
 
+    schema_sql = "".join(f"DROP VIEW IF EXISTS {schema_name}.{view_name};\n" for view_name in VIEWS)
+    schema_sql += "".join(
+        f"DROP TABLE IF EXISTS {schema_name}.{table_name};\n"
+        for table_name in reversed(list(TABLES))
+    )
+    schema_sql += f"CREATE SCHEMA IF NOT EXISTS {schema_name};\n"
+
+    for table_name in TABLES:
+        schema_sql += create_table_sql(
+            schema_name,
+            table_name,
+            partition=partitions.get(table_name, ""),
+            constraints=not fast_load,
+            compact=compact,
+        )
+
+    if partition_by == "hash":
+        schema_sql += hash_partitions_sql(schema_name, "telemetrys", hash_partitions)
+        if partition_positions:
+            schema_sql += hash_partitions_sql(schema_name, "positions", hash_partitions)
+
+    schema_sql += "".join(
+        f"CREATE VIEW {schema_name}.{view_name} AS {definition.format(schema_name=schema_name)};\n"
+        for view_name, definition in VIEWS.items()
+    )
+
+    if not fast_load:
+        schema_sql += "".join(f"{create_index_sql(schema_name, *index)};\n" for index in INDEXES)
+
+    return schema_sql
+
+
+def run_schema_sql(schema_sql, engine):
+    """
+    Executes the statements built by build_schema_sql in one transaction.
+
+    Args:
+        schema_sql (str): Semicolon separated SQL statements.
+        engine (sqlalchemy.engine.Engine): SQLAlchemy engine.
+    """
     with engine.connect() as conn:
         for statement in schema_sql.strip().split(";"):
             if statement.strip():
                 conn.execute(text(statement))
-        conn.commit()
\ No newline at end of file
+        conn.commit()
+
+
+def bump_data_generation(schema_name, engine):
+    """
+    Increments the data generation stamp of a schema.
+
+    The stamp is a single-row counter that changes every time the data of the
+    schema changes (tables recreated or reloaded), with the time of the change
+    and a random token, so a schema dropped and recreated (where the counter
+    restarts at 1) never repeats a previous stamp. The report cache in
+    cache.py keys its entries on it, so results computed before a load are
+    never served after it.
+
+    Args:
+        schema_name (str): Database schema name.
+        engine (sqlalchemy.engine.Engine): SQLAlchemy engine.
+
+    Returns:
+        int: The new generation.
+    """
+    with engine.begin() as conn:
+        conn.execute(text(f"""
+            CREATE TABLE IF NOT EXISTS {schema_name}.data_generation (
+                id BOOLEAN PRIMARY KEY DEFAULT TRUE CHECK (id),
+                generation BIGINT NOT NULL,
+                loaded_at TIMESTAMP NOT NULL,
+                token UUID NOT NULL DEFAULT gen_random_uuid()
+            )
+        """))
+        # Tables created before the token column
+        conn.execute(text(f"""
+            ALTER TABLE {schema_name}.data_generation
+            ADD COLUMN IF NOT EXISTS token UUID NOT NULL DEFAULT gen_random_uuid()
+        """))
+        return conn.execute(text(f"""
+            INSERT INTO {schema_name}.data_generation (generation, loaded_at, token)
+            VALUES (1, now(), gen_random_uuid())
+            ON CONFLICT (id) DO UPDATE
+            SET generation = {schema_name}.data_generation.generation + 1,
+                loaded_at = now(),
+                token = gen_random_uuid()
+            RETURNING generation
+        """)).scalar()
+
+
+def get_partitioned_tables(schema_name, engine):
+    """
+    Returns the names of the partitioned tables of a schema.
+    """
+    query = text("""
+        SELECT c.relname
+        FROM pg_partitioned_table pt
+        JOIN pg_class c ON c.oid = pt.partrelid
+        JOIN pg_namespace n ON n.oid = c.relnamespace
+        WHERE n.nspname = :schema_name
+    """)
+
+    with engine.connect() as conn:
+        return set(conn.execute(query, {"schema_name": schema_name}).scalars())
+
+
+def run_parallel(groups, engine, workers, maintenance_work_mem):
+    """
+    Runs groups of statements in parallel, one database session per group.
+
+    Statements inside a group run in order on the same session, which is how
+    operations that would block each other on the same table are serialized.
+
+    Args:
+        groups (list[list[str]]): Statements to run, grouped by session.
+        engine (sqlalchemy.engine.Engine): SQLAlchemy engine.
+        workers (int): Maximum number of concurrent sessions.
+        maintenance_work_mem (str): Memory granted to each index build.
+    """
+    def run_group(statements):
+        with engine.connect() as conn:
+            conn.execute(text(f"SET maintenance_work_mem = '{maintenance_work_mem}'"))
+            for statement in statements:
+                conn.execute(text(statement))
+                conn.commit()
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(run_group, [group for group in groups if group]))
+
+
+def build_constraints(schema_name, engine, workers=4, maintenance_work_mem="512MB"):
+    """
+    Builds the primary keys, secondary indexes and foreign keys of tables that
+    were created bare with fast_load=True and already hold their data.
+
+    1. Every primary key index and secondary index is built in parallel
+       sessions. CREATE INDEX only takes a SHARE lock, so several indexes of
+       the same table can be built at the same time.
+    2. The unique indexes are attached as primary keys (USING INDEX).
+    3. Foreign keys are added as NOT VALID, which does not scan the tables.
+    4. The foreign keys are validated in parallel, one session per table,
+       since VALIDATE CONSTRAINT conflicts with itself on the same table.
+
+    Partitioned tables support neither PRIMARY KEY USING INDEX nor NOT VALID
+    foreign keys, so their keys are added directly inside their session.
+
+    Args:
+        schema_name (str): Database schema name.
+        engine (sqlalchemy.engine.Engine): SQLAlchemy engine.
+        workers (int): Maximum number of concurrent sessions.
+        maintenance_work_mem (str): Memory granted to each index build.
+    """
+    partitioned = get_partitioned_tables(schema_name, engine)
+
+    start = time.perf_counter()
+    index_groups = []
+    for table_name, columns in PRIMARY_KEYS.items():
+        if table_name in partitioned:
+            index_groups.append([
+                f"ALTER TABLE {schema_name}.{table_name} ADD CONSTRAINT {table_name}_pkey PRIMARY KEY ({', '.join(columns)})"
+            ])
+        else:
+            index_groups.append([
+                f"CREATE UNIQUE INDEX {table_name}_pkey ON {schema_name}.{table_name} ({', '.join(columns)})"
+            ])
+    index_groups += [[create_index_sql(schema_name, *index)] for index in INDEXES]
+    run_parallel(index_groups, engine, workers, maintenance_work_mem)
+
+    with engine.begin() as conn:
+        for table_name in PRIMARY_KEYS:
+            if table_name not in partitioned:
+                conn.execute(text(
+                    f"ALTER TABLE {schema_name}.{table_name} "
+                    f"ADD CONSTRAINT {table_name}_pkey PRIMARY KEY USING INDEX {table_name}_pkey"
+                ))
+    print(f"Primary keys and indexes built in {time.perf_counter() - start:.2f} seconds.")
+
+    start = time.perf_counter()
+    validate_groups = {}
+    with engine.begin() as conn:
+        for table_name, columns, ref_table, ref_columns in FOREIGN_KEYS:
+            constraint = foreign_key_name(table_name, ref_table)
+            add_sql = (
+                f"ALTER TABLE {schema_name}.{table_name} ADD CONSTRAINT {constraint} "
+                f"FOREIGN KEY ({', '.join(columns)}) REFERENCES {schema_name}.{ref_table} ({', '.join(ref_columns)})"
+            )
+
+            if table_name in partitioned:
+                validate_groups.setdefault(table_name, []).append(add_sql)
+            else:
+                conn.execute(text(f"{add_sql} NOT VALID"))
+                validate_groups.setdefault(table_name, []).append(
+                    f"ALTER TABLE {schema_name}.{table_name} VALIDATE CONSTRAINT {constraint}"
+                )
+
+    run_parallel(list(validate_groups.values()), engine, workers, maintenance_work_mem)
+    print(f"Foreign keys validated in {time.perf_counter() - start:.2f} seconds.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Creates the F1 tables in PostgreSQL.")
+    parser.add_argument("schema_name", help="Target database schema.")
+    parser.add_argument(
+        "--partition-by",
+        choices=PARTITION_STRATEGIES,
+        default=None,
+        help="Partition telemetrys on session_key (LIST: one partition per session, created by insert_data.py).",
+    )
+    parser.add_argument(
+        "--partition-positions",
+        action="store_true",
+        help="Also partition positions on session_key.",
+    )
+    parser.add_argument(
+        "--hash-partitions",
+        type=int,
+        default=8,
+        help="Number of partitions when --partition-by hash.",
+    )
+    parser.add_argument(
+        "--fast-load",
+        action="store_true",
+        help="Create the tables without keys or indexes; run insert_data.py with --fast-load to build them after the load.",
+    )
+    parser.add_argument(
+        "--compact",
+        action="store_true",
+        help="Use SMALLINT/REAL where the value domain allows (COMPACT_TYPES).",
+    )
+    args = parser.parse_args()
+
+    schema_sql = build_schema_sql(
+        args.schema_name,
+        partition_by=args.partition_by,
+        partition_positions=args.partition_positions,
+        hash_partitions=args.hash_partitions,
+        fast_load=args.fast_load,
+        compact=args.compact,
+    )
+
+    engine = create_engine(DATABASE_URL)
+    run_schema_sql(schema_sql, engine)
+
+    bump_data_generation(args.schema_name, engine)
\ No newline at end of file
@@ -0,0 +1,697 @@
+import argparse
+import os
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+# Shape of a scale factor 1 dataset; --scale multiplies the number of meetings
+DEFAULT_MEETINGS = 4
+DEFAULT_SESSIONS_PER_MEETING = 2
+DEFAULT_DRIVERS = 20
+DEFAULT_LAPS = 57
+DEFAULT_HZ = 4.0
+
+SESSION_NAMES = ["Practice 1", "Practice 2", "Practice 3", "Qualifying", "Race"]
+COMPOUNDS = ["SOFT", "MEDIUM", "HARD"]
+
+# (short name, country code, country name, location, gmt offset)
+CIRCUITS = [
+    ("Sakhir", "BRN", "Bahrain", "Sakhir", "03:00:00"),
+    ("Jeddah", "KSA", "Saudi Arabia", "Jeddah", "03:00:00"),
+    ("Melbourne", "AUS", "Australia", "Melbourne", "11:00:00"),
+    ("Suzuka", "JPN", "Japan", "Suzuka", "09:00:00"),
+    ("Shanghai", "CHN", "China", "Shanghai", "08:00:00"),
+    ("Miami", "USA", "United States", "Miami", "-04:00:00"),
+    ("Imola", "ITA", "Italy", "Imola", "02:00:00"),
+    ("Monte Carlo", "MON", "Monaco", "Monaco", "02:00:00"),
+    ("Montreal", "CAN", "Canada", "Montréal", "-04:00:00"),
+    ("Catalunya", "ESP", "Spain", "Barcelona", "02:00:00"),
+    ("Silverstone", "GBR", "United Kingdom", "Silverstone", "01:00:00"),
+    ("Spa-Francorchamps", "BEL", "Belgium", "Stavelot", "02:00:00"),
+    ("Zandvoort", "NED", "Netherlands", "Zandvoort", "02:00:00"),
+    ("Monza", "ITA", "Italy", "Monza", "02:00:00"),
+    ("Singapore", "SGP", "Singapore", "Marina Bay", "08:00:00"),
+    ("Interlagos", "BRA", "Brazil", "São Paulo", "-03:00:00"),
+]
+
+# (team, colour); every team runs two cars
+TEAMS = [
+    ("Red Bull Racing", "3671C6"),
+    ("Ferrari", "E8002D"),
+    ("Mercedes", "27F4D2"),
+    ("McLaren", "FF8000"),
+    ("Aston Martin", "229971"),
+    ("Alpine", "0093CC"),
+    ("Williams", "64C4FF"),
+    ("RB", "6692FF"),
+    ("Kick Sauber", "52E252"),
+    ("Haas F1 Team", "B6BABD"),
+]
+
+DRIVER_NUMBERS = [1, 30, 16, 55, 44, 63, 4, 81, 14, 18, 10, 31, 23, 11, 22, 3, 24, 77, 20, 27]
+
+# Session and driver the parametrized reports use by default (queries.py,
+# flux_queries.py): the first session gets this key and driver 30 is on the
+# grid, so the default reports are not empty on a synthetic dataset
+DEFAULT_SESSION_KEY = 9998
+FIRST_SESSION_KEY = 9001
+
+FIRST_MEETING = np.datetime64("2025-03-02T13:00:00", "us")
+
+# Random streams, combined with the seed and the entity key so that every
+# file depends only on its own key and not on the generation order
+CIRCUIT_STREAM = 1
+DRIVER_STREAM = 2
+LAP_STREAM = 3
+TELEMETRY_STREAM = 4
+WEATHER_STREAM = 5
+
+PROFILE_POINTS = 2000
+GEAR_TOPS = np.array([0.26, 0.37, 0.47, 0.57, 0.67, 0.77, 0.88, 1.10])
+
+# Lap time offset (s) and degradation (s per lap of tyre age) of each compound
+COMPOUND_PACE = {"SOFT": (-0.7, 0.09), "MEDIUM": (0.0, 0.05), "HARD": (0.5, 0.03)}
+
+TELEMETRY_FILE = "session_key={session_key}&driver_number={driver_number}.parquet"
+
+def to_iso(dates):
+    """
+    Renders datetime64 values as the ISO 8601 UTC strings of the OpenF1 API.
+
+    Args:
+        dates (np.ndarray): datetime64 values.
+
+    Returns:
+        np.ndarray: Strings such as "2025-03-02T13:00:00.250000+00:00".
+    """
+    return np.char.add(np.datetime_as_string(np.asarray(dates, dtype="datetime64[us]"), unit="us"), "+00:00")
+
+def seconds(values):
+    """
+    Converts seconds (float) to timedelta64 microseconds.
+    """
+    return (np.asarray(values) * 1e6).astype("timedelta64[us]")
+
+def circuit_profile(circuit_key, seed):
+    """
+    Builds the speed profile of a circuit over one lap.
+
+    The track is a flat-out baseline with a Gaussian dip for every corner.
+    The share of lap time spent at each point follows from the speed, and the
+    sector boundaries, DRS zones and reference lap time are derived from it.
+
+    Args:
+        circuit_key (int): Circuit identifier.
+        seed (int): Dataset seed.
+
+    Returns:
+        dict: speed (km/h per point), time_fraction (cumulative share of the
+        lap time), accel (normalized speed gradient), drs_zone (bool per
+        point), sector_fraction (share of the lap time of sectors 1 and 2),
+        sector_points, lap_time (s) and vmax.
+    """
+    rng = np.random.default_rng([seed, CIRCUIT_STREAM, circuit_key])
+    x = np.arange(PROFILE_POINTS) / PROFILE_POINTS
+
+    vmax = rng.uniform(315, 340)
+    corners = rng.integers(12, 21)
+    centers = np.sort(rng.uniform(0.03, 0.97, corners))
+    depths = rng.uniform(70, 230, corners)
+    widths = rng.uniform(0.015, 0.045, corners)
+
+    # Corners are asymmetric: a short braking zone before the apex and a
+    # longer traction zone after it
+    distance = (x[:, None] - centers[None, :] + 0.5) % 1 - 0.5
+    widths = np.where(distance < 0, 0.3 * widths, widths)
+    speed = np.clip(vmax - np.max(depths * np.exp(-((distance / widths) ** 2)), axis=1), 70, vmax)
+
+    dwell = 1 / speed
+    time_fraction = np.cumsum(dwell) / dwell.sum()
+    accel = np.gradient(speed) * PROFILE_POINTS / vmax
+
+    sector_points = (
+        int(rng.uniform(0.30, 0.36) * PROFILE_POINTS),
+        int(rng.uniform(0.63, 0.70) * PROFILE_POINTS),
+    )
+    length_km = rng.uniform(4.3, 6.5)
+
+    return {
+        "speed": speed,
+        "time_fraction": time_fraction,
+        "accel": accel,
+        "drs_zone": speed > 0.995 * vmax,
+        "sector_fraction": time_fraction[list(sector_points)],
+        "sector_points": sector_points,
+        "lap_time": length_km * dwell.mean() * 3600,
+        "vmax": vmax,
+    }
+
+def session_laps(session_name, laps):
+    """
+    Returns how many laps a session runs: the full distance for the race,
+    fewer for qualifying and practice.
+    """
+    if session_name == "Race":
+        return laps
+    if session_name == "Qualifying":
+        return max(laps // 4, 3)
+    return max(laps // 2, 3)
+
+def plan_stints(rng, session_name, laps):
+    """
+    Splits a driver's laps into tyre stints.
+
+    The race has one or two stops and uses at least two compounds; the other
+    sessions run a single stint of softs.
+
+    Returns:
+        list[tuple]: (stint_number, lap_start, lap_end, compound, tyre_age_at_start)
+    """
+    if session_name != "Race" or laps < 8:
+        return [(1, 1, laps, "SOFT", 0)]
+
+    stops = int(rng.integers(1, 3))
+    stop_laps = np.sort(rng.choice(np.arange(int(laps * 0.25), int(laps * 0.8)), stops, replace=False))
+    compounds = list(rng.choice(COMPOUNDS, stops + 1))
+    if len(set(compounds)) == 1:
+        compounds[-1] = COMPOUNDS[(COMPOUNDS.index(compounds[-1]) + 1) % len(COMPOUNDS)]
+
+    bounds = [0, *stop_laps.tolist(), laps]
+    return [
+        (number + 1, bounds[number] + 1, bounds[number + 1], compounds[number], 3 if number == 0 else 0)
+        for number in range(stops + 1)
+    ]
+
+def simulate_laps(profile, session, driver, seed, laps):
+    """
+    Simulates the laps, stints and pit stops of one driver in one session.
+
+    Lap times follow the circuit's reference time, the driver's pace, fuel
+    burn and the compound and age of the tyres, plus the pit lane loss on
+    the laps that end in a stop. Sector times split each lap by the share of
+    the profile's time spent in each sector.
+
+    Args:
+        profile (dict): Output of circuit_profile.
+        session (dict): session_key, session_name and date_start (datetime64).
+        driver (dict): driver_number and pace (lap time multiplier).
+        seed (int): Dataset seed.
+        laps (int): Laps of the session.
+
+    Returns:
+        tuple: (laps, stints, pits) lists of row dicts, plus the lap start
+        times and durations as arrays for the telemetry.
+    """
+    rng = np.random.default_rng([seed, LAP_STREAM, session["session_key"], driver["driver_number"]])
+    stints = plan_stints(rng, session["session_name"], laps)
+
+    durations = np.empty(laps)
+    pits = []
+    for stint_number, lap_start, lap_end, compound, age in stints:
+        offset, degradation = COMPOUND_PACE[compound]
+        for lap in range(lap_start, lap_end + 1):
+            tyre_age = age + lap - lap_start
+            durations[lap - 1] = (
+                profile["lap_time"] * driver["pace"]
+                + offset
+                + degradation * tyre_age
+                - 0.03 * lap
+                + rng.normal(0, 0.25)
+            )
+
+        if lap_end < laps:
+            pit_duration = rng.uniform(20.0, 26.0)
+            durations[lap_end - 1] += pit_duration
+            pits.append((lap_end, pit_duration))
+
+    durations[0] += rng.uniform(3.0, 6.0)
+
+    starts = session["date_start"] + seconds(np.concatenate([[0.0], np.cumsum(durations)[:-1]]))
+
+    share = np.diff(np.concatenate([[0.0], profile["sector_fraction"], [1.0]]))
+    share = share * rng.normal(1.0, 0.01, (laps, 3))
+    sectors = durations[:, None] * share / share.sum(axis=1, keepdims=True)
+
+    sector_points = profile["sector_points"]
+    speed_scale = profile["lap_time"] / durations
+    out_laps = {pit_lap + 1 for pit_lap, _ in pits}
+    lap_rows = []
+    for lap in range(laps):
+        lap_rows.append({
+            "session_key": session["session_key"],
+            "driver_number": driver["driver_number"],
+            "lap_number": lap + 1,
+            "date_start": starts[lap],
+            "duration_sector_1": round(sectors[lap, 0], 3),
+            "duration_sector_2": round(sectors[lap, 1], 3),
+            "duration_sector_3": round(sectors[lap, 2], 3),
+            "lap_duration": round(durations[lap], 3),
+            "segments_sector_1": rng.choice([2048, 2049, 2051], 8, p=[0.3, 0.6, 0.1]).tolist(),
+            "segments_sector_2": rng.choice([2048, 2049, 2051], 9, p=[0.3, 0.6, 0.1]).tolist(),
+            "segments_sector_3": rng.choice([2048, 2049, 2051], 7, p=[0.3, 0.6, 0.1]).tolist(),
+            "i1_speed": float(round(profile["speed"][sector_points[0]] * min(speed_scale[lap], 1.05))),
+            "i2_speed": float(round(profile["speed"][sector_points[1]] * min(speed_scale[lap], 1.05))),
+            "is_pit_out_lap": lap + 1 in out_laps,
+            "st_speed": float(round(profile["vmax"] * min(speed_scale[lap], 1.05) + rng.normal(0, 2))),
+        })
+
+    stint_rows = [
+        {
+            "session_key": session["session_key"],
+            "driver_number": driver["driver_number"],
+            "stint_number": stint_number,
+            "lap_start": lap_start,
+            "lap_end": lap_end,
+            "compound": compound,
+            "tyre_age_at_start": age,
+        }
+        for stint_number, lap_start, lap_end, compound, age in stints
+    ]
+
+    pit_rows = [
+        {
+            "session_key": session["session_key"],
+            "driver_number": driver["driver_number"],
+            "lap_number": lap,
+            "date": starts[lap - 1] + seconds(durations[lap - 1] - pit_duration / 2),
+            "pit_duration": round(pit_duration, 1),
+        }
+        for lap, pit_duration in pits
+    ]
+
+    return lap_rows, stint_rows, pit_rows, starts, durations
+
+def simulate_telemetry(profile, session, driver, seed, starts, durations, hz):
+    """
+    Simulates the car data of one driver over a session.
+
+    Samples are taken at about `hz` per second with jitter. Each one is placed
+    on the circuit profile from its share of the lap time; speed scales with
+    the lap's pace, braking and throttle follow the speed gradient, the gear
+    and rpm follow the speed, and DRS opens in the DRS zones on the race laps
+    where the driver is within a second of the car ahead.
+
+    Args:
+        profile (dict): Output of circuit_profile.
+        session (dict): session_key and session_name.
+        driver (dict): driver_number.
+        seed (int): Dataset seed.
+        starts (np.ndarray): datetime64 start of every lap.
+        durations (np.ndarray): Duration (s) of every lap.
+        hz (float): Samples per second.
+
+    Returns:
+        pd.DataFrame: One row per sample, without meeting_key.
+    """
+    rng = np.random.default_rng([seed, TELEMETRY_STREAM, session["session_key"], driver["driver_number"]])
+
+    total = durations.sum()
+    samples = int(total * hz)
+    offsets = np.arange(samples) / hz + rng.uniform(0, 0.2 / hz, samples)
+
+    lap_ends = np.cumsum(durations)
+    lap = np.minimum(np.searchsorted(lap_ends, offsets, side="right"), len(durations) - 1)
+    lap_offset = offsets - (lap_ends[lap] - durations[lap])
+    point = np.minimum(np.searchsorted(profile["time_fraction"], lap_offset / durations[lap]), PROFILE_POINTS - 1)
+
+    vmax = profile["vmax"]
+    pace = np.minimum(profile["lap_time"] / durations[lap], 1.03)
+    speed = profile["speed"][point] * pace + rng.normal(0, 2.5, samples)
+
+    drs = np.zeros(samples, dtype="int64")
+    if session["session_name"] == "Race":
+        eligible = rng.random(len(durations)) < 0.35
+        eligible[:2] = False
+        drs[eligible[lap]] = 8
+        opened = eligible[lap] & profile["drs_zone"][point]
+        drs[opened] = 12
+        speed[opened] += 10
+
+    accel = profile["accel"][point]
+    brake = np.where(accel < -2.0, 100, 0)
+    throttle = np.where(
+        accel < -2.0,
+        0,
+        np.where(
+            (accel > 1.0) | (speed > 0.9 * vmax),
+            100,
+            40 + 60 * (speed / vmax),
+        ),
+    )
+    throttle = np.clip(throttle + rng.normal(0, 3, samples), 0, 100)
+
+    gear = np.clip(np.searchsorted(GEAR_TOPS * vmax, speed) + 1, 1, 8)
+    lower = np.where(gear > 1, GEAR_TOPS[np.maximum(gear - 2, 0)] * vmax, 0)
+    upper = GEAR_TOPS[gear - 1] * vmax
+    rpm = np.clip(7000 + 4800 * (speed - lower) / (upper - lower) + rng.normal(0, 150, samples), 4000, 12500)
+
+    return pd.DataFrame({
+        "session_key": session["session_key"],
+        "driver_number": driver["driver_number"],
+        "date": to_iso(starts[0] + seconds(offsets)),
+        "brake": brake.astype("int64"),
+        "drs": drs,
+        "n_gear": gear.astype("int64"),
+        "rpm": np.round(rpm).astype("int64"),
+        "speed": np.round(np.clip(speed, 0, None)).astype("int64"),
+        "throttle": np.round(throttle).astype("int64"),
+    })
+
+def simulate_weather(session, seed, date_end):
+    """
+    Simulates one weather sample per minute of a session, with slowly drifting
+    temperatures and, in some sessions, a spell of rain that cools the track.
+
+    Returns:
+        pd.DataFrame: weather_conditions rows, without meeting_key.
+    """
+    rng = np.random.default_rng([seed, WEATHER_STREAM, session["session_key"]])
+
+    minutes = int((date_end - session["date_start"]) / np.timedelta64(1, "m")) + 1
+    drift = np.cumsum(rng.normal(0, 0.08, minutes))
+
+    rain = np.zeros(minutes, dtype="int64")
+    if rng.random() < 0.15:
+        start = int(rng.integers(0, minutes))
+        rain[start:start + int(rng.integers(10, 60))] = 1
+
+    track = rng.uniform(24, 48) + drift - 8 * rain
+    air = track - rng.uniform(7, 15) + 0.3 * drift
+    return pd.DataFrame({
+        "session_key": session["session_key"],
+        "date": to_iso(session["date_start"] + np.arange(minutes).astype("timedelta64[m]")),
+        "air_temperature": np.round(air, 1),
+        "humidity": np.round(np.clip(rng.uniform(35, 70) + 25 * rain + rng.normal(0, 1, minutes), 10, 100), 1),
+        "pressure": np.round(rng.uniform(1000, 1020) + np.cumsum(rng.normal(0, 0.05, minutes)), 1),
+        "rainfall": rain,
+        "track_temperature": np.round(track, 1),
+        "wind_direction": (rng.uniform(0, 360) + np.cumsum(rng.normal(0, 3, minutes))).round().astype("int64") % 360,
+        "wind_speed": np.round(np.abs(rng.uniform(0.5, 4) + np.cumsum(rng.normal(0, 0.05, minutes))), 1),
+    })
+
+def simulate_driver_session(task):
+    """
+    Simulates one driver in one session and writes the driver's telemetry
+    file. Runs in the worker processes of generate_dataset.
+
+    Args:
+        task (tuple): (output_dir, seed, laps, hz, session, driver, circuit_key)
+
+    Returns:
+        dict: laps, stints and pits rows, the session's last lap end
+        (datetime64) and the number of telemetry rows written.
+    """
+    output_dir, seed, laps, hz, session, driver, circuit_key = task
+    profile = circuit_profile(circuit_key, seed)
+
+    lap_rows, stint_rows, pit_rows, starts, durations = simulate_laps(
+        profile, session, driver, seed, session_laps(session["session_name"], laps)
+    )
+
+    df_telemetry = simulate_telemetry(profile, session, driver, seed, starts, durations, hz)
+    df_telemetry.insert(0, "meeting_key", session["meeting_key"])
+    df_telemetry.to_parquet(
+        os.path.join(output_dir, "telemetrys", TELEMETRY_FILE.format(**session, **driver)),
+        index=False,
+    )
+
+    return {
+        "laps": lap_rows,
+        "stints": stint_rows,
+        "pits": pit_rows,
+        "end": starts[-1] + seconds(durations[-1]),
+        "telemetry_rows": len(df_telemetry),
+    }
+
+def build_calendar(meetings, sessions_per_meeting):
+    """
+    Builds the meetings and sessions of the dataset: one meeting a week,
+    cycling through CIRCUITS, each running the last `sessions_per_meeting`
+    entries of SESSION_NAMES on consecutive days.
+
+    Returns:
+        tuple: (meetings, sessions) lists of dicts; date_start is datetime64.
+    """
+    meeting_rows, session_rows = [], []
+    names = SESSION_NAMES[-sessions_per_meeting:]
+
+    for number in range(meetings):
+        circuit_key = number % len(CIRCUITS) + 1
+        short_name, country_code, country_name, location, gmt_offset = CIRCUITS[circuit_key - 1]
+        meeting_key = 1000 + number + 1
+        date_start = FIRST_MEETING + np.timedelta64(7 * number, "D")
+        year = int(str(date_start)[:4])
+
+        meeting_rows.append({
+            "meeting_key": meeting_key,
+            "meeting_name": f"{country_name} Grand Prix",
+            "meeting_official_name": f"FORMULA 1 {country_name.upper()} GRAND PRIX {year}",
+            "circuit_key": circuit_key,
+            "circuit_short_name": short_name,
+            "country_key": circuit_key,
+            "country_code": country_code,
+            "country_name": country_name,
+            "date_start": date_start,
+            "gmt_offset": gmt_offset,
+            "location": location,
+            "year": year,
+            "meeting_code": country_code,
+        })
+
+        for day, session_name in enumerate(names):
+            session_key = FIRST_SESSION_KEY + len(session_rows) - 1
+            if not session_rows:
+                session_key = DEFAULT_SESSION_KEY
+            elif session_key >= DEFAULT_SESSION_KEY:
+                session_key += 1
+
+            session_rows.append({
+                "session_key": session_key,
+                "meeting_key": meeting_key,
+                "session_name": session_name,
+                "session_type": session_name.split()[0],
+                "date_start": date_start + np.timedelta64(day, "D"),
+                "circuit_key": circuit_key,
+                "circuit_short_name": short_name,
+                "country_key": circuit_key,
+                "country_code": country_code,
+                "country_name": country_name,
+                "location": location,
+                "gmt_offset": gmt_offset,
+                "year": year,
+            })
+
+    return meeting_rows, session_rows
+
+def build_drivers(count, seed):
+    """
+    Returns the drivers of the grid, two per team, with their pace (a lap
+    time multiplier) drawn once for the whole season.
+    """
+    drivers = []
+    for index in range(count):
+        driver_number = DRIVER_NUMBERS[index] if index < len(DRIVER_NUMBERS) else 100 + index
+        team_name, team_colour = TEAMS[(index // 2) % len(TEAMS)]
+        rng = np.random.default_rng([seed, DRIVER_STREAM, driver_number])
+        last_name = f"Driver{driver_number}"
+
+        drivers.append({
+            "driver_number": driver_number,
+            "pace": 1.0 + abs(rng.normal(0, 0.008)),
+            "full_name": f"Pilot {last_name.upper()}",
+            "country_code": CIRCUITS[index % len(CIRCUITS)][1],
+            "team_name": team_name,
+            "broadcast_name": f"P {last_name.upper()}",
+            "first_name": "Pilot",
+            "headshot_url": f"https://example.com/headshots/{driver_number}.png",
+            "last_name": last_name,
+            "name_acronym": f"D{driver_number:02d}"[:3],
+            "team_colour": team_colour,
+        })
+
+    return drivers
+
+def build_positions(df_laps):
+    """
+    Ranks the drivers of every session at the end of each lap by the time
+    they crossed the line.
+
+    Returns:
+        pd.DataFrame: positions rows, without meeting_key.
+    """
+    df_positions = df_laps[["session_key", "driver_number", "lap_number"]].copy()
+    df_positions["date"] = df_laps["date_start"] + seconds(df_laps["lap_duration"].to_numpy())
+    df_positions["position"] = (
+        df_positions.groupby(["session_key", "lap_number"])["date"].rank(method="first").astype("int64")
+    )
+    return df_positions[["session_key", "driver_number", "date", "position"]]
+
+def write_table(df, output_dir, folder, name, meeting_keys=None):
+    """
+    Writes one of the single-file tables, adding meeting_key from the
+    session when the table has it in the source data and rendering the
+    datetime64 columns as ISO strings.
+    """
+    df = df.copy()
+    if meeting_keys is not None:
+        df.insert(0, "meeting_key", df["session_key"].map(meeting_keys))
+
+    for column in df.columns:
+        if pd.api.types.is_datetime64_any_dtype(df[column]):
+            df[column] = to_iso(df[column].to_numpy())
+
+    os.makedirs(os.path.join(output_dir, folder), exist_ok=True)
+    df.to_parquet(os.path.join(output_dir, folder, f"{name}.parquet"), index=False)
+    return len(df)
+
+def generate_dataset(
+    output_dir="./data",
+    scale=1,
+    meetings=DEFAULT_MEETINGS,
+    sessions_per_meeting=DEFAULT_SESSIONS_PER_MEETING,
+    drivers=DEFAULT_DRIVERS,
+    laps=DEFAULT_LAPS,
+    hz=DEFAULT_HZ,
+    seed=0,
+    workers=None,
+    force=False,
+):
+    """
+    Writes a synthetic dataset with the `data/` layout that insert_data.py and
+    arrow_queries.ParquetSource read.
+
+    The volume is (meetings x scale) x sessions_per_meeting sessions, each
+    with `drivers` drivers, `laps` race laps and telemetry at `hz` samples
+    per second. The output only depends on these arguments and the seed,
+    whatever the number of workers.
+
+    Args:
+        output_dir (str): Directory to write the dataset to.
+        scale (int): Multiplier of the number of meetings.
+        meetings (int): Meetings at scale 1.
+        sessions_per_meeting (int): Sessions per meeting, the last ones of
+            SESSION_NAMES (2 = Qualifying and Race).
+        drivers (int): Drivers per session.
+        laps (int): Race laps; qualifying and practice run fewer.
+        hz (float): Telemetry samples per second.
+        seed (int): Random seed.
+        workers (int | None): Processes simulating the drivers.
+        force (bool): Replace an existing dataset in output_dir.
+
+    Returns:
+        dict: Table name -> rows written.
+    """
+    if not 1 <= sessions_per_meeting <= len(SESSION_NAMES):
+        raise ValueError(f"sessions_per_meeting must be between 1 and {len(SESSION_NAMES)}")
+
+    telemetry_dir = os.path.join(output_dir, "telemetrys")
+    if os.path.isdir(telemetry_dir) and os.listdir(telemetry_dir):
+        if not force:
+            raise FileExistsError(f"{output_dir} already holds a dataset (use --force to replace it)")
+        for folder in ("meetings", "sessions", "drivers", "laps", "pits", "positions", "stints", "weather_conditions", "telemetrys"):
+            shutil.rmtree(os.path.join(output_dir, folder), ignore_errors=True)
+    os.makedirs(telemetry_dir, exist_ok=True)
+
+    meeting_rows, session_rows = build_calendar(meetings * scale, sessions_per_meeting)
+    grid = build_drivers(drivers, seed)
+    meeting_keys = {session["session_key"]: session["meeting_key"] for session in session_rows}
+
+    tasks = [
+        (
+            output_dir,
+            seed,
+            laps,
+            hz,
+            {key: session[key] for key in ("session_key", "meeting_key", "session_name", "date_start")},
+            {"driver_number": driver["driver_number"], "pace": driver["pace"]},
+            session["circuit_key"],
+        )
+        for session in session_rows
+        for driver in grid
+    ]
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(simulate_driver_session, tasks, chunksize=max(len(tasks) // 64, 1)))
+
+    ends = {}
+    for task, result in zip(tasks, results):
+        session_key = task[4]["session_key"]
+        ends[session_key] = max(ends.get(session_key, result["end"]), result["end"])
+
+    for session in session_rows:
+        session["date_end"] = ends[session["session_key"]] + np.timedelta64(10, "m")
+
+    df_laps = pd.DataFrame([row for result in results for row in result["laps"]])
+    df_weather = pd.concat(
+        [simulate_weather(session, seed, session["date_end"]) for session in session_rows],
+        ignore_index=True,
+    )
+    df_drivers = pd.DataFrame([
+        {"session_key": session["session_key"], **{key: value for key, value in driver.items() if key != "pace"}}
+        for session in session_rows
+        for driver in grid
+    ])
+
+    columns = ["session_key", "meeting_key", "session_name", "circuit_short_name", "session_type", "date_start",
+               "date_end", "circuit_key", "country_key", "country_code", "country_name", "location", "gmt_offset", "year"]
+
+    return {
+        "meetings": write_table(pd.DataFrame(meeting_rows), output_dir, "meetings", "meetings"),
+        "sessions": write_table(pd.DataFrame(session_rows)[columns], output_dir, "sessions", "sessions"),
+        "drivers": write_table(df_drivers, output_dir, "drivers", "drivers", meeting_keys),
+        "laps": write_table(df_laps, output_dir, "laps", "laps", meeting_keys),
+        "pits": write_table(
+            pd.DataFrame(
+                [row for result in results for row in result["pits"]],
+                columns=["session_key", "driver_number", "lap_number", "date", "pit_duration"],
+            ),
+            output_dir, "pits", "pits", meeting_keys,
+        ),
+        "positions": write_table(build_positions(df_laps), output_dir, "positions", "positions", meeting_keys),
+        "stints": write_table(
+            pd.DataFrame([row for result in results for row in result["stints"]]),
+            output_dir, "stints", "stints", meeting_keys,
+        ),
+        "weather_conditions": write_table(df_weather, output_dir, "weather_conditions", "weather_conditions", meeting_keys),
+        "telemetrys": sum(result["telemetry_rows"] for result in results),
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generates a synthetic F1 dataset with the data/ layout of the loaders.")
+    parser.add_argument("output_dir", nargs="?", default="./data", help="Directory to write the dataset to.")
+    parser.add_argument("--scale", type=int, default=1, help="Multiplier of the number of meetings (1, 10, 100...).")
+    parser.add_argument("--meetings", type=int, default=DEFAULT_MEETINGS, help="Meetings at scale 1.")
+    parser.add_argument(
+        "--sessions-per-meeting",
+        type=int,
+        default=DEFAULT_SESSIONS_PER_MEETING,
+        help="Sessions per meeting, counted back from the race (2 = qualifying and race).",
+    )
+    parser.add_argument("--drivers", type=int, default=DEFAULT_DRIVERS, help="Drivers per session.")
+    parser.add_argument("--laps", type=int, default=DEFAULT_LAPS, help="Race laps.")
+    parser.add_argument("--hz", type=float, default=DEFAULT_HZ, help="Telemetry samples per second.")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed; the same seed gives the same files.")
+    parser.add_argument("--workers", type=int, help="Processes simulating the drivers (default: CPU count).")
+    parser.add_argument("--force", action="store_true", help="Replace an existing dataset in output_dir.")
+    args = parser.parse_args()
+
+    start = time.time()
+    rows = generate_dataset(
+        args.output_dir,
+        scale=args.scale,
+        meetings=args.meetings,
+        sessions_per_meeting=args.sessions_per_meeting,
+        drivers=args.drivers,
+        laps=args.laps,
+        hz=args.hz,
+        seed=args.seed,
+        workers=args.workers,
+        force=args.force,
+    )
+
+    for table_name, count in rows.items():
+        print(f"{table_name}: {count} rows")
+    print(f"Dataset written to {args.output_dir} in {time.time() - start:.2f} seconds.")
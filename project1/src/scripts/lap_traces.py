@@ -0,0 +1,165 @@
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+from sqlalchemy import text
+
+TRACE_KEYS = ["session_key", "driver_number", "lap_number"]
+
+# Array columns of telemetry_lap_traces, in table order, and the NumPy type
+# each one is decoded to. offsets are the microseconds of every sample since
+# the first sample of the lap (date_start), exact at the precision of
+# TIMESTAMP; the others are the telemetrys columns of the same samples.
+TRACE_COLUMNS = {
+    "offsets": np.int64,
+    "speed": np.float32,
+    "rpm": np.int16,
+    "throttle": np.float32,
+    "brake": np.int16,
+    "n_gear": np.int16,
+    "drs": np.int16,
+    "sector": np.int16,
+}
+
+def array_literals(values, starts, dtype=np.int64):
+    """
+    Renders consecutive slices of an array as PostgreSQL array literals.
+
+    The values are formatted and joined by Arrow compute kernels, without a
+    Python str() per sample.
+
+    Args:
+        values (pd.Series): Values of every sample, grouped by lap.
+        starts (np.ndarray): Position of the first sample of each lap.
+        dtype (type): NumPy type the values are written as; they are rounded
+            when it is an integer type.
+
+    Returns:
+        list[str]: One literal ("{1,2,3}") per lap, with NULL for missing
+        values.
+    """
+    missing = values.isna().to_numpy()
+    # The placeholder 0 of the missing values is masked out below
+    numbers = pd.to_numeric(values).fillna(0)
+    if np.issubdtype(dtype, np.integer):
+        numbers = numbers.round()
+    numbers = numbers.to_numpy(dtype=dtype)
+
+    rendered = pc.fill_null(pc.cast(pa.array(numbers, mask=missing), pa.string()), "NULL")
+    laps = pa.ListArray.from_arrays(pa.array(np.r_[starts, len(numbers)], type=pa.int32()), rendered)
+    return pc.binary_join_element_wise("{", pc.binary_join(laps, ","), "}", "").to_pylist()
+
+def pack_lap_traces(df_telemetry):
+    """
+    Packs telemetry samples into one row per lap, the layout of
+    telemetry_lap_traces.
+
+    Samples are sorted by lap and date and cut at the lap boundaries; every
+    column then becomes one array literal per lap. Samples without a
+    lap_number (before the first lap) are left out.
+
+    Args:
+        df_telemetry (pd.DataFrame): Samples tagged with lap_number and
+            sector (see sectors.assign_lap_sectors).
+
+    Returns:
+        pd.DataFrame: session_key, driver_number, lap_number, date_start,
+        samples and the TRACE_COLUMNS arrays.
+    """
+    if "lap_number" not in df_telemetry.columns:
+        return pd.DataFrame(columns=[*TRACE_KEYS, "date_start", "samples", *TRACE_COLUMNS])
+
+    df_telemetry = df_telemetry.dropna(subset=["lap_number", "date"]).sort_values([*TRACE_KEYS, "date"], kind="stable")
+
+    keys = df_telemetry[TRACE_KEYS].to_numpy(dtype="int64")
+    starts = np.flatnonzero(np.r_[True, (keys[1:] != keys[:-1]).any(axis=1)]) if len(keys) else np.array([], dtype="int64")
+    samples = np.diff(np.r_[starts, len(keys)])
+
+    # Rounded to the microsecond, the precision of TIMESTAMP, as PostgreSQL
+    # does when it stores telemetrys.date
+    dates = df_telemetry["date"].dt.round("us").to_numpy(dtype="datetime64[us]")
+    date_start = dates[starts]
+    offsets = (dates - np.repeat(date_start, samples)).astype("int64")
+
+    df_traces = pd.DataFrame({
+        "session_key": keys[starts, 0],
+        "driver_number": keys[starts, 1],
+        "lap_number": keys[starts, 2],
+        "date_start": date_start,
+        "samples": samples,
+    })
+    df_traces["offsets"] = array_literals(pd.Series(offsets), starts)
+    for column, dtype in TRACE_COLUMNS.items():
+        if column != "offsets":
+            df_traces[column] = array_literals(df_telemetry[column], starts, dtype)
+
+    return df_traces
+
+def decode_array(literal, dtype):
+    """
+    Decodes the text form of a PostgreSQL array into a NumPy array.
+
+    Arrays with NULL elements are decoded as float64 with NaN in their place.
+    """
+    values = literal[1:-1]
+    if not values:
+        return np.array([], dtype=dtype)
+    if "NULL" in values:
+        return np.array([np.nan if value == "NULL" else float(value) for value in values.split(",")])
+    return np.fromstring(values, dtype=dtype, sep=",")
+
+def read_lap_traces(schema_name, engine, session_key, driver_number, lap_numbers=None, columns=None):
+    """
+    Reads the packed telemetry of a driver's laps as NumPy arrays.
+
+    The arrays are sent as text and parsed by NumPy, so a lap costs one row
+    and one parse per column instead of one tuple per sample.
+
+    Args:
+        schema_name (str): Database schema name.
+        engine (sqlalchemy.engine.Engine): SQLAlchemy engine.
+        session_key (int): Session of the laps.
+        driver_number (int): Driver of the laps.
+        lap_numbers (list[int] | None): Laps to read, every lap when None.
+        columns (list[str] | None): TRACE_COLUMNS to read, all of them when
+            None.
+
+    Returns:
+        dict: lap_number -> dict with date_start, samples and one array per
+        column. dates(trace) rebuilds the timestamps of the samples.
+    """
+    columns = list(TRACE_COLUMNS) if columns is None else list(columns)
+    unknown = set(columns) - set(TRACE_COLUMNS)
+    if unknown:
+        raise ValueError(f"Unknown trace columns: {sorted(unknown)}")
+    if "offsets" not in columns:
+        columns.insert(0, "offsets")
+
+    query = f"""
+        SELECT lap_number, date_start, samples, {", ".join(f"{column}::text" for column in columns)}
+        FROM {schema_name}.telemetry_lap_traces
+        WHERE session_key = :session_key AND driver_number = :driver_number
+    """
+    parameters = {"session_key": session_key, "driver_number": driver_number}
+    if lap_numbers is not None:
+        query += " AND lap_number = ANY(:lap_numbers)"
+        parameters["lap_numbers"] = list(lap_numbers)
+    query += " ORDER BY lap_number"
+
+    with engine.connect() as conn:
+        rows = conn.execute(text(query), parameters).fetchall()
+
+    traces = {}
+    for lap_number, date_start, samples, *arrays in rows:
+        trace = {"date_start": pd.Timestamp(date_start), "samples": samples}
+        for column, literal in zip(columns, arrays):
+            trace[column] = decode_array(literal, TRACE_COLUMNS[column])
+        traces[lap_number] = trace
+
+    return traces
+
+def dates(trace):
+    """
+    Returns the timestamps of the samples of a lap read by read_lap_traces.
+    """
+    return np.datetime64(trace["date_start"].to_datetime64(), "us") + trace["offsets"].astype("timedelta64[us]")
@@ -0,0 +1,160 @@
+import hashlib
+import os
+
+from sqlalchemy import text
+
+MANIFEST_TABLE = "load_manifest"
+HASH_BLOCKSIZE = 1024 ** 2
+
+MANIFEST_COLUMNS = ("path", "table_name", "size", "mtime", "content_hash", "rows", "status", "error")
+
+def content_hash(path):
+    """
+    Returns the SHA-256 digest of a file, read in blocks.
+
+    Args:
+        path (str): Path of the file.
+
+    Returns:
+        str: Hex digest of the file content.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for block in iter(lambda: file.read(HASH_BLOCKSIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def describe_file(path):
+    """
+    Returns the manifest fields that identify one version of a source file.
+
+    Args:
+        path (str): Path of the source file.
+
+    Returns:
+        dict: path, size, mtime (in nanoseconds) and content_hash.
+    """
+    stat = os.stat(path)
+    return {
+        "path": os.path.normpath(path),
+        "size": stat.st_size,
+        "mtime": stat.st_mtime_ns,
+        "content_hash": content_hash(path),
+    }
+
+def read_manifest(table_name, schema_name, engine):
+    """
+    Returns the manifest entries of the files loaded into a table.
+
+    Args:
+        table_name (str): Name of the target table.
+        schema_name (str): Name of the database schema.
+        engine (sqlalchemy.engine.Engine): SQLAlchemy engine.
+
+    Returns:
+        dict: Normalized path -> manifest entry (dict).
+    """
+    query = text(f"""
+        SELECT {", ".join(MANIFEST_COLUMNS)}
+        FROM {schema_name}.{MANIFEST_TABLE}
+        WHERE table_name = :table_name
+    """)
+
+    with engine.connect() as conn:
+        rows = conn.execute(query, {"table_name": table_name}).mappings().all()
+
+    return {row["path"]: dict(row) for row in rows}
+
+def file_status(path, entry):
+    """
+    Tells whether a source file is the same one a manifest entry recorded.
+
+    Size and modification time are compared first; the content hash is only
+    computed when they differ, so a touched but identical file is not
+    reloaded. Files whose last load failed are always considered changed.
+
+    Args:
+        path (str): Path of the source file.
+        entry (dict | None): Manifest entry of the file, if any.
+
+    Returns:
+        str: "unchanged", "touched" (same content with a new modification
+        time; pass it to refresh_mtimes so the next run does not hash it
+        again) or "changed" (needs to be loaded).
+    """
+    if entry is None or entry["status"] != "loaded":
+        return "changed"
+
+    stat = os.stat(path)
+    if stat.st_size != entry["size"]:
+        return "changed"
+    if stat.st_mtime_ns == entry["mtime"]:
+        return "unchanged"
+
+    return "touched" if content_hash(path) == entry["content_hash"] else "changed"
+
+def refresh_mtimes(table_name, paths, schema_name, engine):
+    """
+    Stores the current modification time of touched files (see file_status)
+    in their manifest entries.
+
+    Args:
+        table_name (str): Name of the target table.
+        paths (list[str]): Paths of the touched source files.
+        schema_name (str): Name of the database schema.
+        engine (sqlalchemy.engine.Engine): SQLAlchemy engine.
+    """
+    if not paths:
+        return
+
+    with engine.begin() as conn:
+        conn.execute(
+            text(f"""
+                UPDATE {schema_name}.{MANIFEST_TABLE}
+                SET mtime = :mtime
+                WHERE table_name = :table_name AND path = :path
+            """),
+            [
+                {"table_name": table_name, "path": os.path.normpath(path), "mtime": os.stat(path).st_mtime_ns}
+                for path in paths
+            ],
+        )
+
+def record_loads(table_name, loads, schema_name, engine):
+    """
+    Records the outcome of loading source files into a table, replacing any
+    previous entry of the same files.
+
+    Entries are replaced with DELETE + INSERT instead of ON CONFLICT so the
+    manifest can be written while a --fast-load schema has no keys yet.
+
+    Args:
+        table_name (str): Name of the target table.
+        loads (list[dict]): One dict per file with the describe_file fields
+            plus rows, status ("loaded" or "failed") and error.
+        schema_name (str): Name of the database schema.
+        engine (sqlalchemy.engine.Engine): SQLAlchemy engine.
+    """
+    if not loads:
+        return
+
+    entries = [
+        {"error": None, **load, "path": os.path.normpath(load["path"]), "table_name": table_name}
+        for load in loads
+    ]
+
+    with engine.begin() as conn:
+        conn.execute(
+            text(f"""
+                DELETE FROM {schema_name}.{MANIFEST_TABLE}
+                WHERE table_name = :table_name AND path = ANY(:paths)
+            """),
+            {"table_name": table_name, "paths": [entry["path"] for entry in entries]},
+        )
+        conn.execute(
+            text(f"""
+                INSERT INTO {schema_name}.{MANIFEST_TABLE} ({", ".join(MANIFEST_COLUMNS)}, loaded_at)
+                VALUES ({", ".join(f":{column}" for column in MANIFEST_COLUMNS)}, now())
+            """),
+            entries,
+        )
@@ -1,39 +1,363 @@
+import hashlib
 import os
+import re
+import io
 import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pa_csv
 
+from contextlib import contextmanager
 from dotenv import dotenv_values
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, text
+
+from src.scripts.compact import compact_dtypes
 
 DATABASE_URL = dotenv_values(".env.local")['DATABASE_URL']
 
-def get_data_from_table(schema_name: str, query: str, engine) -> pd.DataFrame:
+SCHEMA_NAME_PATTERN = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+BIND_PARAMETER_PATTERN = re.compile(r"(?<!:):(\w+)")
+
+# Rows fetched per round trip, and per yielded chunk, when a report streams
+STREAM_CHUNKSIZE = 50_000
+
+# Downcast the integer columns of the results and make their repetitive text
+# columns categorical (see compact.py). Off by default, so the results keep
+# the dtypes of the arrow backend and of the Flux reports; the scripts turn it
+# on with --compact-results. Streamed results keep the types the driver
+# returns, so every chunk has the same schema
+COMPACT_RESULTS = False
+
+# How a report result reaches the client: "read_sql" decodes every cell with
+# psycopg2, "copy" streams the result with COPY ... TO STDOUT and parses it
+# with Arrow (see copy_query)
+FETCH_METHODS = ("read_sql", "copy")
+
+# Arrow type of each PostgreSQL type OID a report can return; other types
+# are read as text. Every integer type is read as int64, the dtype read_sql
+# returns (downcasting is left to COMPACT_RESULTS)
+ARROW_TYPES = {
+    16: pa.bool_(),
+    20: pa.int64(),
+    21: pa.int64(),
+    23: pa.int64(),
+    700: pa.float64(),
+    701: pa.float64(),
+    1700: pa.float64(),
+    1114: pa.timestamp("us"),
+    1184: pa.timestamp("us", tz="UTC"),
+    1082: pa.date32(),
+}
+
+
+class PreparedSession:
+    """
+    Runs the reports as server-side prepared statements on one reused
+    connection.
+
+    Each distinct report SQL is PREPAREd the first time it runs and then only
+    EXECUTEd with new bind parameters, so sweeping a report over many
+    sessions pays the parse and plan cost once. Pass it as the `engine` of
+    any report function.
+    """
+
+    def __init__(self, engine):
+        self.connection = engine.connect()
+        self._prepared = {}
+
+    @contextmanager
+    def connect(self):
+        """
+        Yields the session's connection without closing it afterwards, so code
+        written for an engine (`with engine.connect() as conn`) can use it.
+        """
+
+        yield self.connection
+
+    def _prepare(self, query: str):
+        if query not in self._prepared:
+            names = list(dict.fromkeys(BIND_PARAMETER_PATTERN.findall(query)))
+            positional = BIND_PARAMETER_PATTERN.sub(lambda match: f"${names.index(match.group(1)) + 1}", query)
+            statement = f"report_{hashlib.sha1(query.encode()).hexdigest()[:16]}"
+
+            self.connection.exec_driver_sql(f"PREPARE {statement} AS {positional.strip().rstrip(';')}")
+            self._prepared[query] = (statement, names)
+
+        return self._prepared[query]
+
+    def read_sql(self, query: str, params=None) -> pd.DataFrame:
+        """
+        Executes a report query with named bind parameters (:name).
+
+        @params:
+            - query: str
+            - params: dict | None
+
+        @returns:
+            - table_data: pd.DataFrame
+        """
+
+        params = params or {}
+
+        try:
+            statement, names = self._prepare(query)
+            if names:
+                placeholders = ", ".join(["%s"] * len(names))
+                result = self.connection.exec_driver_sql(
+                    f"EXECUTE {statement} ({placeholders})",
+                    tuple(params[name] for name in names),
+                )
+            else:
+                result = self.connection.exec_driver_sql(f"EXECUTE {statement}")
+
+            table_data = pd.DataFrame.from_records(result.fetchall(), columns=list(result.keys()), coerce_float=True)
+            self.connection.commit()
+        except Exception:
+            self.connection.rollback()
+            raise
+
+        return table_data
+
+    def close(self) -> None:
+        self.connection.close()
+
+
+def check_schema_name(schema_name: str) -> str:
+    """
+    Validates a schema name before it is interpolated into a query; schemas
+    are identifiers and cannot be sent as bind parameters.
+    """
+
+    if not SCHEMA_NAME_PATTERN.match(schema_name):
+        raise ValueError(f"Invalid schema name: {schema_name!r}")
+
+    return schema_name
+
+
+def build_filters(alias: str, session_keys=None, driver_numbers=None):
+    """
+    Builds the session/driver conditions of a report as bind parameters.
+
+    @params:
+        - alias: str (table alias the conditions apply to, may be empty)
+        - session_keys: Iterable[int] | None (None keeps every session)
+        - driver_numbers: Iterable[int] | None (None keeps every driver)
+
+    @returns:
+        - (conditions, params): (str, dict) conditions joined with AND,
+          "TRUE" when there is none
+    """
+
+    prefix = f"{alias}." if alias else ""
+    conditions = []
+    params = {}
+
+    if session_keys is not None:
+        conditions.append(f"{prefix}session_key = ANY(CAST(:session_keys AS INT[]))")
+        params["session_keys"] = [int(key) for key in session_keys]
+
+    if driver_numbers is not None:
+        conditions.append(f"{prefix}driver_number = ANY(CAST(:driver_numbers AS INT[]))")
+        params["driver_numbers"] = [int(number) for number in driver_numbers]
+
+    return " AND ".join(conditions) or "TRUE", params
+
+
+def stream_query(query: str, engine, params=None, chunksize: int = STREAM_CHUNKSIZE, as_arrow: bool = False):
+    """
+    Runs a report query through a server-side cursor and yields its result
+    in chunks, so client memory stays bounded by `chunksize` rows no matter
+    how large the result is.
+
+    The query only starts when the first chunk is requested, and the
+    connection is held until the generator is exhausted or closed.
+
+    @params:
+        - query: str (with :name bind parameters)
+        - engine
+        - params: dict | None
+        - chunksize: int (rows per chunk)
+        - as_arrow: bool (yield pa.RecordBatch instead of pd.DataFrame)
+
+    @returns:
+        - chunks: Iterator[pd.DataFrame | pa.RecordBatch]
+    """
+
+    # A named cursor cannot DECLARE over an EXECUTE, so on a PreparedSession
+    # streamed reports reuse the connection but are not prepared.
+    with engine.connect() as conn:
+        try:
+            result = conn.execute(
+                text(query),
+                params or {},
+                execution_options={"stream_results": True, "max_row_buffer": chunksize},
+            )
+            columns = list(result.keys())
+
+            for rows in result.partitions(chunksize):
+                chunk = pd.DataFrame.from_records(rows, columns=columns, coerce_float=True)
+                yield pa.RecordBatch.from_pandas(chunk, preserve_index=False) if as_arrow else chunk
+        finally:
+            conn.rollback()
+
+
+def copy_csv(query: str, engine, params=None):
+    """
+    Runs a report query through COPY (...) TO STDOUT WITH (FORMAT csv).
+
+    COPY takes no bind parameters, so they are interpolated client-side by
+    psycopg2 (mogrify), with the same quoting it uses for execute. The
+    column names and types come from a LIMIT 0 run of the same query.
+
+    @params:
+        - query: str (with :name bind parameters)
+        - engine: engine or session object (anything with connect())
+        - params: dict | None
+
+    @returns:
+        - (columns, buffer): ([(name, type OID)], io.BytesIO with the CSV rows)
+    """
+
+    sql = BIND_PARAMETER_PATTERN.sub(lambda match: f"%({match.group(1)})s", query.replace("%", "%%"))
+    sql = sql.strip().rstrip(";")
+
+    buffer = io.BytesIO()
+    with engine.connect() as conn:
+        dbapi_connection = conn.connection
+        try:
+            with dbapi_connection.cursor() as cursor:
+                sql = cursor.mogrify(sql, params or {}).decode()
+                cursor.execute(f"SELECT * FROM ({sql}) AS report LIMIT 0")
+                columns = [(column.name, column.type_code) for column in cursor.description]
+                cursor.copy_expert(f"COPY ({sql}) TO STDOUT WITH (FORMAT csv)", buffer)
+        finally:
+            dbapi_connection.rollback()
+
+    buffer.seek(0)
+    return columns, buffer
+
+
+def read_copy_csv(columns, buffer) -> pd.DataFrame:
+    """
+    Parses the output of copy_csv with Arrow's CSV reader, typed from the
+    column OIDs (ARROW_TYPES), into the DataFrame read_sql would return.
+
+    @params:
+        - columns: list[(str, int)]
+        - buffer: io.BytesIO
+
+    @returns:
+        - table_data: pd.DataFrame
+    """
+
+    types = {name: ARROW_TYPES.get(oid, pa.string()) for name, oid in columns}
+    if not buffer.getbuffer().nbytes:
+        return pa.schema(types.items()).empty_table().to_pandas(coerce_temporal_nanoseconds=True)
+
+    table = pa_csv.read_csv(
+        buffer,
+        read_options=pa_csv.ReadOptions(column_names=[name for name, _ in columns]),
+        convert_options=pa_csv.ConvertOptions(
+            column_types=types,
+            true_values=["t"],
+            false_values=["f"],
+            null_values=[""],
+            strings_can_be_null=True,
+            quoted_strings_can_be_null=False,
+        ),
+    )
+    return table.to_pandas(coerce_temporal_nanoseconds=True)
+
+
+def copy_query(query: str, engine, params=None) -> pd.DataFrame:
+    """
+    Runs a report query with COPY TO STDOUT and parses the stream with
+    Arrow, without creating a Python object per cell (see copy_csv and
+    read_copy_csv).
+
+    @params:
+        - query: str (with :name bind parameters)
+        - engine
+        - params: dict | None
+
+    @returns:
+        - table_data: pd.DataFrame
+    """
+
+    return read_copy_csv(*copy_csv(query, engine, params))
+
+
+def run_query(query: str, engine, params=None, chunksize=None, fetch="read_sql"):
+    """
+    Runs a report query on an engine or on a session object (see
+    PreparedSession).
+
+    @params:
+        - query: str (with :name bind parameters)
+        - engine
+        - params: dict | None
+        - chunksize: int | None (stream the result in chunks of this many rows)
+        - fetch: str (one of FETCH_METHODS)
+
+    @returns:
+        - table_data: pd.DataFrame, or Iterator[pd.DataFrame] when chunksize is set
+    """
+
+    if fetch not in FETCH_METHODS:
+        raise ValueError(f"Unknown fetch method: {fetch}")
+
+    if chunksize is not None:
+        if fetch != "read_sql":
+            raise ValueError("Streamed results are fetched with read_sql")
+        return stream_query(query, engine, params, chunksize)
+
+    # Sessions (PreparedSession, benchmark_queries.ProfilingSession) run the
+    # query on their own connection.
+    if fetch == "copy":
+        if hasattr(engine, "copy_query"):
+            table_data = engine.copy_query(query, params)
+        else:
+            table_data = copy_query(query, engine, params)
+    elif hasattr(engine, "read_sql"):
+        table_data = engine.read_sql(query, params)
+    else:
+        table_data = pd.read_sql(text(query), engine, params=params)
+
+    return compact_dtypes(table_data) if COMPACT_RESULTS else table_data
+
+
+def get_data_from_table(schema_name: str, query: str, engine, chunksize=None) -> pd.DataFrame:
     """
     Gets data by specifying a query
 
     @params:
         - schema_name: str
         - query: str
+        - chunksize: int | None
     
     @returns:
         - table_data: pd.DataFrame
     """
 
-    table_data = pd.read_sql(query, engine)
+    table_data = run_query(query, engine, chunksize=chunksize)
 
     return table_data
 
-def get_all_drivers(schema_name: str, engine) -> pd.DataFrame:
+def get_all_drivers(schema_name: str, engine, chunksize=None, fetch="read_sql") -> pd.DataFrame:
     """
     Função que retorna todos os pilotos do banco de dados.
 
     @params:
         - schema_name: str
         - engine
+        - chunksize: int | None (retorna o resultado em blocos deste tamanho)
+        - fetch: str ("read_sql" ou "copy", ver copy_query)
     
     @returns:
         - table_data: pd.DataFrame
     """
 
+    check_schema_name(schema_name)
+
     query = f"""
         SELECT 
             DISTINCT driver_number, 
@@ -47,9 +371,9 @@ def get_all_drivers(schema_name: str, engine) -> pd.DataFrame:
         ORDER BY driver_number ASC;
     """
 
-    return pd.read_sql(query, engine)
+    return run_query(query, engine, chunksize=chunksize, fetch=fetch)
 
-def first_query(schema_name, engine) -> pd.DataFrame:
+def first_query(schema_name, engine, chunksize=None, fetch="read_sql") -> pd.DataFrame:
     """
     Função que retorna a primeira query definida pelo grupo:
 
@@ -59,96 +383,96 @@ def first_query(schema_name, engine) -> pd.DataFrame:
     @params:
         - schema_name
         - engine
+        - chunksize: int | None (retorna o resultado em blocos deste tamanho)
+        - fetch: str ("read_sql" ou "copy", ver copy_query)
     
     @returns:
         - table_data: pd.DataFrame
     """
 
+    check_schema_name(schema_name)
+
     query = f"""
         SELECT 
             tlm.session_key, 
             tlm.driver_number,
-            lap_duration,
-            CASE 
-                WHEN tlm.date > laps.date_start AND tlm.date < laps.date_start + INTERVAL '1 second' * laps.duration_sector_1 THEN 'SECTOR 1'
-                WHEN tlm.date > (laps.date_start + INTERVAL '1 second' * laps.duration_sector_1) AND tlm.date < (laps.date_start + INTERVAL '1 second' * (laps.duration_sector_1 + laps.duration_sector_2)) THEN 'SECTOR 2'
-                WHEN tlm.date > (laps.date_start + INTERVAL '1 second' * (laps.duration_sector_1 + laps.duration_sector_2)) AND (tlm.date <= laps.date_start + INTERVAL '1 second' * (laps.duration_sector_1 + laps.duration_sector_2 + laps.duration_sector_3)) THEN 'SECTOR 3'
-            END AS sector,
+            laps.lap_duration,
+            'SECTOR ' || tlm.sector AS sector,
             AVG(tlm.speed) AS max_speed
         FROM {schema_name}.telemetrys tlm
-        JOIN {schema_name}.telemetrys_laps tl
-        ON tlm.session_key = tl.session_key AND tlm.driver_number = tl.driver_number
         JOIN (
             SELECT 
                 DISTINCT ON (driver_number, session_key)
                 driver_number,
                 session_key,
-                date_start,
-                lap_duration,
-                duration_sector_1,
-                duration_sector_2,
-                duration_sector_3
+                lap_number,
+                lap_duration
             FROM {schema_name}.laps
-            WHERE session_key in (
-                SELECT session_key 
-                FROM {schema_name}.sessions
-                WHERE session_name = 'Race'
-            )
+            WHERE lap_duration IS NOT NULL
+                  AND session_key in (
+                    SELECT session_key 
+                    FROM {schema_name}.sessions
+                    WHERE session_name = 'Race'
+                  )
+            ORDER BY driver_number, session_key, lap_duration ASC
         ) laps
-        ON tlm.session_key = laps.session_key AND tlm.driver_number = laps.driver_number AND tlm.date BETWEEN laps.date_start AND laps.date_start + (INTERVAL '1 second' * (laps.duration_sector_1 + laps.duration_sector_2 + laps.duration_sector_3))
-        GROUP BY tlm.session_key, tlm.driver_number, sector, lap_duration
-        HAVING lap_duration = MIN(lap_duration)
-        ORDER BY tlm.session_key, tlm.driver_number, lap_duration, sector ASC;
+        ON tlm.session_key = laps.session_key AND tlm.driver_number = laps.driver_number AND tlm.lap_number = laps.lap_number
+        WHERE tlm.sector IS NOT NULL
+        GROUP BY tlm.session_key, tlm.driver_number, laps.lap_duration, tlm.sector
+        ORDER BY tlm.session_key, tlm.driver_number, laps.lap_duration, sector ASC;
     """
     
-    return pd.read_sql(query, engine)
+    return run_query(query, engine, chunksize=chunksize, fetch=fetch)
 
 
-def second_query(schema_name, engine) -> pd.DataFrame:
+def second_query(schema_name, engine, session_keys=(9998,), driver_numbers=None, chunksize=None, fetch="read_sql") -> pd.DataFrame:
     """
     Função que retorna a segunda query definida pelo grupo:
 
     Ver qual piloto possui a melhor aceleração por setor da pista.
 
     @params:
+        - schema_name
         - engine
+        - session_keys: Iterable[int] | None (None para todas as sessões)
+        - driver_numbers: Iterable[int] | None (None para todos os pilotos)
+        - chunksize: int | None (retorna o resultado em blocos deste tamanho)
+        - fetch: str ("read_sql" ou "copy", ver copy_query)
     
     @returns:
         - table_data: pd.DataFrame
     """
 
+    check_schema_name(schema_name)
+    filters, params = build_filters("", session_keys, driver_numbers)
+
     query = f"""
-        SELECT DISTINCT
+        SELECT
             T.driver_number,
             T.session_key,
-            CASE
-                WHEN T.date >= L.date_start AND T.date <= (L.date_start + INTERVAL '1 second' * L.duration_sector_1)::TIMESTAMP THEN 'SECTOR 1'
-                WHEN T.date >= (L.date_start + INTERVAL '1 second' + INTERVAL '1 second' * L.duration_sector_1)::TIMESTAMP AND T.date <= (L.date_start + INTERVAL '1 second' * L.duration_sector_2)::TIMESTAMP THEN 'SECTOR 2'
-                WHEN T.date >= (L.date_start + INTERVAL '1 second' + INTERVAL '1 second' * L.duration_sector_2)::TIMESTAMP AND T.date <= (L.date_start + INTERVAL '1 second' * L.duration_sector_3)::TIMESTAMP THEN 'SECTOR 3'
-            END AS Sector,
+            'SECTOR ' || T.sector AS Sector,
             AVG(T.AceleracaoInstantanea) AS AceleracaoMediaPorSetor
         FROM (
-            SELECT DISTINCT
+            SELECT
                 driver_number,
                 session_key,
-                date,
+                sector,
                 CASE
                     WHEN EXTRACT (EPOCH FROM date - LAG(date, 1) OVER W) > 0 THEN ((speed - LAG(speed, 1) OVER W) / 3.6) / EXTRACT (EPOCH FROM date - LAG(date, 1) OVER W)
                     WHEN EXTRACT (EPOCH FROM date - LAG(date, 1) OVER W) = 0 THEN 0
                 END AS AceleracaoInstantanea
             FROM {schema_name}.telemetrys
-            WHERE session_key = 9998
-            WINDOW W AS (PARTITION BY driver_number ORDER BY date)
+            WHERE {filters}
+            WINDOW W AS (PARTITION BY session_key, driver_number ORDER BY date)
         ) AS T
-        INNER JOIN {schema_name}.telemetrys_laps AS TL ON TL.session_key = T.session_key AND TL.driver_number = T.driver_number
-        INNER JOIN {schema_name}.laps AS L ON L.session_key = T.session_key AND L.driver_number = T.driver_number
-        GROUP BY T.driver_number, T.session_key, Sector
+        WHERE T.sector IS NOT NULL
+        GROUP BY T.driver_number, T.session_key, T.sector
         ORDER BY AceleracaoMediaPorSetor DESC, T.driver_number ASC;
     """
 
-    return pd.read_sql(query, engine)
+    return run_query(query, engine, params, chunksize, fetch)
 
-def third_query(schema_name, engine) -> pd.DataFrame:
+def third_query(schema_name, engine, chunksize=None, fetch="read_sql") -> pd.DataFrame:
     """
     Função que retorna a terceira query definida pelo grupo:
 
@@ -156,31 +480,51 @@ def third_query(schema_name, engine) -> pd.DataFrame:
 
     @params:
         - engine
+        - chunksize: int | None (retorna o resultado em blocos deste tamanho)
+        - fetch: str ("read_sql" ou "copy", ver copy_query)
     
     @returns:
         - table_data: pd.DataFrame
     """
 
+    check_schema_name(schema_name)
+
+    # A média é a mesma de juntar cada stint com todas as amostras de clima
+    # da sessão, mas calculada a partir das somas e contagens do rollup.
     query = f"""
         SELECT  
             TS.compound AS CompostoPneu,
-            AVG(WC.track_temperature)::NUMERIC(8,2) AS TemperaturaMediaPista,
+            (SUM(WS.track_temperature_sum) / NULLIF(SUM(WS.track_temperature_count), 0))::NUMERIC(8,2) AS TemperaturaMediaPista,
             MAX(TS.lap_end - TS.lap_start) AS MaxLapDurationTyre
         FROM {schema_name}.tyre_stints AS TS
-        INNER JOIN {schema_name}.weather_conditions AS WC ON WC.session_key = TS.session_key
+        INNER JOIN {schema_name}.weather_session_stats AS WS ON WS.session_key = TS.session_key
         GROUP BY TS.compound
         ORDER BY MaxLapDurationTyre DESC;
     """
 
-    return pd.read_sql(query, engine)
+    return run_query(query, engine, chunksize=chunksize, fetch=fetch)
 
-def fourth_query(schema_name, engine) -> pd.DataFrame:
+def fourth_query(schema_name, engine, session_keys=(9998,), driver_numbers=(30,), chunksize=None, fetch="read_sql") -> pd.DataFrame:
     """
     Função que retorna a quarta query definida pelo grupo.
 
     Análise do impacto do DRS na velocidade do carro em cada setor da pista, para cada piloto e para cada pista.
+
+    @params:
+        - schema_name
+        - engine
+        - session_keys: Iterable[int] | None (None para todas as sessões)
+        - driver_numbers: Iterable[int] | None (None para todos os pilotos)
+        - chunksize: int | None (retorna o resultado em blocos deste tamanho)
+        - fetch: str ("read_sql" ou "copy", ver copy_query)
+
+    @returns:
+        - table_data: pd.DataFrame
     """
 
+    check_schema_name(schema_name)
+    filters, params = build_filters("T", session_keys, driver_numbers)
+
     query = f"""
         WITH base AS (
             SELECT
@@ -196,19 +540,9 @@ def fourth_query(schema_name, engine) -> pd.DataFrame:
                     WHEN T.drs IN (8, 10, 12, 14) THEN 'ATIVO'
                     ELSE 'NÃO ATIVO'
                     END AS drs,
-                CASE
-                WHEN T.date >= L.date_start AND T.date <= (L.date_start + INTERVAL '1 second' * L.duration_sector_1) THEN 'SETOR 1'
-                WHEN T.date > (L.date_start + INTERVAL '1 second' * L.duration_sector_1) AND T.date <= (L.date_start + INTERVAL '1 second' * L.duration_sector_2) THEN 'SETOR 2'
-                WHEN T.date > (L.date_start + INTERVAL '1 second' * L.duration_sector_2) AND T.date <= (L.date_start + INTERVAL '1 second' * L.duration_sector_3) THEN 'SETOR 3'
-                END AS setor
+                'SETOR ' || T.sector AS setor
             FROM {schema_name}.telemetrys AS T 
-            JOIN {schema_name}.telemetrys_laps AS TL ON TL.session_key = T.session_key AND TL.driver_number = T.driver_number
-            JOIN {schema_name}.laps AS L ON L.session_key = T.session_key AND L.driver_number = T.driver_number
-            WHERE 
-                ((T.date >= L.date_start AND T.date <= (L.date_start + INTERVAL '1 second' * L.duration_sector_1)) OR
-                (T.date > (L.date_start + INTERVAL '1 second' * L.duration_sector_1) AND T.date <= (L.date_start + INTERVAL '1 second' * L.duration_sector_2)) OR
-                (T.date > (L.date_start + INTERVAL '1 second' * L.duration_sector_2) AND T.date <= (L.date_start + INTERVAL '1 second' * L.duration_sector_3))) AND T.session_key = 9998 AND T.driver_number = 30
-            WINDOW W AS (ORDER BY date)
+            WHERE T.sector IS NOT NULL AND {filters}
             ), com_setor AS (
                 SELECT
                     *,
@@ -222,7 +556,7 @@ def fourth_query(schema_name, engine) -> pd.DataFrame:
                         ELSE 1
                     END AS mudou
                 FROM base
-            WINDOW W AS (ORDER BY date)
+            WINDOW W AS (PARTITION BY session_key, driver_number ORDER BY date)
             ),com_grupo AS (
                 SELECT 
                     *,
@@ -250,7 +584,7 @@ def fourth_query(schema_name, engine) -> pd.DataFrame:
                     group_id,
                     FIRST_VALUE(speed) OVER W AS VelocidadeInicio
                 FROM com_grupo
-                WINDOW W AS (PARTITION BY group_id ORDER BY date)
+                WINDOW W AS (PARTITION BY session_key, driver_number, group_id ORDER BY date)
             ) AS T1
             JOIN (
                 SELECT DISTINCT
@@ -263,47 +597,75 @@ def fourth_query(schema_name, engine) -> pd.DataFrame:
                     group_id,
                     LAST_VALUE(speed) OVER W AS VelocidadeFim
                 FROM com_grupo
-                WINDOW W AS (PARTITION BY group_id ORDER BY date RANGE BETWEEN UNBOUNDED PRECEDING AND UNBOUNDED FOLLOWING)
+                WINDOW W AS (PARTITION BY session_key, driver_number, group_id ORDER BY date RANGE BETWEEN UNBOUNDED PRECEDING AND UNBOUNDED FOLLOWING)
             ) AS T2 ON T1.session_key = T2.session_key AND T1.driver_number = T2.driver_number AND T1.usofreio = T2.usofreio AND T1.date = T2.date AND T1.drs = T2.drs AND T1.setor = T2.setor AND T1.group_id = T2.group_id
             JOIN {schema_name}.drivers AS D ON T1.session_key = D.session_key AND T1.driver_number = D.driver_number
             JOIN {schema_name}.sessions AS S ON S.session_key = T1.session_key
-            GROUP BY S.circuit_short_name, D.full_name, T1.drs, T1.setor, T1.group_id, T1.VelocidadeInicio, T2.VelocidadeFim, T1.usofreio; 
+            GROUP BY S.circuit_short_name, D.full_name, T1.session_key, T1.driver_number, T1.drs, T1.setor, T1.group_id, T1.VelocidadeInicio, T2.VelocidadeFim, T1.usofreio; 
     """
 
-    return pd.read_sql(query, engine)
+    return run_query(query, engine, params, chunksize, fetch)
 
 
-def fifth_query(schema_name, engine) -> pd.DataFrame:
+def fifth_query(schema_name, engine, session_keys=(9998,), driver_numbers=None, chunksize=None, fetch="read_sql") -> pd.DataFrame:
     """
     Função que retorna a quinta query definida pelo grupo.
 
     Qual é a relação entre a temperatura média da pista em relação ao desempenho do carro em termos de velocidade média e uso médio do motor?
+
+    @params:
+        - schema_name
+        - engine
+        - session_keys: Iterable[int] | None (None para todas as sessões)
+        - driver_numbers: Iterable[int] | None (None para todos os pilotos)
+        - chunksize: int | None (retorna o resultado em blocos deste tamanho)
+        - fetch: str ("read_sql" ou "copy", ver copy_query)
+
+    @returns:
+        - table_data: pd.DataFrame
     """
 
+    check_schema_name(schema_name)
+    filters, params = build_filters("T", session_keys, driver_numbers)
+
+    # A telemetria é agregada por piloto antes do join com o rollup de clima;
+    # as somas são ponderadas como no join com cada amostra de clima.
     query = f"""
+    WITH TA AS (
+        SELECT
+            T.session_key,
+            T.driver_number,
+            COUNT(*) AS samples,
+            SUM(T.speed::DOUBLE PRECISION) AS speed_sum,
+            COUNT(T.speed) AS speed_count,
+            SUM(T.throttle::DOUBLE PRECISION) AS throttle_sum,
+            COUNT(T.throttle) AS throttle_count
+        FROM {schema_name}.telemetrys AS T
+        WHERE {filters}
+        GROUP BY T.session_key, T.driver_number
+    )
     SELECT
         S.circuit_short_name AS NomeCircuito,
         D.full_name AS NomeDoPiloto, 
-        AVG(T.speed)::NUMERIC(8,2) AS VelocidadeMediaPiloto,
-        AVG(T.throttle)::NUMERIC(8,2) AS ConsumoPotenciaMediaMotor,
-        AVG(WC.track_temperature)::NUMERIC(8,2) AS TemperaturaMediaPista
-    FROM {schema_name}.telemetrys AS T
-    JOIN {schema_name}.drivers AS D ON T.session_key = D.session_key AND T.driver_number = D.driver_number
-    JOIN {schema_name}.weather_conditions AS WC ON WC.session_key = T.session_key
-    JOIN {schema_name}.sessions AS S ON S.session_key = T.session_key
-    WHERE T.session_key = 9998
+        (SUM(TA.speed_sum * WS.samples) / NULLIF(SUM(TA.speed_count * WS.samples), 0))::NUMERIC(8,2) AS VelocidadeMediaPiloto,
+        (SUM(TA.throttle_sum * WS.samples) / NULLIF(SUM(TA.throttle_count * WS.samples), 0))::NUMERIC(8,2) AS ConsumoPotenciaMediaMotor,
+        (SUM(WS.track_temperature_sum * TA.samples) / NULLIF(SUM(WS.track_temperature_count * TA.samples), 0))::NUMERIC(8,2) AS TemperaturaMediaPista
+    FROM TA
+    JOIN {schema_name}.drivers AS D ON TA.session_key = D.session_key AND TA.driver_number = D.driver_number
+    JOIN {schema_name}.weather_session_stats AS WS ON WS.session_key = TA.session_key
+    JOIN {schema_name}.sessions AS S ON S.session_key = TA.session_key
     GROUP BY S.circuit_short_name, D.full_name;
     """
 
-    return pd.read_sql(query, engine)
+    return run_query(query, engine, params, chunksize, fetch)
 
 
 def main():
     schema_name = input("Digite aqui o nome do schema: ")
     engine = create_engine(DATABASE_URL)
  
-    # df_second_result = second_query(engine)
-    df_fourth_result = fourth_query(engine)
+    # df_second_result = second_query(schema_name, engine)
+    df_fourth_result = fourth_query(schema_name, engine)
 
     print(df_fourth_result)
 
@@ -0,0 +1,91 @@
+import json
+import time
+import urllib.error
+import urllib.request
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+DEFAULT_URL = "http://127.0.0.1:8765"
+DEFAULT_TIMEOUT = 600
+
+
+class ReportClient:
+    """
+    Thin client of report_server.py.
+
+    It only needs the standard library and pyarrow: no .env.local, engine or
+    database connection, so a script or notebook gets the results of the
+    warm server without paying for its startup.
+    """
+
+    def __init__(self, url: str = DEFAULT_URL, timeout: float = DEFAULT_TIMEOUT):
+        self.url = url.rstrip("/")
+        self.timeout = timeout
+
+    def _request(self, path: str, body=None):
+        data = None if body is None else json.dumps(body).encode()
+        request = urllib.request.Request(
+            f"{self.url}{path}",
+            data=data,
+            headers={"Content-Type": "application/json"} if data is not None else {},
+        )
+        try:
+            return urllib.request.urlopen(request, timeout=self.timeout)
+        except urllib.error.HTTPError as error:
+            message = json.loads(error.read() or b"{}").get("error", error.reason)
+            if 400 <= error.code < 500:
+                raise ValueError(message) from None
+            raise RuntimeError(f"Report server error: {message}") from None
+
+    def health(self) -> dict:
+        """
+        Returns the server status (backend, default schema, reports and
+        counters).
+        """
+
+        with self._request("/health") as response:
+            return json.load(response)
+
+    def run(self, report: str, schema_name: str = None, result_format: str = "arrow", **params):
+        """
+        Runs a report on the server.
+
+        @params:
+            - report: str (name of the report function, e.g. "fourth_query")
+            - schema_name: str | None (the server's default schema when None)
+            - result_format: str ("arrow" or "parquet")
+            - params: extra keyword arguments of the report (session_keys,
+              driver_numbers, fetch); None selects every value
+
+        @returns:
+            - table_data: pd.DataFrame (with the server timings and cache
+              status in attrs["server"])
+        """
+
+        start = time.perf_counter()
+        with self._request(
+            f"/reports/{report}",
+            {"schema": schema_name, "params": params, "format": result_format},
+        ) as response:
+            headers = response.headers
+            payload = response.read()
+        transfer_seconds = time.perf_counter() - start
+
+        if result_format == "parquet":
+            table = pq.read_table(pa.BufferReader(payload))
+        else:
+            table = pa.ipc.open_stream(payload).read_all()
+        table_data = table.to_pandas()
+
+        table_data.attrs["server"] = {
+            "rows": int(headers["X-Report-Rows"]),
+            "bytes": len(payload),
+            "report_seconds": float(headers["X-Report-Seconds"]),
+            "encode_seconds": float(headers["X-Report-Encode-Seconds"]),
+            "request_seconds": transfer_seconds,
+            "decode_seconds": time.perf_counter() - start - transfer_seconds,
+            "cache": headers.get("X-Report-Cache"),
+            "compute_seconds": float(headers.get("X-Report-Compute-Seconds") or 0),
+        }
+        return table_data
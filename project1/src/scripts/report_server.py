@@ -0,0 +1,254 @@
+import argparse
+import inspect
+import io
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from sqlalchemy import create_engine
+
+from src.scripts import arrow_queries, queries
+from src.scripts.arrow_queries import ParquetSource
+from src.scripts.cache import ReportCache
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_SCHEMA = "raw"
+DEFAULT_POOL_SIZE = 5
+
+REPORTS = ("get_all_drivers", "first_query", "second_query", "third_query", "fourth_query", "fifth_query")
+BACKENDS = {"sql": queries, "arrow": arrow_queries}
+
+# Result encodings: Arrow IPC stream (no compression, cheapest to decode) or
+# parquet (smaller, for slow links or results kept on disk)
+FORMATS = {
+    "arrow": "application/vnd.apache.arrow.stream",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+# Report arguments the server fills itself or does not support (streamed
+# results are not sent over HTTP)
+RESERVED_ARGUMENTS = ("schema_name", "engine", "chunksize")
+
+
+def encode_result(table_data, result_format: str) -> bytes:
+    """
+    Serializes a report result as an Arrow IPC stream or a parquet file.
+
+    @params:
+        - table_data: pd.DataFrame
+        - result_format: str (one of FORMATS)
+
+    @returns:
+        - payload: bytes
+    """
+
+    table = pa.Table.from_pandas(table_data, preserve_index=False)
+    sink = io.BytesIO()
+    if result_format == "parquet":
+        pq.write_table(table, sink)
+    else:
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+    return sink.getvalue()
+
+
+def report_arguments(report, params: dict) -> dict:
+    """
+    Checks the parameters a client sent for a report and converts them to
+    the types the report functions take (lists become tuples, null selects
+    every value).
+
+    @params:
+        - report: report function of queries.py or arrow_queries.py
+        - params: dict (decoded from the request JSON)
+
+    @returns:
+        - kwargs: dict
+    """
+
+    accepted = set(inspect.signature(report).parameters) - set(RESERVED_ARGUMENTS)
+    unknown = set(params) - accepted
+    if unknown:
+        raise ValueError(f"{report.__name__} does not take {sorted(unknown)}")
+
+    return {name: tuple(value) if isinstance(value, list) else value for name, value in params.items()}
+
+
+class ReportServer(ThreadingHTTPServer):
+    """
+    Long-lived HTTP server that owns the engine pool, the report functions
+    and a ReportCache, so every client request pays only for its query.
+
+    Endpoints:
+        - GET /health: JSON with the backend, default schema, reports and
+          counters.
+        - POST /reports/<report>: runs a report. The JSON body may set
+          "schema", "params" (e.g. {"session_keys": [9998]}) and "format"
+          ("arrow" or "parquet"); the result is sent in that format, with the
+          timings and cache status in X-Report-* headers.
+
+    Each request runs on its own thread with a pooled connection.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, address, backend: str, engine, cache=None, schema_name: str = DEFAULT_SCHEMA):
+        super().__init__(address, ReportRequestHandler)
+        self.backend_name = backend
+        self.backend = BACKENDS[backend]
+        self.engine = engine
+        self.cache = cache
+        self.schema_name = schema_name
+        self.started = time.time()
+        self.requests = 0
+        # Handler threads count the requests concurrently
+        self._requests_lock = threading.Lock()
+
+    def count_request(self) -> None:
+        with self._requests_lock:
+            self.requests += 1
+
+    def run_report(self, name: str, schema_name: str, params: dict):
+        """
+        Runs one report, from the cache when it is enabled.
+
+        @returns:
+            - (table_data, cache_info, seconds): (pd.DataFrame, CacheInfo | None, float)
+        """
+
+        if name not in REPORTS:
+            raise LookupError(f"Unknown report: {name}")
+
+        report = getattr(self.backend, name)
+        kwargs = report_arguments(report, params)
+
+        start = time.perf_counter()
+        if self.cache is None:
+            table_data, cache_info = report(schema_name=schema_name, engine=self.engine, **kwargs), None
+        else:
+            table_data, cache_info = self.cache.run(report, schema_name=schema_name, engine=self.engine, **kwargs)
+        return table_data, cache_info, time.perf_counter() - start
+
+
+class ReportRequestHandler(BaseHTTPRequestHandler):
+    """
+    Request handler of ReportServer.
+    """
+
+    def send_json(self, status: int, payload: dict) -> None:
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path != "/health":
+            self.send_json(404, {"error": f"Unknown path: {self.path}"})
+            return
+
+        self.send_json(200, {
+            "backend": self.server.backend_name,
+            "schema": self.server.schema_name,
+            "reports": list(REPORTS),
+            "formats": list(FORMATS),
+            "cache": self.server.cache is not None,
+            "uptime_seconds": time.time() - self.server.started,
+            "requests": self.server.requests,
+        })
+
+    def do_POST(self):
+        if not self.path.startswith("/reports/"):
+            self.send_json(404, {"error": f"Unknown path: {self.path}"})
+            return
+
+        self.server.count_request()
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+            body = json.loads(self.rfile.read(length) or b"{}")
+            result_format = body.get("format", "arrow")
+            if result_format not in FORMATS:
+                raise ValueError(f"Unknown format: {result_format}")
+
+            table_data, cache_info, seconds = self.server.run_report(
+                self.path[len("/reports/"):],
+                body.get("schema") or self.server.schema_name,
+                body.get("params") or {},
+            )
+            start = time.perf_counter()
+            payload = encode_result(table_data, result_format)
+            encode_seconds = time.perf_counter() - start
+        except LookupError as error:
+            self.send_json(404, {"error": str(error)})
+            return
+        except (ValueError, TypeError) as error:
+            self.send_json(400, {"error": str(error)})
+            return
+        except Exception as error:
+            self.log_error("report failed: %r", error)
+            self.send_json(500, {"error": f"{type(error).__name__}: {error}"})
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", FORMATS[result_format])
+        self.send_header("Content-Length", str(len(payload)))
+        self.send_header("X-Report-Rows", str(len(table_data)))
+        self.send_header("X-Report-Seconds", f"{seconds:.6f}")
+        self.send_header("X-Report-Encode-Seconds", f"{encode_seconds:.6f}")
+        if cache_info is not None:
+            self.send_header("X-Report-Cache", cache_info.status)
+            self.send_header("X-Report-Compute-Seconds", f"{cache_info.compute_seconds:.6f}")
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Serves the reports over HTTP from one warm process (see report_client.py)."
+    )
+    parser.add_argument("--host", default=DEFAULT_HOST, help="Address to listen on.")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="Port to listen on.")
+    parser.add_argument(
+        "--backend",
+        choices=BACKENDS,
+        default="sql",
+        help="sql runs the reports on PostgreSQL, arrow computes them from the parquet files.",
+    )
+    parser.add_argument("--data-dir", default=arrow_queries.DATA_DIR, help="Parquet tree used by the arrow backend.")
+    parser.add_argument("--schema", default=DEFAULT_SCHEMA, help="Schema of the requests that do not name one.")
+    parser.add_argument("--pool-size", type=int, default=DEFAULT_POOL_SIZE, help="PostgreSQL connections kept open.")
+    parser.add_argument("--no-cache", action="store_true", help="Always recompute the reports.")
+    parser.add_argument(
+        "--compact-results",
+        action="store_true",
+        help="Downcast the integer columns of the SQL results and make repetitive text columns categorical.",
+    )
+    args = parser.parse_args()
+    queries.COMPACT_RESULTS = args.compact_results
+
+    if args.backend == "arrow":
+        engine = ParquetSource(args.data_dir)
+    else:
+        engine = create_engine(queries.DATABASE_URL, pool_size=args.pool_size, pool_pre_ping=True)
+
+    server = ReportServer(
+        (args.host, args.port),
+        args.backend,
+        engine,
+        cache=None if args.no_cache else ReportCache(),
+        schema_name=args.schema,
+    )
+    print(f"Serving the {args.backend} reports on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nStopping the server.")
+    finally:
+        server.server_close()
+        if hasattr(engine, "dispose"):
+            engine.dispose()
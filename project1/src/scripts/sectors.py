@@ -0,0 +1,99 @@
+import numpy as np
+import pandas as pd
+
+LAP_COLUMNS = [
+    "session_key",
+    "driver_number",
+    "lap_number",
+    "date_start",
+    "duration_sector_1",
+    "duration_sector_2",
+    "duration_sector_3",
+]
+
+
+def parse_timestamps(series: pd.Series) -> pd.Series:
+    """
+    Parses the ISO 8601 strings of the OpenF1 API into naive UTC timestamps,
+    the same values PostgreSQL stores in a TIMESTAMP column.
+
+    @params:
+        - series: pd.Series
+
+    @returns:
+        - timestamps: pd.Series (datetime64[ns])
+    """
+
+    return pd.to_datetime(series, format="ISO8601", utc=True).dt.tz_localize(None)
+
+
+def assign_lap_sectors(df_telemetry: pd.DataFrame, df_laps: pd.DataFrame) -> pd.DataFrame:
+    """
+    Assigns every telemetry sample to the lap and sector it was recorded in.
+
+    Each sample is matched with an as-of join, per (session_key, driver_number),
+    to the last lap that started at or before it. The sector is then found
+    from the cumulative sector durations of that lap:
+
+        SECTOR 1: date_start <= date <= date_start + d1
+        SECTOR 2: ... <= date_start + d1 + d2
+        SECTOR 3: ... <= date_start + d1 + d2 + d3
+
+    Samples before the first lap get no lap_number; samples past the end of
+    their lap, or in a lap with missing sector durations, get no sector.
+
+    @params:
+        - df_telemetry: pd.DataFrame with session_key, driver_number and date
+        - df_laps: pd.DataFrame with the columns in LAP_COLUMNS
+
+    @returns:
+        - df_telemetry: pd.DataFrame with parsed date, lap_number and sector
+    """
+
+    df_telemetry = df_telemetry.copy()
+    df_telemetry["date"] = parse_timestamps(df_telemetry["date"])
+
+    df_laps = df_laps[LAP_COLUMNS].dropna(subset=["date_start"]).copy()
+    df_laps["date_start"] = parse_timestamps(df_laps["date_start"])
+    df_laps = df_laps.sort_values("date_start")
+
+    for key in ("session_key", "driver_number"):
+        df_laps[key] = df_laps[key].astype("int64")
+
+    samples = df_telemetry[["session_key", "driver_number", "date"]].astype(
+        {"session_key": "int64", "driver_number": "int64"}
+    )
+    samples["position"] = np.arange(len(samples))
+    samples = samples.dropna(subset=["date"]).sort_values("date")
+
+    matched = pd.merge_asof(
+        samples,
+        df_laps,
+        left_on="date",
+        right_on="date_start",
+        by=["session_key", "driver_number"],
+        direction="backward",
+    ).sort_values("position")
+
+    offset = (matched["date"] - matched["date_start"]).dt.total_seconds().to_numpy()
+    end_sector_1 = matched["duration_sector_1"].to_numpy(dtype="float64")
+    end_sector_2 = end_sector_1 + matched["duration_sector_2"].to_numpy(dtype="float64")
+    end_sector_3 = end_sector_2 + matched["duration_sector_3"].to_numpy(dtype="float64")
+
+    sector = np.select(
+        [offset <= end_sector_1, offset <= end_sector_2, offset <= end_sector_3],
+        [1, 2, 3],
+        default=0,
+    )
+
+    lap_number = pd.Series(pd.NA, index=df_telemetry.index, dtype="Int64")
+    lap_number.iloc[matched["position"].to_numpy()] = matched["lap_number"].astype("Int64").to_numpy()
+
+    sectors = pd.Series(pd.NA, index=df_telemetry.index, dtype="Int64")
+    sectors.iloc[matched["position"].to_numpy()] = pd.array(sector, dtype="Int64")
+    sectors = sectors.mask(sectors == 0)
+
+    df_telemetry["lap_number"] = lap_number
+    df_telemetry["sector"] = sectors
+
+    return df_telemetry
@@ -0,0 +1,173 @@
+import argparse
+import json
+import os
+import time
+from datetime import datetime
+
+import numpy as np
+from influxdb_client import InfluxDBClient
+
+from src.scripts import flux_queries
+from src.scripts.insert_data import org, token, url
+
+DEFAULT_HISTORY = "./benchmarks/flux_query_history.json"
+DEFAULT_WARMUP = 2
+DEFAULT_REPETITIONS = 10
+PERCENTILES = (50, 95, 99)
+
+# Every report of flux_queries.py; the ones in PARAMETRIZED_REPORTS also take
+# the sessions and drivers to analyse.
+REPORTS = tuple(flux_queries.REPORTS)
+PARAMETRIZED_REPORTS = ("second_query", "fourth_query", "fifth_query")
+
+def latency_stats(samples):
+    """
+    Returns the p50/p95/p99 of a list of durations, in milliseconds.
+    """
+    values = np.percentile(np.array(samples) * 1000, PERCENTILES)
+    return {f"p{percentile}": float(value) for percentile, value in zip(PERCENTILES, values)}
+
+def benchmark_report(
+    name,
+    client,
+    bucket,
+    kwargs,
+    warmup=DEFAULT_WARMUP,
+    repetitions=DEFAULT_REPETITIONS,
+    results_dir=None,
+):
+    """
+    Runs a Flux report `warmup` times unmeasured and `repetitions` times
+    measured.
+
+    Args:
+        name (str): Name of the report function in flux_queries.py.
+        client (InfluxDBClient): Client the report runs on.
+        bucket (str): Bucket the report reads.
+        kwargs (dict): Extra arguments of the report (session_keys...).
+        warmup (int): Unmeasured runs, to warm the caches.
+        repetitions (int): Measured runs.
+        results_dir (str | None): Directory the result of the last run is
+            written to, as <report>.parquet.
+
+    Returns:
+        dict: Report name, arguments, rows, Flux queries per run and latency
+        percentiles (total report call, query and decode, in ms).
+    """
+    report = getattr(flux_queries, name)
+    for _ in range(warmup):
+        report(bucket, client, **kwargs)
+
+    # The total is the whole report call, as in project1's benchmark, so the
+    # two backends are compared on the same span; query and decode are its
+    # breakdown
+    samples, timings = [], []
+    for _ in range(repetitions):
+        start = time.perf_counter()
+        table_data = report(bucket, client, **kwargs)
+        samples.append(time.perf_counter() - start)
+        timings.append(table_data.attrs["timing"])
+
+    if results_dir is not None:
+        os.makedirs(results_dir, exist_ok=True)
+        table_data.to_parquet(os.path.join(results_dir, f"{name}.parquet"), index=False)
+
+    return {
+        "report": name,
+        "kwargs": kwargs,
+        "rows": len(table_data),
+        "queries": timings[-1]["queries"],
+        "total_ms": latency_stats(samples),
+        "query_ms": latency_stats([timing["query_seconds"] for timing in timings]),
+        "decode_ms": latency_stats([timing["decode_seconds"] for timing in timings]),
+    }
+
+def find_previous(history, result, bucket):
+    """
+    Returns the most recent result in the history for the same report, with
+    the same arguments, on the same bucket.
+    """
+    for run in reversed(history):
+        if run["bucket"] != bucket:
+            continue
+        for previous in run["results"]:
+            # The history stores the arguments as JSON (tuples become lists)
+            if previous["report"] == result["report"] and previous["kwargs"] == json.loads(json.dumps(result["kwargs"])):
+                return previous
+    return None
+
+def print_result(result, previous):
+    """
+    Prints the latencies of a report and the change of its p50 since the
+    previous run.
+    """
+    total, query, decode = result["total_ms"], result["query_ms"], result["decode_ms"]
+    line = (
+        f"{result['report']:<16}{result['rows']:>9}{result['queries']:>8}"
+        + "".join(f"{total[p]:>10.1f}" for p in total)
+        + f"{query['p50']:>10.1f}{decode['p50']:>11.1f}"
+    )
+    if previous is not None:
+        line += f"{total['p50'] / previous['total_ms']['p50'] - 1:>+10.1%}"
+    print(line)
+
+def load_history(path):
+    """
+    Reads the benchmark history, an empty list when the file does not exist.
+    """
+    if not os.path.exists(path):
+        return []
+    with open(path) as file:
+        return json.load(file)
+
+def save_history(path, history):
+    """
+    Writes the benchmark history, creating its directory if needed.
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as file:
+        json.dump(history, file, indent=2)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmarks the Flux reports of flux_queries.py.")
+    parser.add_argument("--bucket", default=flux_queries.DEFAULT_BUCKET, help="Bucket the reports read.")
+    parser.add_argument("--reports", nargs="+", choices=REPORTS, default=list(REPORTS), help="Reports to run.")
+    parser.add_argument("--warmup", type=int, default=DEFAULT_WARMUP, help="Unmeasured runs of each report.")
+    parser.add_argument("--repetitions", type=int, default=DEFAULT_REPETITIONS, help="Measured runs of each report.")
+    parser.add_argument("--session-keys", help="Sessions for reports 2, 4 and 5, e.g. 9998,10006 or all.")
+    parser.add_argument("--driver-numbers", help="Drivers for reports 2, 4 and 5, e.g. 1,30 or all.")
+    parser.add_argument("--history", default=DEFAULT_HISTORY, help="JSON file with the previous runs.")
+    parser.add_argument("--label", help="Free text stored with the run (e.g. what changed).")
+    parser.add_argument("--results-dir", help="Directory the result of each report is written to (as parquet).")
+    args = parser.parse_args()
+    if args.repetitions < 1:
+        parser.error("--repetitions must be at least 1")
+
+    parameters = {}
+    if args.session_keys is not None:
+        parameters["session_keys"] = flux_queries.parse_numbers(args.session_keys)
+    if args.driver_numbers is not None:
+        parameters["driver_numbers"] = flux_queries.parse_numbers(args.driver_numbers)
+
+    history = load_history(args.history)
+    run = {
+        "label": args.label,
+        "started_at": datetime.now().isoformat(timespec="seconds"),
+        "bucket": args.bucket,
+        "results": [],
+    }
+
+    print(
+        f"{'report':<16}{'rows':>9}{'flux':>8}" + "".join(f"{f'p{p} ms':>10}" for p in PERCENTILES)
+        + f"{'query p50':>10}{'decode p50':>11}{'change':>10}"
+    )
+    with InfluxDBClient(url=url, token=token, org=org, timeout=120_000) as client:
+        for name in args.reports:
+            kwargs = parameters if name in PARAMETRIZED_REPORTS else {}
+            result = benchmark_report(name, client, args.bucket, kwargs, args.warmup, args.repetitions, args.results_dir)
+            print_result(result, find_previous(history, result, args.bucket))
+            run["results"].append(result)
+
+    history.append(run)
+    save_history(args.history, history)
+    print(f"\nRun saved to {args.history}.")
@@ -0,0 +1,143 @@
+import argparse
+import math
+import sys
+
+import numpy as np
+import pandas as pd
+from influxdb_client import Point, WritePrecision
+
+from src.scripts.line_protocol import to_line_protocol
+from src.scripts.measurements import BUCKET_LAYOUTS, MEASUREMENTS
+
+# Values that exercise the escaping and formatting rules of line protocol
+TAG_VALUES = ["plain", "with space", "a=b", "a,b", "trailing\\", "quote\"", "", None, 30, 9998.0, "multi\nline"]
+FIELD_VALUES = {
+    "int": [0, 1, -7, 2 ** 40, None, np.nan],
+    "float": [0.0, 1.0, -2.5, 1 / 3, 1e20, 1e-7, 123456789.125, np.nan, np.inf, None],
+    "bool": [True, False],
+    "str": ["plain", 'say "hi"', "back\\slash", "comma, space=equal", "", "multi\nline", None],
+    "time": ["2024-03-02T15:03:00.123456", "2024-03-02T15:03:00+00:00", "2023-11-26T13:00:00.5Z", None],
+}
+TIMESTAMPS = [
+    "2024-03-02T15:03:00.123456",
+    "2024-03-02T15:03:01",
+    "2024-03-02T12:03:01-03:00",
+    "2023-11-26T13:00:00.000001Z",
+]
+
+def adversarial_frame(spec, rows, seed=0):
+    """
+    Builds a DataFrame for a measurement spec, each column filled with random
+    picks of TAG_VALUES, FIELD_VALUES of its type or TIMESTAMPS.
+
+    Args:
+        spec (dict): tags, fields and time_column of a measurement.
+        rows (int): Rows of the frame.
+        seed (int): Seed of the random picks.
+
+    Returns:
+        pd.DataFrame: The frame; its first row has every field missing.
+    """
+    rng = np.random.default_rng(seed)
+
+    def pick(values):
+        return pd.Series([values[i] for i in rng.integers(len(values), size=rows)], dtype=object)
+
+    columns = {tag: pick(TAG_VALUES) for tag in spec["tags"]}
+    for field, field_type in spec["fields"].items():
+        column = pick(FIELD_VALUES[field_type])
+        column.iloc[0] = None
+        # Numeric columns with missing values are float64, as read from parquet
+        columns[field] = column.astype("float64") if field_type in ("int", "float") else column
+    if spec.get("time_column"):
+        columns[spec["time_column"]] = pick(TIMESTAMPS)
+
+    return pd.DataFrame(columns)
+
+def missing(value):
+    return value is None or (isinstance(value, float) and math.isnan(value))
+
+def point_lines(df, measurement, spec):
+    """
+    Serializes a frame with one influxdb_client Point per row, the reference
+    to_line_protocol must match.
+    """
+    lines = []
+    for row in df.to_dict("records"):
+        point = Point(measurement)
+        for tag in spec["tags"]:
+            if not missing(row[tag]):
+                point.tag(tag, str(row[tag]))
+        for field, field_type in spec["fields"].items():
+            value = row[field]
+            if missing(value):
+                continue
+            if field_type == "int":
+                value = int(value)
+            elif field_type == "float":
+                value = float(value)
+            elif field_type == "str":
+                value = str(value)
+            elif field_type == "time":
+                timestamp = pd.Timestamp(value)
+                value = (timestamp if timestamp.tzinfo else timestamp.tz_localize("UTC")).value
+            point.field(field, value)
+        point.time(row[spec["time_column"]], WritePrecision.NS)
+
+        line = point.to_line_protocol()
+        if line:
+            lines.append(line)
+    return lines
+
+def specs():
+    """
+    Yields (name, measurement, spec) for every measurement of MEASUREMENTS
+    and of every bucket layout.
+    """
+    for measurement, spec in MEASUREMENTS.items():
+        yield measurement, measurement, spec
+    for layout in BUCKET_LAYOUTS:
+        for measurement, spec in layout["measurements"].items():
+            yield f"{layout['bucket']}/{measurement}", measurement, spec
+
+def check(rows, seed):
+    """
+    Compares to_line_protocol with Point for every spec.
+
+    Returns:
+        list[str]: One message per spec whose lines differ, with the first
+        differing line of each side.
+    """
+    mismatches = []
+    for name, measurement, spec in specs():
+        if not spec.get("time_column"):
+            # Stamped with the current time, so there is nothing to compare
+            print(f"{name}: skipped (no time_column)")
+            continue
+        df = adversarial_frame(spec, rows, seed)
+        expected = point_lines(df, measurement, spec)
+        actual = to_line_protocol(df, measurement, **spec)
+        if expected != actual:
+            first = next((i for i, (left, right) in enumerate(zip(expected, actual)) if left != right), min(len(expected), len(actual)))
+            mismatches.append(
+                f"{name}: {len(expected)} Point lines, {len(actual)} to_line_protocol lines; first difference at line {first}:\n"
+                f"  Point:            {expected[first] if first < len(expected) else None!r}\n"
+                f"  to_line_protocol: {actual[first] if first < len(actual) else None!r}"
+            )
+        else:
+            print(f"{name}: {len(actual)} lines match")
+    return mismatches
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Checks that to_line_protocol writes the same bytes as influxdb_client's Point for every measurement."
+    )
+    parser.add_argument("--rows", type=int, default=500, help="Rows of each adversarial frame.")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the random values.")
+    args = parser.parse_args()
+
+    mismatches = check(args.rows, args.seed)
+    if mismatches:
+        print("\n".join(mismatches))
+        sys.exit(1)
+    print("to_line_protocol matches Point for every measurement.")
@@ -0,0 +1,61 @@
+import pandas as pd
+
+# DRS states with the flap open (see the fourth report)
+DRS_ACTIVE = (8, 10, 12, 14)
+
+# Interval of the telemetry_1s measurement
+WINDOW = "1s"
+
+AGGREGATES = {
+    "samples": ("speed", "size"),
+    "speed_mean": ("speed", "mean"),
+    "speed_max": ("speed", "max"),
+    "throttle_mean": ("throttle", "mean"),
+    "throttle_max": ("throttle", "max"),
+    "rpm_mean": ("rpm", "mean"),
+    "rpm_max": ("rpm", "max"),
+    "drs_active_share": ("drs_active", "mean"),
+}
+
+def aggregate(df_telemetry, keys):
+    """
+    Applies AGGREGATES to the samples grouped by `keys`, with the date of
+    the first sample of each group.
+    """
+    df_telemetry = df_telemetry.assign(drs_active=df_telemetry["drs"].isin(DRS_ACTIVE))
+    return df_telemetry.groupby(keys, as_index=False, sort=False).agg(date=("date", "min"), **AGGREGATES)
+
+def lap_sector_aggregates(df_telemetry):
+    """
+    Aggregates the telemetry of each lap and sector (telemetry_lap_agg).
+
+    Args:
+        df_telemetry (pd.DataFrame): Samples with lap_number and sector
+            (see sectors.assign_lap_sectors).
+
+    Returns:
+        pd.DataFrame: One row per (session_key, driver_number, lap_number,
+        sector), stamped with its first sample, with the sample count, the
+        mean and max speed, throttle and rpm and the share of samples with
+        DRS open. Samples without a sector are left out.
+    """
+    df_telemetry = df_telemetry.dropna(subset=["lap_number", "sector"])
+    return aggregate(df_telemetry, ["session_key", "driver_number", "lap_number", "sector"])
+
+def window_aggregates(df_telemetry, window=WINDOW):
+    """
+    Aggregates the telemetry in fixed windows (telemetry_1s).
+
+    Args:
+        df_telemetry (pd.DataFrame): Samples of one or more drivers.
+        window (str): Window length, as a pandas frequency.
+
+    Returns:
+        pd.DataFrame: One row per (session_key, driver_number, window),
+        stamped with the start of the window, with the same aggregates as
+        lap_sector_aggregates. Every sample is counted, with or without a
+        sector.
+    """
+    df_telemetry = df_telemetry.assign(window=pd.to_datetime(df_telemetry["date"], utc=True).dt.floor(window))
+    df_windows = aggregate(df_telemetry, ["session_key", "driver_number", "window"])
+    return df_windows.drop(columns=["date"]).rename(columns={"window": "date"})
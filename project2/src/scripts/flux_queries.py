@@ -0,0 +1,687 @@
+import argparse
+import time
+
+import pandas as pd
+from influxdb_client import InfluxDBClient
+
+from src.scripts.insert_data import org, token, url
+from src.scripts.shared import load_project1_module
+
+DEFAULT_BUCKET = "bucket-session-key"
+
+# Same parsing of "9998,10006" / "all" as project1 (src/scripts/arguments.py)
+parse_numbers = load_project1_module("arguments").parse_numbers
+
+# Slack added around a session's date_start/date_end; samples recorded
+# further than this from the session (e.g. weather before the start) are
+# outside the range() of its reports.
+SESSION_MARGIN = pd.Timedelta(hours=1)
+
+REPORTS = ["get_all_drivers", "first_query", "second_query", "third_query", "fourth_query", "fifth_query"]
+
+
+def flux_time(timestamp) -> str:
+    """
+    Formats a timestamp (naive ones taken as UTC) as a Flux RFC 3339 literal.
+    """
+
+    timestamp = pd.Timestamp(timestamp)
+    timestamp = timestamp.tz_localize("UTC") if timestamp.tzinfo is None else timestamp.tz_convert("UTC")
+
+    return timestamp.strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+
+
+def flux_any(column: str, values) -> str:
+    """
+    Builds a Flux predicate matching a tag against any of `values`.
+
+    Equalities joined with `or` are pushed down to the storage engine,
+    `contains()` is not.
+    """
+
+    return "(" + " or ".join(f'r.{column} == "{value}"' for value in values) + ")"
+
+
+def bounded_source(bucket: str, bounds: pd.DataFrame, predicate: str, per_session: bool = True) -> str:
+    """
+    Builds the Flux source of a report: the rows matching `predicate`,
+    read only within the time range of the sessions in `bounds`.
+
+    @params:
+        - bucket: str
+        - bounds: pd.DataFrame (see session_bounds)
+        - predicate: str (Flux expression on r, e.g. r._measurement == "laps")
+        - per_session: bool (one range() per session joined with union(),
+          or a single range() from the first start to the last end)
+
+    @returns:
+        - source: str
+    """
+
+    if not per_session:
+        return f"""
+            from(bucket: "{bucket}")
+                |> range(start: {flux_time(bounds["date_start"].min() - SESSION_MARGIN)}, stop: {flux_time(bounds["date_end"].max() + SESSION_MARGIN)})
+                |> filter(fn: (r) => {predicate})
+        """
+
+    streams = [
+        f"""
+            from(bucket: "{bucket}")
+                |> range(start: {flux_time(session.date_start - SESSION_MARGIN)}, stop: {flux_time(session.date_end + SESSION_MARGIN)})
+                |> filter(fn: (r) => r.session_key == "{session.session_key}" and {predicate})
+        """
+        for session in bounds.itertuples()
+    ]
+
+    return streams[0] if len(streams) == 1 else "union(tables: [" + ",".join(streams) + "])"
+
+
+def new_timing() -> dict:
+    return {"queries": 0, "query_seconds": 0.0, "decode_seconds": 0.0}
+
+
+def run_flux(flux: str, client, dtypes: dict, timing: dict) -> pd.DataFrame:
+    """
+    Runs a Flux query and returns its rows with the given column types.
+
+    @params:
+        - flux: str
+        - client: InfluxDBClient
+        - dtypes: dict (column -> dtype; only these columns are kept)
+        - timing: dict (see new_timing) the query and decoding times are
+          added to: query_seconds covers the server executing the query and
+          the client receiving and parsing the CSV, decode_seconds the
+          conversion to the report's columns
+
+    @returns:
+        - table_data: pd.DataFrame
+    """
+
+    start = time.perf_counter()
+    result = client.query_api().query_data_frame(flux, org=org)
+    fetched = time.perf_counter()
+
+    if isinstance(result, list):
+        result = pd.concat(result, ignore_index=True) if result else pd.DataFrame()
+
+    table_data = pd.DataFrame({column: result[column] if column in result else pd.Series(dtype=object) for column in dtypes})
+    table_data = table_data.astype(dtypes)
+
+    timing["queries"] += 1
+    timing["query_seconds"] += fetched - start
+    timing["decode_seconds"] += time.perf_counter() - fetched
+
+    return table_data
+
+
+def finish(table_data: pd.DataFrame, timing: dict) -> pd.DataFrame:
+    table_data = table_data.reset_index(drop=True)
+    table_data.attrs["timing"] = timing
+    return table_data
+
+
+def session_bounds(bucket: str, client, timing: dict, session_keys=None, session_name=None) -> pd.DataFrame:
+    """
+    Reads the start and end of the sessions, which bound the range() of
+    every report.
+
+    The sessions measurement is the only one read with range(start: 0): it
+    has one point per session.
+
+    @params:
+        - bucket: str
+        - client: InfluxDBClient
+        - timing: dict
+        - session_keys: Iterable[int] | None (None para todas as sessões)
+        - session_name: str | None (e.g. "Race")
+
+    @returns:
+        - bounds: pd.DataFrame with session_key, session_name,
+          circuit_short_name, date_start and date_end (UTC)
+    """
+
+    predicate = 'r._measurement == "sessions" and r._field == "date_end"'
+    if session_keys is not None:
+        predicate += " and " + flux_any("session_key", session_keys)
+    if session_name is not None:
+        predicate += f' and r.session_name == "{session_name}"'
+
+    flux = f"""
+        from(bucket: "{bucket}")
+            |> range(start: 0)
+            |> filter(fn: (r) => {predicate})
+            |> group()
+            |> keep(columns: ["_time", "_value", "session_key", "session_name", "circuit_short_name"])
+    """
+
+    bounds = run_flux(
+        flux,
+        client,
+        {"session_key": "int64", "session_name": str, "circuit_short_name": str, "_time": "datetime64[ns, UTC]", "_value": "int64"},
+        timing,
+    )
+    bounds["date_end"] = pd.to_datetime(bounds.pop("_value"), unit="ns", utc=True)
+
+    return bounds.rename(columns={"_time": "date_start"}).sort_values("session_key", ignore_index=True)
+
+
+def driver_names(bucket: str, client, bounds: pd.DataFrame, timing: dict) -> pd.DataFrame:
+    """
+    Reads the full name of the drivers of each session in `bounds`.
+
+    @returns:
+        - names: pd.DataFrame with session_key, driver_number and full_name
+    """
+
+    flux = f"""
+        {bounded_source(bucket, bounds, 'r._measurement == "drivers" and r._field == "headshot_url"')}
+            |> group()
+            |> keep(columns: ["session_key", "driver_number", "full_name"])
+    """
+
+    return run_flux(flux, client, {"session_key": "int64", "driver_number": "int64", "full_name": str}, timing)
+
+
+def get_all_drivers(bucket: str, client) -> pd.DataFrame:
+    """
+    Função que retorna todos os pilotos do banco de dados.
+
+    @params:
+        - bucket: str
+        - client: InfluxDBClient
+
+    @returns:
+        - table_data: pd.DataFrame (com o tempo das consultas em attrs["timing"])
+    """
+
+    timing = new_timing()
+    columns = {"driver_number": "int64", "full_name": str, "country_code": str, "team_name": str}
+
+    bounds = session_bounds(bucket, client, timing)
+    if bounds.empty:
+        return finish(pd.DataFrame(columns=list(columns)).astype(columns), timing)
+
+    flux = f"""
+        {bounded_source(bucket, bounds, 'r._measurement == "drivers" and r._field == "headshot_url"', per_session=False)}
+            |> filter(fn: (r) => exists r.full_name and exists r.country_code and exists r.team_name)
+            |> group(columns: ["driver_number", "full_name", "country_code", "team_name"])
+            |> first()
+            |> group()
+            |> keep(columns: ["driver_number", "full_name", "country_code", "team_name"])
+    """
+
+    table_data = run_flux(flux, client, columns, timing)
+
+    return finish(table_data.sort_values("driver_number", kind="stable"), timing)
+
+
+def first_query(bucket: str, client) -> pd.DataFrame:
+    """
+    Função que retorna a primeira query definida pelo grupo:
+
+    Considerando a melhor volta de cada piloto, encontrar qual a velocidade
+    máxima alcançada em cada setor;
+
+    A melhor volta de cada piloto em cada corrida é encontrada no servidor
+    (min() por sessão e piloto), e a velocidade média de cada setor vem da
+    telemetria agregada por volta e setor (telemetry_lap_agg).
+
+    @params:
+        - bucket: str
+        - client: InfluxDBClient
+
+    @returns:
+        - table_data: pd.DataFrame (com o tempo das consultas em attrs["timing"])
+    """
+
+    timing = new_timing()
+    columns = {"session_key": "int64", "driver_number": "int64", "lap_duration": "float64", "sector": str, "max_speed": "float64"}
+    empty = pd.DataFrame(columns=list(columns)).astype(columns)
+
+    bounds = session_bounds(bucket, client, timing, session_name="Race")
+    if bounds.empty:
+        return finish(empty, timing)
+
+    laps_flux = f"""
+        {bounded_source(bucket, bounds, 'r._measurement == "laps" and (r._field == "lap_duration" or r._field == "lap_number")')}
+            |> pivot(rowKey: ["_time"], columnKey: ["_field"], valueColumn: "_value")
+            |> filter(fn: (r) => exists r.lap_duration and exists r.lap_number)
+            |> group(columns: ["session_key", "driver_number"])
+            |> min(column: "lap_duration")
+            |> group()
+            |> keep(columns: ["_time", "session_key", "driver_number", "lap_number", "lap_duration"])
+    """
+
+    best_laps = run_flux(
+        laps_flux,
+        client,
+        {"_time": "datetime64[ns, UTC]", "session_key": "int64", "driver_number": "int64", "lap_number": "int64", "lap_duration": "float64"},
+        timing,
+    )
+    if best_laps.empty:
+        return finish(empty, timing)
+
+    # Mean speed of every lap and sector, from the downsampled telemetry
+    sectors_flux = f"""
+        {bounded_source(bucket, bounds, 'r._measurement == "telemetry_lap_agg" and (r._field == "lap_number" or r._field == "speed_mean")')}
+            |> pivot(rowKey: ["_time"], columnKey: ["_field"], valueColumn: "_value")
+            |> group()
+            |> keep(columns: ["session_key", "driver_number", "sector", "lap_number", "speed_mean"])
+    """
+
+    sectors = run_flux(
+        sectors_flux,
+        client,
+        {"session_key": "int64", "driver_number": "int64", "sector": str, "lap_number": "int64", "speed_mean": "float64"},
+        timing,
+    )
+
+    table_data = best_laps.merge(sectors, on=["session_key", "driver_number", "lap_number"])
+    table_data["sector"] = "SECTOR " + table_data["sector"]
+    table_data = table_data.rename(columns={"speed_mean": "max_speed"})[list(columns)].astype(columns)
+
+    return finish(table_data.sort_values(["session_key", "driver_number", "lap_duration", "sector"]), timing)
+
+
+def second_query(bucket: str, client, session_keys=(9998,), driver_numbers=None) -> pd.DataFrame:
+    """
+    Função que retorna a segunda query definida pelo grupo:
+
+    Ver qual piloto possui a melhor aceleração por setor da pista.
+
+    A aceleração entre amostras consecutivas (difference() e elapsed()) e a
+    média por setor são calculadas no servidor.
+
+    @params:
+        - bucket: str
+        - client: InfluxDBClient
+        - session_keys: Iterable[int] | None (None para todas as sessões)
+        - driver_numbers: Iterable[int] | None (None para todos os pilotos)
+
+    @returns:
+        - table_data: pd.DataFrame (com o tempo das consultas em attrs["timing"])
+    """
+
+    timing = new_timing()
+    columns = {"driver_number": "int64", "session_key": "int64", "sector": str, "aceleracaomediaporsetor": "float64"}
+
+    bounds = session_bounds(bucket, client, timing, session_keys=session_keys)
+    if bounds.empty:
+        return finish(pd.DataFrame(columns=list(columns)).astype(columns), timing)
+
+    predicate = 'r._measurement == "telemetry" and (r._field == "speed" or r._field == "sector")'
+    if driver_numbers is not None:
+        predicate += " and " + flux_any("driver_number", driver_numbers)
+
+    flux = f"""
+        {bounded_source(bucket, bounds, predicate)}
+            |> pivot(rowKey: ["_time"], columnKey: ["_field"], valueColumn: "_value")
+            |> sort(columns: ["_time"])
+            |> difference(columns: ["speed"], keepFirst: true)
+            |> elapsed(unit: 1ns, columnName: "dt")
+            |> map(fn: (r) => ({{r with
+                acceleration: if r.dt > 0 then float(v: r.speed) / 3.6 / (float(v: r.dt) / 1000000000.0) else 0.0
+            }}))
+            |> filter(fn: (r) => exists r.sector)
+            |> group(columns: ["driver_number", "session_key", "sector"])
+            |> mean(column: "acceleration")
+            |> group()
+            |> map(fn: (r) => ({{
+                driver_number: r.driver_number,
+                session_key: r.session_key,
+                sector: "SECTOR " + string(v: r.sector),
+                aceleracaomediaporsetor: r.acceleration
+            }}))
+    """
+
+    table_data = run_flux(flux, client, columns, timing)
+
+    return finish(
+        table_data.sort_values(["aceleracaomediaporsetor", "driver_number"], ascending=[False, True]),
+        timing,
+    )
+
+
+def third_query(bucket: str, client) -> pd.DataFrame:
+    """
+    Função que retorna a terceira query definida pelo grupo:
+
+    Qual tipo de pneu apresenta o melhor desemepnho em relação a temperatura da pista.
+
+    O clima é reduzido no servidor a uma soma e uma contagem por sessão
+    antes do join com os stints, como o weather_session_stats do PostgreSQL.
+
+    @params:
+        - bucket: str
+        - client: InfluxDBClient
+
+    @returns:
+        - table_data: pd.DataFrame (com o tempo das consultas em attrs["timing"])
+    """
+
+    timing = new_timing()
+    columns = {"compostopneu": str, "temperaturamediapista": "float64", "maxlapdurationtyre": "int64"}
+
+    bounds = session_bounds(bucket, client, timing)
+    if bounds.empty:
+        return finish(pd.DataFrame(columns=list(columns)).astype(columns), timing)
+
+    weather = bounded_source(
+        bucket, bounds, 'r._measurement == "weather_conditions" and r._field == "track_temperature"', per_session=False
+    )
+    stints = bounded_source(
+        bucket, bounds, 'r._measurement == "tyre_stints" and (r._field == "lap_start" or r._field == "lap_end")', per_session=False
+    )
+
+    flux = f"""
+        import "join"
+
+        weather = {weather}
+            |> group(columns: ["session_key"])
+            |> reduce(
+                identity: {{temp_sum: 0.0, temp_count: 0.0}},
+                fn: (r, accumulator) => ({{temp_sum: accumulator.temp_sum + r._value, temp_count: accumulator.temp_count + 1.0}})
+            )
+            |> group()
+
+        stints = {stints}
+            |> pivot(rowKey: ["_time"], columnKey: ["_field"], valueColumn: "_value")
+            |> group()
+            |> map(fn: (r) => ({{session_key: r.session_key, compound: r.compound, lap_span: r.lap_end - r.lap_start}}))
+
+        join.inner(
+            left: stints,
+            right: weather,
+            on: (l, r) => l.session_key == r.session_key,
+            as: (l, r) => ({{compound: l.compound, lap_span: l.lap_span, temp_sum: r.temp_sum, temp_count: r.temp_count}})
+        )
+            |> group(columns: ["compound"])
+            |> reduce(
+                identity: {{temp_sum: 0.0, temp_count: 0.0, max_lap: -1}},
+                fn: (r, accumulator) => ({{
+                    temp_sum: accumulator.temp_sum + r.temp_sum,
+                    temp_count: accumulator.temp_count + r.temp_count,
+                    max_lap: if r.lap_span > accumulator.max_lap then r.lap_span else accumulator.max_lap
+                }})
+            )
+            |> group()
+            |> map(fn: (r) => ({{
+                compostopneu: r.compound,
+                temperaturamediapista: r.temp_sum / r.temp_count,
+                maxlapdurationtyre: r.max_lap
+            }}))
+    """
+
+    table_data = run_flux(flux, client, columns, timing)
+    table_data["temperaturamediapista"] = table_data["temperaturamediapista"].round(2)
+
+    return finish(table_data.sort_values("maxlapdurationtyre", ascending=False), timing)
+
+
+def fourth_query(bucket: str, client, session_keys=(9998,), driver_numbers=(30,)) -> pd.DataFrame:
+    """
+    Função que retorna a quarta query definida pelo grupo.
+
+    Análise do impacto do DRS na velocidade do carro em cada setor da pista, para cada piloto e para cada pista.
+
+    Os trechos contínuos com o mesmo DRS, setor e uso do freio são
+    identificados no servidor (difference() do estado e cumulativeSum() das
+    mudanças) e reduzidos ao início, fim e velocidades de cada trecho.
+
+    @params:
+        - bucket: str
+        - client: InfluxDBClient
+        - session_keys: Iterable[int] | None (None para todas as sessões)
+        - driver_numbers: Iterable[int] | None (None para todos os pilotos)
+
+    @returns:
+        - table_data: pd.DataFrame (com o tempo das consultas em attrs["timing"])
+    """
+
+    timing = new_timing()
+    columns = {
+        "nomepista": str,
+        "nomepiloto": str,
+        "tempoinicio": "datetime64[ns]",
+        "tempofim": "datetime64[ns]",
+        "drs": str,
+        "setor": str,
+        "usofreio": str,
+        "velocidadeinicio": "int64",
+        "velocidadefim": "int64",
+    }
+
+    bounds = session_bounds(bucket, client, timing, session_keys=session_keys)
+    if bounds.empty:
+        return finish(pd.DataFrame(columns=list(columns)).astype(columns), timing)
+
+    predicate = (
+        'r._measurement == "telemetry" and '
+        '(r._field == "speed" or r._field == "drs" or r._field == "brake" or r._field == "sector")'
+    )
+    if driver_numbers is not None:
+        predicate += " and " + flux_any("driver_number", driver_numbers)
+
+    flux = f"""
+        {bounded_source(bucket, bounds, predicate)}
+            |> pivot(rowKey: ["_time"], columnKey: ["_field"], valueColumn: "_value")
+            |> filter(fn: (r) => exists r.sector)
+            |> sort(columns: ["_time"])
+            |> map(fn: (r) => {{
+                drs_active = r.drs == 8 or r.drs == 10 or r.drs == 12 or r.drs == 14
+                braking = r.brake == 100
+
+                return {{r with
+                    drs_state: if drs_active then "ATIVO" else "NÃO ATIVO",
+                    usofreio: if braking then "FREANDO" else "NORMAL",
+                    state: r.sector * 4 + (if drs_active then 2 else 0) + (if braking then 1 else 0)
+                }}
+            }})
+            |> difference(columns: ["state"], keepFirst: true)
+            |> map(fn: (r) => ({{r with changed: if exists r.state and r.state == 0 then 0 else 1}}))
+            |> cumulativeSum(columns: ["changed"])
+            |> group(columns: ["session_key", "driver_number", "changed"])
+            |> reduce(
+                identity: {{
+                    n: 0,
+                    tempoinicio: time(v: 0),
+                    tempofim: time(v: 0),
+                    velocidadeinicio: 0,
+                    velocidadefim: 0,
+                    drs: "",
+                    setor: "",
+                    usofreio: ""
+                }},
+                fn: (r, accumulator) => {{
+                    first = accumulator.n == 0 or r._time < accumulator.tempoinicio
+                    last = accumulator.n == 0 or r._time > accumulator.tempofim
+
+                    return {{
+                        n: accumulator.n + 1,
+                        tempoinicio: if first then r._time else accumulator.tempoinicio,
+                        tempofim: if last then r._time else accumulator.tempofim,
+                        velocidadeinicio: if first then r.speed else accumulator.velocidadeinicio,
+                        velocidadefim: if last then r.speed else accumulator.velocidadefim,
+                        drs: r.drs_state,
+                        setor: "SETOR " + string(v: r.sector),
+                        usofreio: r.usofreio
+                    }}
+                }}
+            )
+            |> group()
+            |> keep(columns: ["session_key", "driver_number", "tempoinicio", "tempofim", "drs", "setor", "usofreio", "velocidadeinicio", "velocidadefim"])
+    """
+
+    segments = run_flux(
+        flux,
+        client,
+        {
+            "session_key": "int64",
+            "driver_number": "int64",
+            "tempoinicio": "datetime64[ns, UTC]",
+            "tempofim": "datetime64[ns, UTC]",
+            "drs": str,
+            "setor": str,
+            "usofreio": str,
+            "velocidadeinicio": "int64",
+            "velocidadefim": "int64",
+        },
+        timing,
+    )
+
+    # Naive UTC, as the TIMESTAMP columns of PostgreSQL
+    for column in ("tempoinicio", "tempofim"):
+        segments[column] = segments[column].dt.tz_localize(None)
+
+    table_data = (
+        segments
+        .merge(driver_names(bucket, client, bounds, timing), on=["session_key", "driver_number"])
+        .merge(bounds[["session_key", "circuit_short_name"]], on="session_key")
+        .rename(columns={"circuit_short_name": "nomepista", "full_name": "nomepiloto"})
+        .sort_values(["session_key", "driver_number", "tempoinicio"])
+    )
+
+    return finish(table_data[list(columns)].astype(columns), timing)
+
+
+def fifth_query(bucket: str, client, session_keys=(9998,), driver_numbers=None) -> pd.DataFrame:
+    """
+    Função que retorna a quinta query definida pelo grupo.
+
+    Qual é a relação entre a temperatura média da pista em relação ao desempenho do carro em termos de velocidade média e uso médio do motor?
+
+    A telemetria agregada por segundo (telemetry_1s) e o clima são reduzidos
+    no servidor a somas e contagens por sessão e piloto; a média ponderada
+    por pista e piloto, com os nomes, é feita sobre essas poucas linhas.
+
+    @params:
+        - bucket: str
+        - client: InfluxDBClient
+        - session_keys: Iterable[int] | None (None para todas as sessões)
+        - driver_numbers: Iterable[int] | None (None para todos os pilotos)
+
+    @returns:
+        - table_data: pd.DataFrame (com o tempo das consultas em attrs["timing"])
+    """
+
+    timing = new_timing()
+    columns = {
+        "nomecircuito": str,
+        "nomedopiloto": str,
+        "velocidademediapiloto": "float64",
+        "consumopotenciamediamotor": "float64",
+        "temperaturamediapista": "float64",
+    }
+
+    bounds = session_bounds(bucket, client, timing, session_keys=session_keys)
+    if bounds.empty:
+        return finish(pd.DataFrame(columns=list(columns)).astype(columns), timing)
+
+    predicate = 'r._measurement == "telemetry_1s" and (r._field == "samples" or r._field == "speed_mean" or r._field == "throttle_mean")'
+    if driver_numbers is not None:
+        predicate += " and " + flux_any("driver_number", driver_numbers)
+
+    # Sums and sample counts per (session, driver), rebuilt from the means of
+    # the downsampled telemetry; every sample has a speed and a throttle
+    per_driver = run_flux(
+        f"""
+        {bounded_source(bucket, bounds, predicate)}
+            |> pivot(rowKey: ["_time"], columnKey: ["_field"], valueColumn: "_value")
+            |> group(columns: ["session_key", "driver_number"])
+            |> reduce(
+                identity: {{samples: 0.0, speed_sum: 0.0, throttle_sum: 0.0}},
+                fn: (r, accumulator) => ({{
+                    samples: accumulator.samples + float(v: r.samples),
+                    speed_sum: accumulator.speed_sum + r.speed_mean * float(v: r.samples),
+                    throttle_sum: accumulator.throttle_sum + r.throttle_mean * float(v: r.samples)
+                }})
+            )
+            |> group()
+        """,
+        client,
+        {"session_key": "int64", "driver_number": "int64", "samples": "float64", "speed_sum": "float64", "throttle_sum": "float64"},
+        timing,
+    )
+    if per_driver.empty:
+        return finish(pd.DataFrame(columns=list(columns)).astype(columns), timing)
+
+    per_driver["speed_count"] = per_driver["samples"]
+    per_driver["throttle_count"] = per_driver["samples"]
+
+    weather = run_flux(
+        f"""
+        {bounded_source(bucket, bounds, 'r._measurement == "weather_conditions" and r._field == "track_temperature"')}
+            |> group(columns: ["session_key"])
+            |> reduce(
+                identity: {{sum: 0.0, count: 0.0}},
+                fn: (r, accumulator) => ({{sum: accumulator.sum + r._value, count: accumulator.count + 1.0}})
+            )
+            |> group()
+        """,
+        client,
+        {"session_key": "int64", "sum": "float64", "count": "float64"},
+        timing,
+    )
+
+    weather = weather.rename(columns={"sum": "track_sum", "count": "track_count"})
+    # The weather is read without nulls, so every sample has a track temperature
+    weather["weather_samples"] = weather["track_count"]
+
+    joined = (
+        per_driver
+        .merge(driver_names(bucket, client, bounds, timing), on=["session_key", "driver_number"])
+        .merge(weather, on="session_key")
+        .merge(bounds[["session_key", "circuit_short_name"]], on="session_key")
+    )
+
+    # Weighted as the join of every telemetry sample with every weather sample
+    joined["speed_sum"] *= joined["weather_samples"]
+    joined["speed_count"] *= joined["weather_samples"]
+    joined["throttle_sum"] *= joined["weather_samples"]
+    joined["throttle_count"] *= joined["weather_samples"]
+    joined["track_sum"] *= joined["samples"]
+    joined["track_count"] *= joined["samples"]
+
+    grouped = joined.groupby(["circuit_short_name", "full_name"], as_index=False)[
+        ["speed_sum", "speed_count", "throttle_sum", "throttle_count", "track_sum", "track_count"]
+    ].sum()
+
+    table_data = pd.DataFrame({
+        "nomecircuito": grouped["circuit_short_name"],
+        "nomedopiloto": grouped["full_name"],
+        "velocidademediapiloto": (grouped["speed_sum"] / grouped["speed_count"]).round(2),
+        "consumopotenciamediamotor": (grouped["throttle_sum"] / grouped["throttle_count"]).round(2),
+        "temperaturamediapista": (grouped["track_sum"] / grouped["track_count"]).round(2),
+    })
+
+    return finish(table_data.astype(columns), timing)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Runs the F1 reports on InfluxDB with Flux.")
+    parser.add_argument("--bucket", default=DEFAULT_BUCKET, help="Bucket the reports read.")
+    parser.add_argument("--reports", nargs="+", choices=REPORTS, default=REPORTS, help="Reports to run.")
+    parser.add_argument("--session-keys", type=parse_numbers, default=(9998,), help="Sessions of reports 2, 4 and 5 (all: every session).")
+    parser.add_argument("--driver-numbers", type=parse_numbers, default=None, help="Drivers of reports 2, 4 and 5 (all: every driver).")
+    args = parser.parse_args()
+
+    filters = {"session_keys": args.session_keys, "driver_numbers": args.driver_numbers}
+
+    with InfluxDBClient(url=url, token=token, org=org, timeout=120_000) as client:
+        for report in args.reports:
+            function = globals()[report]
+            kwargs = filters if report in ("second_query", "fourth_query", "fifth_query") else {}
+
+            table_data = function(args.bucket, client, **kwargs)
+            timing = table_data.attrs["timing"]
+
+            print(table_data)
+            print(
+                f"{report}: {len(table_data)} rows, {timing['queries']} Flux queries, "
+                f"{timing['query_seconds']:.3f}s query + {timing['decode_seconds']:.3f}s decode\n"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from influxdb_client import WritePrecision
+from influxdb_client.client.write_api import SYNCHRONOUS
+from influxdb_client.rest import ApiException
+
+BATCH_SIZE = 5_000
+FLUSH_INTERVAL = 1.0
+MAX_IN_FLIGHT = 4
+WRITE_RETRIES = 5
+WRITE_BACKOFF = 1.0
+
+# Responses that mean "try again later" (rate limited, or not ready)
+RETRY_STATUSES = (429, 503)
+
+class BatchWriter:
+    """
+    Accumulates points into batches and writes them to one bucket with
+    several HTTP requests in flight.
+
+    A batch is sent as soon as it has `batch_size` points, and a background
+    thread sends whatever is buffered every `flush_interval` seconds. At most
+    `max_in_flight` batches are written at the same time; `write` blocks when
+    they are all busy, so memory stays bounded. Batches rejected with 429 or
+    503 are retried with exponential backoff (or after the Retry-After the
+    server asks for). Compression is a setting of the client: create it with
+    enable_gzip=True.
+
+    Use it as a context manager, or call close() to flush and print the
+    throughput; closing it again returns the same result.
+    """
+
+    def __init__(
+        self,
+        client,
+        bucket,
+        org,
+        batch_size=BATCH_SIZE,
+        flush_interval=FLUSH_INTERVAL,
+        max_in_flight=MAX_IN_FLIGHT,
+        retries=WRITE_RETRIES,
+        backoff=WRITE_BACKOFF,
+        precision=WritePrecision.NS,
+        name=None,
+    ):
+        """
+        Args:
+            client (InfluxDBClient): Client the batches are written with.
+            bucket (str): Target bucket.
+            org (str): Organization of the bucket.
+            batch_size (int): Points per write request.
+            flush_interval (float): Seconds after which a partial batch is sent.
+            max_in_flight (int): Write requests running at the same time.
+            retries (int): Extra attempts for a batch rejected with 429/503.
+            backoff (float): Delay (in seconds) before the first retry,
+                doubled at every attempt.
+            precision (WritePrecision): Precision of line protocol timestamps.
+            name (str | None): Label of the throughput report (the bucket by
+                default).
+        """
+        self.write_api = client.write_api(write_options=SYNCHRONOUS)
+        self.bucket = bucket
+        self.org = org
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.retries = retries
+        self.backoff = backoff
+        self.precision = precision
+        self.name = name or bucket
+
+        self.points = 0
+        self.batches = 0
+        self.errors = []
+
+        self._buffer = []
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_in_flight)
+        self._executor = ThreadPoolExecutor(max_workers=max_in_flight)
+        self._stop = threading.Event()
+        self._flusher = None
+        self._start = None
+        self._last_flush = None
+        self._closed = None
+
+    def write(self, records):
+        """
+        Adds points to the buffer, sending every batch that is full.
+
+        Args:
+            records: A Point or line protocol string, or a list of them.
+        """
+        if not isinstance(records, (list, tuple)):
+            records = [records]
+
+        with self._lock:
+            if self._start is None:
+                self._start = self._last_flush = time.perf_counter()
+                self._flusher = threading.Thread(target=self._flush_periodically, daemon=True)
+                self._flusher.start()
+
+            self._buffer.extend(records)
+            batches = self._take_batches(full_only=True)
+
+        for batch in batches:
+            self._submit(batch)
+
+    def flush(self):
+        """
+        Sends everything buffered, without waiting for the writes to finish.
+        """
+        with self._lock:
+            batches = self._take_batches(full_only=False)
+
+        for batch in batches:
+            self._submit(batch)
+
+    def close(self):
+        """
+        Flushes the buffer, waits for every write and prints the throughput.
+
+        Returns:
+            dict: points and batches written, seconds and errors (one message
+            per batch that could not be written).
+        """
+        if self._closed is not None:
+            return self._closed
+
+        self._stop.set()
+        if self._flusher is not None:
+            self._flusher.join()
+
+        self.flush()
+        self._executor.shutdown(wait=True)
+        self.write_api.close()
+
+        seconds = time.perf_counter() - self._start if self._start is not None else 0.0
+        rate = self.points / seconds if seconds > 0 else 0.0
+        print(f"{self.name}: {self.points} points in {self.batches} batches, {seconds:.2f}s ({rate:,.0f} points/s).")
+        for error in self.errors:
+            print(f"{self.name}: {error}")
+
+        self._closed = {"points": self.points, "batches": self.batches, "seconds": seconds, "errors": self.errors}
+        return self._closed
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _take_batches(self, full_only):
+        # Called with the lock held
+        size = self.batch_size
+        end = len(self._buffer) - len(self._buffer) % size if full_only else len(self._buffer)
+        batches = [self._buffer[start:start + size] for start in range(0, end, size)]
+        del self._buffer[:end]
+        if batches:
+            self._last_flush = time.perf_counter()
+        return batches
+
+    def _flush_periodically(self):
+        while not self._stop.wait(self.flush_interval / 2):
+            if time.perf_counter() - self._last_flush >= self.flush_interval:
+                self.flush()
+
+    def _submit(self, batch):
+        # Blocks while max_in_flight batches are being written
+        self._slots.acquire()
+        future = self._executor.submit(self._send, batch)
+        future.add_done_callback(lambda _: self._slots.release())
+
+    def _send(self, batch):
+        for attempt in range(self.retries + 1):
+            try:
+                self.write_api.write(bucket=self.bucket, org=self.org, record=batch, write_precision=self.precision)
+            except ApiException as e:
+                if e.status not in RETRY_STATUSES or attempt == self.retries:
+                    with self._lock:
+                        self.errors.append(f"batch of {len(batch)} points failed: {e.status} {e.reason}")
+                    return
+                retry_after = e.headers.get("Retry-After") if e.headers else None
+                time.sleep(float(retry_after) if retry_after and retry_after.isdigit() else self.backoff * 2 ** attempt)
+            except Exception as e:
+                with self._lock:
+                    self.errors.append(f"batch of {len(batch)} points failed: {e}")
+                return
+            else:
+                with self._lock:
+                    self.points += len(batch)
+                    self.batches += 1
+                return
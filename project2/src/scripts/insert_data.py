@@ -0,0 +1,279 @@
+import argparse
+import json
+import os
+import time
+from contextlib import ExitStack
+
+import pandas as pd
+from influxdb_client import InfluxDBClient
+from dotenv import dotenv_values
+from joblib import Parallel, delayed
+
+from src.scripts.influx_writer import BATCH_SIZE, FLUSH_INTERVAL, MAX_IN_FLIGHT, BatchWriter
+from src.scripts.downsample import lap_sector_aggregates, window_aggregates
+from src.scripts.line_protocol import to_line_protocol
+from src.scripts.measurements import BUCKET_LAYOUTS, MEASUREMENTS
+from src.scripts.sectors import LAP_COLUMNS, assign_lap_sectors
+
+token = dotenv_values(".env.local")['INFLUXDB_TOKEN']
+org = "my-org"
+url = "http://localhost:8086"
+
+def session_starts():
+    """
+    Returns the date_start of every session, used as the timestamp of the
+    measurements that have no date of their own (stints and drivers), so a
+    query bounded by the session's dates finds them.
+    """
+    return read_sessions()[["session_key", "date_start"]]
+
+def read_tyre_stints():
+    df_tyre_strints = pd.read_parquet("./data/stints/stints.parquet").dropna()
+    df_tyre_strints = df_tyre_strints.drop(columns=["meeting_key"])
+    df_tyre_strints = df_tyre_strints.drop_duplicates(subset=["session_key", "stint_number", "driver_number"])
+    df_tyre_strints = df_tyre_strints.merge(session_starts(), on="session_key")
+    # One nanosecond per stint, so stints of the same series do not overwrite each other
+    df_tyre_strints["date"] = df_tyre_strints["date_start"] + pd.to_timedelta(df_tyre_strints["stint_number"], unit="ns")
+    return df_tyre_strints
+
+def read_weather_conditions():
+    df_weather = pd.read_parquet("./data/weather_conditions/weather_conditions.parquet").dropna()
+    df_session = pd.read_parquet("./data/sessions/sessions.parquet")
+    df_weather = df_weather.drop(columns=["meeting_key"])
+    df_weather = df_weather.drop_duplicates(subset=["session_key", "date"])
+    df_weather = df_weather[df_weather["session_key"].isin(df_session["session_key"].to_list())]
+    df_weather["rainfall"] = df_weather["rainfall"].astype(bool)
+    return df_weather
+
+def read_meets():
+    df_meets = pd.read_parquet("./data/meetings/meetings.parquet").dropna()
+    df_meets["meeting_key"] = df_meets["meeting_key"].astype(str)
+    df_meets["date_start"] = pd.to_datetime(df_meets["date_start"])
+    return df_meets
+
+def read_laps():
+    df_laps = pd.read_parquet("./data/laps/laps.parquet").dropna()
+    df_laps = df_laps.drop(columns=["meeting_key"])
+    df_laps = df_laps.drop(columns=["segments_sector_1", "segments_sector_2", "segments_sector_3"])
+    df_laps["date_start"] = pd.to_datetime(df_laps["date_start"], format='ISO8601', utc=True)
+    return df_laps
+
+def read_lap_sectors():
+    # Every lap with a start and sector durations, including the ones
+    # read_laps drops for missing values in other columns
+    return pd.read_parquet("./data/laps/laps.parquet", columns=LAP_COLUMNS)
+
+def read_sessions():
+    df_sessions = pd.read_parquet("./data/sessions/sessions.parquet").dropna()
+    df_sessions["date_start"] = pd.to_datetime(df_sessions["date_start"])
+    df_sessions["date_end"] = pd.to_datetime(df_sessions["date_end"])
+    return df_sessions
+
+def read_drivers():
+    df_drivers = pd.read_parquet("./data/drivers/drivers.parquet").dropna()
+    df_drivers = df_drivers.drop(columns=["meeting_key"])
+    return df_drivers.merge(session_starts().rename(columns={"date_start": "date"}), on="session_key")
+
+def read_pits():
+    df_pits = pd.read_parquet("./data/pits/pits.parquet").dropna()
+    df_pits = df_pits.drop(columns=["meeting_key"])
+    df_pits["date"] = pd.to_datetime(df_pits["date"], format='ISO8601', utc=True)
+    return df_pits
+
+def read_positions():
+    df_positions = pd.read_parquet("./data/positions/positions.parquet").dropna()
+    df_positions = df_positions.drop(columns=["meeting_key"])
+    df_positions = df_positions.drop_duplicates(subset=["session_key", "driver_number", "date"])
+    df_positions["date"] = pd.to_datetime(df_positions["date"], format='ISO8601', utc=True)
+    return df_positions
+
+def read_telemetry(file_path):
+    df_telemetry = pd.read_parquet(file_path).dropna()
+    if "meeting_key" in df_telemetry.columns:
+        df_telemetry = df_telemetry.drop(columns=["meeting_key"])
+    df_telemetry = df_telemetry.drop_duplicates(subset=["session_key", "driver_number", "date"])
+    df_telemetry["date"] = pd.to_datetime(df_telemetry["date"], format='ISO8601', utc=True)
+    return df_telemetry
+
+# Sources in load order: (measurement, reader). The telemetry files are
+# loaded last, by insert_telemetrys.
+SOURCES = [
+    ("tyre_stints", read_tyre_stints),
+    ("weather_conditions", read_weather_conditions),
+    ("meetings", read_meets),
+    ("sessions", read_sessions),
+    ("drivers", read_drivers),
+    ("pits", read_pits),
+    ("positions", read_positions),
+    ("laps", read_laps),
+]
+
+def open_writers(stack, client, layouts, writer_options=None, name=None):
+    """
+    Opens one BatchWriter per bucket layout.
+
+    The writers are entered in `stack`, so they are flushed and their
+    threads stopped even when the load fails before close_writers.
+
+    Args:
+        stack (ExitStack): Stack the writers are closed by.
+        client (InfluxDBClient): Client the writers share.
+        layouts (list[dict]): Bucket layouts (see BUCKET_LAYOUTS).
+        writer_options (dict | None): Extra BatchWriter arguments.
+        name (str | None): Prefix of the writers' throughput reports.
+
+    Returns:
+        dict: Bucket -> BatchWriter.
+    """
+    return {
+        layout["bucket"]: stack.enter_context(BatchWriter(
+            client,
+            layout["bucket"],
+            org,
+            name=f"{name} -> {layout['bucket']}" if name else None,
+            **(writer_options or {}),
+        ))
+        for layout in layouts
+    }
+
+def close_writers(writers):
+    """
+    Flushes and closes every writer.
+
+    Returns:
+        list[str]: One message per batch that could not be written, even
+        after the retries.
+    """
+    return [f"{bucket}: {error}" for bucket, writer in writers.items() for error in writer.close()["errors"]]
+
+def fan_out(measurement, df, layouts, writers):
+    """
+    Serializes a DataFrame once per distinct layout of a measurement and
+    writes the lines to every bucket that uses that layout.
+
+    Args:
+        measurement (str): Measurement name.
+        df (pd.DataFrame): Rows of the measurement, already transformed.
+        layouts (list[dict]): Bucket layouts (see BUCKET_LAYOUTS).
+        writers (dict): Bucket -> BatchWriter.
+    """
+    serialized = {}
+    for layout in layouts:
+        spec = layout["measurements"][measurement]
+        # Tag order does not change the lines, so it does not split layouts
+        key = json.dumps({**spec, "tags": sorted(spec["tags"])}, sort_keys=True)
+        if key not in serialized:
+            serialized[key] = to_line_protocol(df, measurement, **spec)
+        writers[layout["bucket"]].write(serialized[key])
+
+def process_telemetry(file_path, layouts, writer_options=None, df_laps=None):
+    """
+    Loads one telemetry file, with its aggregates, into every bucket.
+
+    Returns:
+        dict: file, error (why the file could not be processed, or None) and
+        batch_errors (batches the writers could not write).
+    """
+    result = {"file": file_path, "error": None, "batch_errors": []}
+    try:
+        # Each worker writes through its own client and batch writers
+        with InfluxDBClient(url=url, token=token, org=org, enable_gzip=True) as client, ExitStack() as stack:
+            writers = open_writers(stack, client, layouts, writer_options, name=os.path.basename(file_path))
+
+            df_telemetry = read_telemetry(file_path)
+            if df_laps is not None:
+                df_telemetry = assign_lap_sectors(df_telemetry, df_laps)
+            print(f"Processing file: {file_path} {df_telemetry.shape}")
+            fan_out("telemetry", df_telemetry, layouts, writers)
+            if df_laps is not None:
+                fan_out("telemetry_lap_agg", lap_sector_aggregates(df_telemetry), layouts, writers)
+            fan_out("telemetry_1s", window_aggregates(df_telemetry), layouts, writers)
+
+            result["batch_errors"] = close_writers(writers)
+    except Exception as e:
+        print(f"Error processing file {file_path}: {e}")
+        result["error"] = str(e)
+
+    return result
+
+def insert_telemetrys(layouts, workers=-1, writer_options=None):
+    """
+    Loads every telemetry file with `workers` joblib processes.
+
+    Returns:
+        list[dict]: The process_telemetry result of every file.
+    """
+    path_telemetrys = "./data/telemetrys"
+    if not os.path.isdir(path_telemetrys):
+        raise FileNotFoundError(f"Directory does not exist: {path_telemetrys}")
+
+    files = [f for f in os.listdir(path_telemetrys) if f.endswith(".parquet")]
+
+    # Every sample gets the lap and sector it was recorded in (see sectors.py)
+    df_laps = read_lap_sectors()
+
+    return Parallel(n_jobs=workers)(
+        delayed(process_telemetry)(os.path.join(path_telemetrys, file), layouts, writer_options, df_laps)
+        for file in files
+    )
+
+def main(layouts=BUCKET_LAYOUTS, workers=-1, writer_options=None):
+    """
+    Loads every source into all the buckets of `layouts`, reading and
+    transforming each parquet file once.
+
+    Args:
+        layouts (list[dict]): Bucket layouts (see BUCKET_LAYOUTS).
+        workers (int): joblib processes loading the telemetry (-1: one per CPU).
+        writer_options (dict | None): Extra BatchWriter arguments
+            (batch_size, flush_interval, max_in_flight...).
+
+    Raises:
+        SystemExit: When a file could not be processed or a batch could not
+            be written, after everything else was loaded.
+    """
+    start = time.time()
+
+    with InfluxDBClient(url=url, token=token, org=org, enable_gzip=True) as client, ExitStack() as stack:
+        writers = open_writers(stack, client, layouts, writer_options)
+        for measurement, read in SOURCES:
+            fan_out(measurement, read(), layouts, writers)
+
+        batch_errors = close_writers(writers)
+
+    results = insert_telemetrys(layouts, workers, writer_options)
+    failed = [result for result in results if result["error"] is not None]
+    batch_errors += [error for result in results for error in result["batch_errors"]]
+
+    print(f"Data insertion completed in {time.time() - start:.2f} seconds.")
+    for result in failed:
+        print(f"Failed: {result['file']}: {result['error']}")
+    if failed or batch_errors:
+        raise SystemExit(f"{len(failed)} telemetry files failed and {len(batch_errors)} batches were not written.")
+    print("All data has been successfully inserted into the database.")
+
+if __name__ == "__main__":
+    buckets = [layout["bucket"] for layout in BUCKET_LAYOUTS]
+
+    parser = argparse.ArgumentParser(description="Loads the F1 parquet dataset into InfluxDB, every bucket in one pass.")
+    parser.add_argument("--buckets", nargs="+", choices=buckets, default=buckets, help="Buckets to load.")
+    parser.add_argument("--workers", type=int, default=-1, help="Processes loading the telemetry files (-1: one per CPU).")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="Points per write request.")
+    parser.add_argument(
+        "--flush-interval",
+        type=float,
+        default=FLUSH_INTERVAL,
+        help="Seconds after which a partial batch is sent.",
+    )
+    parser.add_argument("--max-in-flight", type=int, default=MAX_IN_FLIGHT, help="Write requests running at the same time.")
+    args = parser.parse_args()
+
+    main(
+        [layout for layout in BUCKET_LAYOUTS if layout["bucket"] in args.buckets],
+        workers=args.workers,
+        writer_options={
+            "batch_size": args.batch_size,
+            "flush_interval": args.flush_interval,
+            "max_in_flight": args.max_in_flight,
+        },
+    )
@@ -0,0 +1,154 @@
+# Measurements written to InfluxDB and the layout of each bucket. Kept out of
+# insert_data.py, which reads the InfluxDB token on import, so checks such as
+# check_line_protocol.py run without one.
+
+# Fields of the downsampled telemetry (see downsample.AGGREGATES)
+TELEMETRY_AGGREGATES = {
+    "samples": "int",
+    "speed_mean": "float",
+    "speed_max": "int",
+    "throttle_mean": "float",
+    "throttle_max": "int",
+    "rpm_mean": "float",
+    "rpm_max": "int",
+    "drs_active_share": "float",
+}
+
+# Tags and fields written for each measurement (see line_protocol.to_line_protocol)
+MEASUREMENTS = {
+    "tyre_stints": {
+        "tags": ["session_key", "driver_number", "compound"],
+        "fields": {"stint_number": "int", "tyre_age_at_start": "float", "lap_start": "int", "lap_end": "int"},
+        "time_column": "date",
+    },
+    "weather_conditions": {
+        "tags": ["session_key"],
+        "fields": {
+            "track_temperature": "float",
+            "wind_speed": "float",
+            "rainfall": "int",
+            "humidity": "float",
+            "pressure": "float",
+            "air_temperature": "float",
+            "wind_direction": "float",
+        },
+        "time_column": "date",
+    },
+    "meetings": {
+        "tags": [
+            "meeting_key",
+            "country_code",
+            "circuit_short_name",
+            "meeting_name",
+            "meeting_official_name",
+            "location",
+            "country_key",
+            "country_name",
+        ],
+        "fields": {"circuit_key": "int", "gmt_offset": "str", "year": "int"},
+        "time_column": "date_start",
+    },
+    "laps": {
+        "tags": ["session_key", "driver_number", "is_pit_out_lap"],
+        "fields": {
+            "i1_speed": "float",
+            "i2_speed": "float",
+            "st_speed": "float",
+            "lap_duration": "float",
+            "duration_sector_1": "float",
+            "duration_sector_2": "float",
+            "duration_sector_3": "float",
+            "lap_number": "int",
+        },
+        "time_column": "date_start",
+    },
+    "sessions": {
+        "tags": ["session_key", "meeting_key", "location", "circuit_short_name", "session_type", "session_name"],
+        "fields": {"year": "int", "date_end": "time"},
+        "time_column": "date_start",
+    },
+    "drivers": {
+        "tags": [
+            "session_key",
+            "driver_number",
+            "broadcast_name",
+            "full_name",
+            "name_acronym",
+            "team_name",
+            "team_colour",
+            "first_name",
+            "last_name",
+            "country_code",
+        ],
+        # A point needs at least one field to be written
+        "fields": {"headshot_url": "str"},
+        "time_column": "date",
+    },
+    "pits": {
+        "tags": ["session_key", "driver_number", "lap_number"],
+        "fields": {"pit_duration": "float"},
+        "time_column": "date",
+    },
+    "positions": {
+        "tags": ["session_key", "driver_number"],
+        "fields": {"position": "int"},
+        "time_column": "date",
+    },
+    "telemetry": {
+        "tags": ["session_key", "driver_number"],
+        "fields": {
+            "rpm": "int",
+            "speed": "int",
+            "n_gear": "int",
+            "throttle": "int",
+            "brake": "int",
+            "drs": "int",
+            "lap_number": "int",
+            "sector": "int",
+        },
+        "time_column": "date",
+    },
+    # Downsampled telemetry (see downsample.py): one point per lap and
+    # sector, and one per second, for the reports that do not need every sample
+    "telemetry_lap_agg": {
+        "tags": ["session_key", "driver_number", "sector"],
+        "fields": {"lap_number": "int", **TELEMETRY_AGGREGATES},
+        "time_column": "date",
+    },
+    "telemetry_1s": {
+        "tags": ["session_key", "driver_number"],
+        "fields": TELEMETRY_AGGREGATES,
+        "time_column": "date",
+    },
+}
+
+def lead_with(tag, layout):
+    """
+    Returns the layout with `tag` moved to the front of every tag list.
+    """
+    return {
+        measurement: {**spec, "tags": sorted(spec["tags"], key=lambda name: name != tag)}
+        for measurement, spec in layout.items()
+    }
+
+# Target buckets and the measurements written to each. The session_key bucket
+# tags the laps with is_pit_out_lap, the driver_number bucket keeps it as a
+# string field. InfluxDB sorts the tags of a series key, so the tag order
+# only documents which tag leads the layout.
+BUCKET_LAYOUTS = [
+    {
+        "bucket": "bucket-session-key",
+        "measurements": lead_with("session_key", MEASUREMENTS),
+    },
+    {
+        "bucket": "bucket-driver-number",
+        "measurements": lead_with("driver_number", {
+            **MEASUREMENTS,
+            "laps": {
+                **MEASUREMENTS["laps"],
+                "tags": ["session_key", "driver_number"],
+                "fields": {"is_pit_out_lap": "str", **MEASUREMENTS["laps"]["fields"]},
+            },
+        }),
+    },
+]
@@ -0,0 +1,10 @@
+from src.scripts.shared import load_project1_module
+
+# The lap/sector assignment is project1's (src/scripts/sectors.py), so the
+# InfluxDB and PostgreSQL reports attribute each sample to the same sector
+# with one implementation.
+_sectors = load_project1_module("sectors")
+
+LAP_COLUMNS = _sectors.LAP_COLUMNS
+parse_timestamps = _sectors.parse_timestamps
+assign_lap_sectors = _sectors.assign_lap_sectors
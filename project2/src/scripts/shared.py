@@ -0,0 +1,21 @@
+import importlib.util
+import os
+
+# project1's scripts directory. Both projects are the `src` package, so the
+# modules project2 shares with project1 are loaded from their files instead
+# of imported by name.
+PROJECT1_SCRIPTS = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "..", "..", "..", "project1", "src", "scripts")
+)
+
+def load_project1_module(name):
+    """
+    Loads project1/src/scripts/<name>.py as the module project1_<name>.
+
+    Only modules without import-time side effects (no .env.local, no
+    database connection) can be shared this way.
+    """
+    spec = importlib.util.spec_from_file_location(f"project1_{name}", os.path.join(PROJECT1_SCRIPTS, f"{name}.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module